@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from Alerts.AlertQueue import parse_expires
+
+
+class AlertCache:
+    """
+    The last good WeatherBox alerts for each location, kept on disk so a restart or
+    an outage does not blank an active warning.
+
+    Stored as a small JSON object keyed by the location's API URL, holding the raw
+    alert objects and when they were fetched. Writes go to a temporary file that is
+    renamed into place, so a power cut mid-write cannot leave a corrupt cache; a
+    missing or unreadable file just means nothing is cached. The file is only
+    rewritten when a location's alerts change, or now and then to refresh its fetch
+    time, to spare the SD card.
+    """
+
+    DEFAULT_FILENAME = ".alert_cache.json"
+    # Alerts without a usable expires time are trusted for this long after their fetch
+    MAX_AGE_SECONDS = 60 * 60
+    # An unchanged location's fetch time is rewritten at most this often
+    REFRESH_SECONDS = 15 * 60
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Cache file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as file:
+                entries = json.load(file)
+            self._entries: Dict[str, dict] = entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def load(self, source: str, now: Optional[float] = None) -> List[dict]:
+        """
+        The cached alerts for a location that are still active.
+
+        Args:
+            source: The location's API URL
+            now: Unix epoch seconds; defaults to now
+
+        Returns:
+            Raw alert objects as the WeatherBox sent them
+        """
+        if now is None:
+            now = time.time()
+        entry = self._entries.get(source)
+        if not isinstance(entry, dict) or not isinstance(entry.get("alerts"), list):
+            return []
+        fetched_at = entry.get("fetched_at") or 0
+        active = []
+        for alert in entry["alerts"]:
+            if not isinstance(alert, dict):
+                continue
+            expires_at = parse_expires(alert.get("expires"))
+            if expires_at is None:
+                if now - fetched_at > self.MAX_AGE_SECONDS:
+                    continue
+            elif expires_at <= now:
+                continue
+            active.append(alert)
+        return active
+
+    def fetched_at(self, source: str) -> Optional[float]:
+        """Unix epoch seconds of the location's last cached fetch, or None."""
+        entry = self._entries.get(source)
+        return entry.get("fetched_at") if isinstance(entry, dict) else None
+
+    def store(self, source: str, alerts: List[dict], now: Optional[float] = None):
+        """
+        Record a successful fetch's alerts for a location.
+
+        Args:
+            source: The location's API URL
+            alerts: Raw alert objects; an empty list records that none are active
+            now: Unix epoch seconds of the fetch; defaults to now
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            entry = self._entries.get(source)
+            if isinstance(entry, dict) and entry.get("alerts") == alerts and \
+                    now - (entry.get("fetched_at") or 0) < self.REFRESH_SECONDS:
+                return
+            self._entries[source] = {"fetched_at": now, "alerts": alerts}
+            self._save()
+
+    def discard(self, sources: Iterable[str]):
+        """Forget locations that are no longer monitored."""
+        with self._lock:
+            removed = [self._entries.pop(source) for source in sources if source in self._entries]
+            if removed:
+                self._save()
+
+    def _save(self):
+        temporary_path = self.path + ".tmp"
+        try:
+            with open(temporary_path, "w") as file:
+                json.dump(self._entries, file)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Could not save alert cache {self.path}: {e}")
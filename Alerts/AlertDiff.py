@@ -0,0 +1,74 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Sequence
+
+# Fields that say which alert this is. Coordinates and the *_score fields are left
+# out: the scores restate severity/urgency/certainty and coordinates can jitter.
+IDENTITY_FIELDS = ("state", "city", "event")
+# Fields whose change makes the same alert worth showing again
+CONTENT_FIELDS = ("severity", "urgency", "certainty", "headline", "nws_headline",
+                  "expires", "description", "instruction")
+
+
+def _digest(alert, names: Sequence[str]) -> str:
+    # JSON of the chosen fields, so the digest is stable across runs and Python versions
+    text = json.dumps([getattr(alert, name, None) for name in names], separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+@dataclass(frozen=True)
+class AlertKey:
+    """Stable identity and content digests of an alert, cheap to compare and store."""
+    fingerprint: str    # Digest of IDENTITY_FIELDS
+    content: str        # Digest of CONTENT_FIELDS
+
+    @classmethod
+    def of(cls, alert) -> "AlertKey":
+        """Key for a WeatherAlert (or anything with the same attributes)."""
+        return cls(_digest(alert, IDENTITY_FIELDS), _digest(alert, CONTENT_FIELDS))
+
+
+class AlertChange(Enum):
+    NEW = "new"             # A different alert, or the first one since the display last showed one
+    UPDATED = "updated"     # The same alert with changed content
+    UNCHANGED = "unchanged"
+    CLEARED = "cleared"     # An alert was showing and now none is
+
+
+class AlertDiffer:
+    """
+    Classifies each poll's alert against the one the display is showing, so callers
+    redraw only when something meaningful changed.
+    """
+
+    _UNKNOWN = object()
+
+    def __init__(self):
+        self._shown = self._UNKNOWN
+
+    @property
+    def shown(self) -> Optional[AlertKey]:
+        """Key of the alert on the display, or None if none is or it is not known."""
+        return None if self._shown is self._UNKNOWN else self._shown
+
+    def diff(self, key: Optional[AlertKey]) -> AlertChange:
+        """
+        Compare a poll's alert with the shown one and remember it as shown.
+
+        Args:
+            key: Key of the alert to show, or None if there is none
+        """
+        shown, self._shown = self._shown, key
+        if key is None:
+            return AlertChange.UNCHANGED if shown is None else AlertChange.CLEARED
+        if shown is self._UNKNOWN or shown is None or shown.fingerprint != key.fingerprint:
+            return AlertChange.NEW
+        if shown.content != key.content:
+            return AlertChange.UPDATED
+        return AlertChange.UNCHANGED
+
+    def reset(self):
+        """Forget what is shown, after something else has been drawn over it."""
+        self._shown = self._UNKNOWN
@@ -0,0 +1,168 @@
+import datetime
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from Alerts.AlertDiff import AlertKey
+
+
+def parse_expires(expires: Optional[str]) -> Optional[float]:
+    """
+    Unix epoch seconds of an NWS ISO 8601 expiry time, or None if missing or unreadable.
+    A time without an offset is taken as local time.
+    """
+    if not expires:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(expires.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+@dataclass(eq=False)
+class QueuedAlert:
+    """An alert with everything needed to rank and show it, worked out once when it is queued."""
+    key: AlertKey
+    source: str                     # Where it came from, e.g. the location's API URL
+    alert: object                   # The WeatherAlert itself
+    color: list
+    recheck_seconds: int
+    priority: tuple                 # Larger sorts first
+    expires_at: Optional[float]     # Unix epoch seconds, or None to keep until its source drops it
+    sequence: int = field(default=0)
+
+
+class AlertQueue:
+    """
+    Active alerts across all sources, ordered by priority and expired by time.
+
+    Alerts are identified by their AlertKey fingerprint, so a re-fetched alert
+    replaces its earlier copy instead of duplicating it. Two heaps, one by priority
+    and one by expiry time, are updated lazily: superseded heap entries are skipped
+    when they surface, so adding, replacing or removing an alert never rescans the
+    queue and finding the top alert or the next expiry is constant time amortized.
+
+    Not thread-safe; the alerter's main loop owns it.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, QueuedAlert] = {}
+        self._by_source: Dict[str, Set[str]] = {}
+        # Heap items end in a unique push count, so the entries themselves are never compared
+        self._priority_heap: List[Tuple[tuple, int, int, QueuedAlert]] = []
+        self._expiry_heap: List[Tuple[float, int, QueuedAlert]] = []
+        self._sequence = itertools.count()
+        self._pushes = itertools.count()
+        self._rotation: Optional[str] = None    # Fingerprint of the alert being shown
+        self._last_top: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Optional[AlertKey]) -> bool:
+        if key is None:
+            return False
+        entry = self._entries.get(key.fingerprint)
+        return entry is not None and entry.key == key
+
+    def _is_live(self, entry: QueuedAlert) -> bool:
+        return self._entries.get(entry.key.fingerprint) is entry
+
+    def push(self, entry: QueuedAlert):
+        """Add an alert, or replace the queued alert with the same fingerprint."""
+        fingerprint = entry.key.fingerprint
+        previous = self._entries.get(fingerprint)
+        if previous is not None and previous.source != entry.source:
+            self._by_source[previous.source].discard(fingerprint)
+        # Keep the original sequence so an updated alert keeps its place among equals
+        entry.sequence = previous.sequence if previous is not None else next(self._sequence)
+        self._entries[fingerprint] = entry
+        self._by_source.setdefault(entry.source, set()).add(fingerprint)
+        heapq.heappush(self._priority_heap, self._order(entry) + (next(self._pushes), entry))
+        if entry.expires_at is not None:
+            heapq.heappush(self._expiry_heap, (entry.expires_at, next(self._pushes), entry))
+
+    def remove(self, fingerprint: str) -> Optional[QueuedAlert]:
+        """Drop an alert by fingerprint; its heap entries are discarded when they surface."""
+        entry = self._entries.pop(fingerprint, None)
+        if entry is not None:
+            self._by_source[entry.source].discard(fingerprint)
+        return entry
+
+    def replace_source(self, source: str, entries: Iterable[QueuedAlert]):
+        """Make entries the complete set of alerts from one source."""
+        entries = list(entries)
+        keep = {entry.key.fingerprint for entry in entries}
+        for fingerprint in list(self._by_source.get(source, ())):
+            if fingerprint not in keep:
+                self.remove(fingerprint)
+        for entry in entries:
+            self.push(entry)
+
+    def expire(self, now: float) -> List[QueuedAlert]:
+        """
+        Remove every alert whose expiry time has passed.
+
+        Args:
+            now: Unix epoch seconds
+
+        Returns:
+            The alerts removed
+        """
+        expired = []
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, _, entry = heapq.heappop(heap)
+            if self._is_live(entry):
+                self.remove(entry.key.fingerprint)
+                expired.append(entry)
+        return expired
+
+    def top(self) -> Optional[QueuedAlert]:
+        """The highest-priority alert, or None if the queue is empty."""
+        heap = self._priority_heap
+        while heap and not self._is_live(heap[0][-1]):
+            heapq.heappop(heap)
+        return heap[0][-1] if heap else None
+
+    def top_for_source(self, source: str) -> Optional[QueuedAlert]:
+        """The highest-priority alert from one source."""
+        entries = [self._entries[fingerprint] for fingerprint in self._by_source.get(source, ())]
+        return min(entries, key=self._order, default=None)
+
+    def for_source(self, source: str) -> List[QueuedAlert]:
+        """All queued alerts from one source, highest priority first."""
+        return sorted((self._entries[fingerprint] for fingerprint in self._by_source.get(source, ())),
+                      key=self._order)
+
+    @staticmethod
+    def _order(entry: QueuedAlert) -> tuple:
+        return tuple(-value for value in entry.priority), entry.sequence
+
+    def ordered(self) -> List[QueuedAlert]:
+        """All queued alerts, highest priority first."""
+        return sorted(self._entries.values(), key=self._order)
+
+    def current(self) -> Optional[QueuedAlert]:
+        """
+        The alert the display rotation is on. A new top alert always takes over the
+        rotation, so the most critical alert is shown first.
+        """
+        top = self.top()
+        if top is None:
+            self._rotation = self._last_top = None
+            return None
+        if top.key.fingerprint != self._last_top or self._rotation not in self._entries:
+            self._rotation = self._last_top = top.key.fingerprint
+        return self._entries[self._rotation]
+
+    def advance(self) -> Optional[QueuedAlert]:
+        """Move the rotation to the next alert in priority order, wrapping to the top."""
+        current = self.current()
+        if current is None:
+            return None
+        ordered = self.ordered()
+        index = ordered.index(current)
+        self._rotation = ordered[(index + 1) % len(ordered)].key.fingerprint
+        return self._entries[self._rotation]
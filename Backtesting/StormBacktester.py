@@ -0,0 +1,339 @@
+"""
+Replay historical pressure series through the StormDetector rules and sweep thresholds.
+
+The detection rules are evaluated as NumPy array operations over the whole
+series at once: every sample is treated as a detector tick, with the same
+1-hour, 3-hour and 15-minute windows, stabilization check, acceleration checks
+and thresholds as StormDetector._check_for_storm. Parameter grids are swept in
+parallel with a process pool.
+
+Run from the project root (requires numpy):
+    python -m Backtesting.StormBacktester history.csv pressure_readings.db \\
+        --events storms.csv --one-hour 4,5,6 --three-hour 7,9,11 --min-readings 10,20
+"""
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import logging
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from Detection.StormDetector import StormDetector
+
+
+@dataclass(frozen=True)
+class DetectorParameters:
+    one_hour_threshold: float = StormDetector.ONE_HOUR_PRESSURE_DROP_THRESHOLD
+    three_hour_threshold: float = StormDetector.THREE_HOUR_PRESSURE_DROP_THRESHOLD
+    min_readings: int = StormDetector.MIN_READINGS_REQUIRED
+
+
+@dataclass
+class BacktestResult:
+    parameters: DetectorParameters
+    detections: int             # Ticks on which the detector would have notified
+    alert_episodes: int         # Runs of detections, split when the alert would have expired
+    events: int
+    events_detected: int
+    false_positives: int        # Episodes that matched no event
+    mean_lead_minutes: Optional[float]
+    median_lead_minutes: Optional[float]
+
+
+def _parse_timestamp(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.datetime.fromisoformat(value.strip())
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        return parsed.timestamp()
+
+
+def load_csv(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load a CSV of timestamp,pressure rows. Timestamps may be epoch seconds or
+    ISO 8601 (naive values are taken as UTC). A header row is skipped.
+    """
+    timestamps = []
+    pressures = []
+    with open(path, newline='') as file:
+        for row in csv.reader(file):
+            if len(row) < 2:
+                continue
+            try:
+                pressure = float(row[1])
+                timestamp = _parse_timestamp(row[0])
+            except ValueError:
+                continue
+            timestamps.append(timestamp)
+            pressures.append(pressure)
+    return np.asarray(timestamps, dtype=np.float64), np.asarray(pressures, dtype=np.float64)
+
+
+def load_database(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Load an exported pressure_readings.db, read-only, in any schema version."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # The original schema stored CURRENT_TIMESTAMP text, which is UTC
+            rows = conn.execute(
+                "SELECT CAST(strftime('%s', timestamp) AS REAL), pressure FROM pressure_readings "
+                "WHERE timestamp IS NOT NULL").fetchall()
+        else:
+            rows = conn.execute("SELECT timestamp, pressure FROM pressure_readings").fetchall()
+            if version >= 3:
+                # History older than the raw readings survives as 1-minute rollups, the
+                # detector's own sampling interval; replay their means at mid-bucket.
+                rows += conn.execute(
+                    "SELECT bucket + resolution / 2.0, mean FROM pressure_rollups "
+                    "WHERE resolution = 60 AND bucket + resolution <= "
+                    "(SELECT COALESCE(MIN(timestamp), 1e300) FROM pressure_readings)").fetchall()
+    finally:
+        conn.close()
+    data = np.asarray(rows, dtype=np.float64).reshape(-1, 2)
+    return data[:, 0], data[:, 1]
+
+
+def load_series(paths: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Load and merge any number of CSV and SQLite files into one time-ordered series."""
+    all_timestamps = []
+    all_pressures = []
+    for path in paths:
+        if path.endswith(('.db', '.sqlite', '.sqlite3')):
+            timestamps, pressures = load_database(path)
+        else:
+            timestamps, pressures = load_csv(path)
+        all_timestamps.append(timestamps)
+        all_pressures.append(pressures)
+    timestamps = np.concatenate(all_timestamps) if all_timestamps else np.empty(0)
+    pressures = np.concatenate(all_pressures) if all_pressures else np.empty(0)
+    order = np.argsort(timestamps, kind='stable')
+    return timestamps[order], pressures[order]
+
+
+def load_events(path: str) -> np.ndarray:
+    """Load storm event times, one timestamp per row in the first column."""
+    events = []
+    with open(path, newline='') as file:
+        for row in csv.reader(file):
+            if not row:
+                continue
+            try:
+                events.append(_parse_timestamp(row[0]))
+            except ValueError:
+                continue
+    return np.sort(np.asarray(events, dtype=np.float64))
+
+
+class WindowIndex:
+    """
+    Window boundaries for every tick, shared by all parameter sets.
+
+    For tick i each window spans [start[i], i]; starts are found with one
+    searchsorted call per window instead of a scan per tick.
+    """
+
+    def __init__(self, timestamps: np.ndarray):
+        self.newest = np.arange(len(timestamps))
+        self.hour_start = np.searchsorted(timestamps, timestamps - 60 * 60, side='left')
+        self.three_hour_start = np.searchsorted(timestamps, timestamps - StormDetector.WINDOW_SECONDS, side='left')
+        self.recent_start = np.searchsorted(timestamps, timestamps - 15 * 60, side='left')
+
+
+def _segment_rates(pressures: np.ndarray, start: np.ndarray, end: np.ndarray, segments: int):
+    """
+    Vectorized RollingTrendStatistics.segment_rates for windows [start, end].
+
+    Returns:
+        Tuple of (early rate, late rate, valid mask)
+    """
+    n = end - start + 1
+    early_length = n // segments
+    late_length = -(-n // segments)
+    valid = (early_length >= 2) & (late_length >= 2)
+    early_length = np.maximum(early_length, 1)
+    late_length = np.maximum(late_length, 1)
+    early_rate = (pressures[start + early_length - 1] - pressures[start]) / early_length
+    late_rate = (pressures[end] - pressures[end - late_length + 1]) / late_length
+    return early_rate, late_rate, valid
+
+
+def detect(timestamps: np.ndarray, pressures: np.ndarray, parameters: DetectorParameters,
+           index: Optional[WindowIndex] = None) -> np.ndarray:
+    """
+    Evaluate the StormDetector rules at every sample.
+
+    Returns:
+        Boolean array, True where the detector would have called notify_storm
+    """
+    if index is None:
+        index = WindowIndex(timestamps)
+    newest = index.newest
+    hour_count = newest - index.hour_start + 1
+    three_hour_count = newest - index.three_hour_start + 1
+    recent_count = newest - index.recent_start + 1
+
+    newest_pressure = pressures
+    one_hour_change = newest_pressure - pressures[index.hour_start]
+    three_hour_change = newest_pressure - pressures[index.three_hour_start]
+    recent_change = newest_pressure - pressures[index.recent_start]
+    previous_pressure = pressures[np.maximum(newest - 1, 0)]
+
+    enough_readings = (hour_count >= parameters.min_readings) & (three_hour_count >= parameters.min_readings)
+    stabilized = (recent_count >= 5) & (recent_change >= -0.5)
+    not_falling = (hour_count >= 2) & (newest_pressure >= previous_pressure)
+
+    early, late, valid = _segment_rates(pressures, index.hour_start, newest, 2)
+    accelerating_hour = (hour_count >= 10) & valid & (late < early * 1.5)
+    early, late, valid = _segment_rates(pressures, index.three_hour_start, newest, 3)
+    accelerating = (three_hour_count >= 20) & valid & (late < early * 1.5)
+
+    one_hour_alert = ((one_hour_change < -parameters.one_hour_threshold)
+                      & (accelerating_hour | (one_hour_change <= -StormDetector.EXTREME_ONE_HOUR_PRESSURE_DROP)))
+    three_hour_alert = ((three_hour_change < -parameters.three_hour_threshold)
+                        & (accelerating | (three_hour_change <= -StormDetector.EXTREME_THREE_HOUR_PRESSURE_DROP)))
+
+    return enough_readings & ~stabilized & ~not_falling & (one_hour_alert | three_hour_alert)
+
+
+def alert_episode_starts(timestamps: np.ndarray, detections: np.ndarray, alert_seconds: float) -> np.ndarray:
+    """
+    Start times of alert episodes. A detection extends the current alert, as
+    Alerter does with local_storm_time_to_live_minutes; a detection after the
+    alert has lapsed starts a new episode.
+    """
+    detection_times = timestamps[detections]
+    if len(detection_times) == 0:
+        return detection_times
+    new_episode = np.empty(len(detection_times), dtype=bool)
+    new_episode[0] = True
+    new_episode[1:] = np.diff(detection_times) >= alert_seconds
+    return detection_times[new_episode]
+
+
+def score(parameters: DetectorParameters, detections: np.ndarray, timestamps: np.ndarray,
+          events: np.ndarray, alert_seconds: float, max_lead_seconds: float,
+          late_seconds: float) -> BacktestResult:
+    """
+    Match alert episodes to events. An episode that starts between max_lead_seconds
+    before and late_seconds after an event counts toward that event; the earliest
+    such episode sets the lead time.
+    """
+    starts = alert_episode_starts(timestamps, detections, alert_seconds)
+    leads = []
+    matched = np.zeros(len(starts), dtype=bool)
+    if len(starts):
+        lower = np.searchsorted(starts, events - max_lead_seconds, side='left')
+        upper = np.searchsorted(starts, events + late_seconds, side='right')
+        for event, lo, hi in zip(events, lower, upper):
+            if hi > lo:
+                matched[lo:hi] = True
+                leads.append((event - starts[lo]) / 60)
+    return BacktestResult(
+        parameters=parameters,
+        detections=int(detections.sum()),
+        alert_episodes=len(starts),
+        events=len(events),
+        events_detected=len(leads),
+        false_positives=int((~matched).sum()) if len(events) else len(starts),
+        mean_lead_minutes=float(np.mean(leads)) if leads else None,
+        median_lead_minutes=float(np.median(leads)) if leads else None,
+    )
+
+
+# Series shared with pool workers through the initializer, so each task only ships its parameters
+_worker_state: Dict[str, object] = {}
+
+
+def _init_worker(timestamps, pressures, events, alert_seconds, max_lead_seconds, late_seconds):
+    _worker_state.update(timestamps=timestamps, pressures=pressures, events=events,
+                         index=WindowIndex(timestamps), alert_seconds=alert_seconds,
+                         max_lead_seconds=max_lead_seconds, late_seconds=late_seconds)
+
+
+def _run_one(parameters: DetectorParameters) -> BacktestResult:
+    state = _worker_state
+    detections = detect(state['timestamps'], state['pressures'], parameters, state['index'])
+    return score(parameters, detections, state['timestamps'], state['events'],
+                 state['alert_seconds'], state['max_lead_seconds'], state['late_seconds'])
+
+
+def sweep(timestamps: np.ndarray, pressures: np.ndarray, grid: Sequence[DetectorParameters],
+          events: Optional[np.ndarray] = None, alert_seconds: float = 30 * 60,
+          max_lead_seconds: float = 3 * 60 * 60, late_seconds: float = 30 * 60,
+          workers: Optional[int] = None) -> List[BacktestResult]:
+    """
+    Backtest every parameter set in the grid, in parallel.
+
+    Args:
+        workers: Process count; 1 runs in-process
+    """
+    if events is None:
+        events = np.empty(0)
+    init_args = (timestamps, pressures, events, alert_seconds, max_lead_seconds, late_seconds)
+    if workers == 1 or len(grid) == 1:
+        _init_worker(*init_args)
+        return [_run_one(parameters) for parameters in grid]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+        return list(pool.map(_run_one, grid))
+
+
+def _float_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(',') if v.strip()]
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Backtest StormDetector thresholds against historical pressure data.")
+    parser.add_argument('series', nargs='+', help="CSV (timestamp,pressure) or exported pressure_readings.db files")
+    parser.add_argument('--events', help="CSV of observed storm times, one timestamp per row")
+    parser.add_argument('--one-hour', type=_float_list, default=[StormDetector.ONE_HOUR_PRESSURE_DROP_THRESHOLD])
+    parser.add_argument('--three-hour', type=_float_list, default=[StormDetector.THREE_HOUR_PRESSURE_DROP_THRESHOLD])
+    parser.add_argument('--min-readings', type=_int_list, default=[StormDetector.MIN_READINGS_REQUIRED])
+    parser.add_argument('--max-lead-minutes', type=float, default=180)
+    parser.add_argument('--late-minutes', type=float, default=30)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    timestamps, pressures = load_series(args.series)
+    if len(timestamps) == 0:
+        print("No readings loaded", file=sys.stderr)
+        return 1
+    events = load_events(args.events) if args.events else np.empty(0)
+    grid = [DetectorParameters(one, three, minimum)
+            for one, three, minimum in itertools.product(args.one_hour, args.three_hour, args.min_readings)]
+    results = sweep(timestamps, pressures, grid, events,
+                    max_lead_seconds=args.max_lead_minutes * 60,
+                    late_seconds=args.late_minutes * 60,
+                    workers=args.workers)
+
+    if args.json:
+        print(json.dumps([asdict(result) for result in results], indent=2))
+        return 0
+    print(f"{len(timestamps)} readings, {len(events)} events, {len(grid)} parameter sets")
+    print(f"{'1h':>5} {'3h':>5} {'min':>4} {'ticks':>7} {'alerts':>7} {'hit':>5} {'FP':>5} {'lead(min)':>10}")
+    for result in results:
+        lead = f"{result.median_lead_minutes:.0f}" if result.median_lead_minutes is not None else "-"
+        hits = f"{result.events_detected}/{result.events}" if result.events else "-"
+        print(f"{result.parameters.one_hour_threshold:>5g} {result.parameters.three_hour_threshold:>5g} "
+              f"{result.parameters.min_readings:>4} {result.detections:>7} {result.alert_episodes:>7} "
+              f"{hits:>5} {result.false_positives:>5} {lead:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
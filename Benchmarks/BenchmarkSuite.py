@@ -0,0 +1,258 @@
+"""
+Offline benchmark suite for the alert and storm-detection hot paths.
+
+Everything runs against stand-ins: a StubWeatherBoxServer on localhost, a
+FakeSenseHat pressure trace and a NullDisplay, in a temporary directory, so the
+suite needs no hardware or network. It measures:
+
+- one Alerter.process_alerts cycle, per-cycle latency percentiles, against an instant
+  server and one with a 50 ms round trip (where ten locations should cost about one)
+- PressureDatabase and PressureRecordStore operations per second at several table sizes
+- StormDetector per-sample and evaluation cost against window length
+- peak traced Python memory for each section (in a separate, shorter pass, since
+  tracing slows everything down), and the process's peak RSS
+
+Results are written as JSON so runs from different commits can be compared.
+
+Run from the project root:
+    python -m Benchmarks.BenchmarkSuite --output benchmark.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from Benchmarks.FakeDevices import FakeSenseHat, NullDisplay
+from Benchmarks.StubWeatherBoxServer import StubWeatherBoxServer
+from Detection.PressureDatabase import PressureDatabase
+from Detection.PressureRecordStore import PressureRecordStore
+from Detection.StormDetector import StormDetector
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentiles(durations: List[float]) -> dict:
+    """Latency summary in milliseconds using nearest-rank percentiles."""
+    ordered = sorted(durations)
+    summary = {"count": len(ordered), "mean_ms": sum(ordered) / len(ordered) * 1000}
+    for p in PERCENTILES:
+        rank = max(0, -(-p * len(ordered) // 100) - 1)
+        summary[f"p{p}_ms"] = ordered[rank] * 1000
+    summary["max_ms"] = ordered[-1] * 1000
+    return summary
+
+
+def _peak_traced_kb(section: Callable[[], object]) -> float:
+    """Run a benchmark section under tracemalloc and return its peak traced allocation."""
+    tracemalloc.start()
+    try:
+        section()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def bench_process_alerts(cycles: int, locations: int, delay_seconds: float = 0.0) -> dict:
+    """
+    Time full process_alerts cycles with every location due, against the stub server.
+
+    With a delay_seconds round trip, concurrent fetches should finish a cycle in about
+    one delay whatever the number of locations; what is left over is per-location CPU.
+    """
+    from main import Alerter
+
+    server = StubWeatherBoxServer(delay_seconds=delay_seconds).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "config.txt")
+        with open(config_path, "w") as file:
+            file.write(server.url + "\n")
+            for i in range(locations):
+                file.write(f"tn\ncity{i}\n")
+        display = NullDisplay()
+        alerter = Alerter(display, config_path=config_path)
+        try:
+            from Configuration.AlerterConfig import AlerterConfig
+            alerter.apply_config(AlerterConfig.load(config_path))
+            alerter.process_alerts()    # First request connects and primes the conditional-GET cache
+            server.reset_stats()
+            durations = []
+            for _ in range(cycles):
+                now = time.monotonic()
+                for location in alerter.locations:
+                    location.next_check = now
+                start = time.perf_counter()
+                alerter.process_alerts()
+                durations.append(time.perf_counter() - start)
+        finally:
+            alerter.shutdown()
+            server.stop()
+    result = percentiles(durations)
+    result.update({"locations": locations, "delay_ms": delay_seconds * 1000, "requests": server.requests,
+                   "connections": server.connections, "not_modified": server.not_modified})
+    return result
+
+
+def _prefill(db: PressureDatabase, rows: int, now: float):
+    """Fill the table with rows spread evenly over the retention period."""
+    spacing = db.RETENTION_SECONDS / rows
+    conn = db._get_connection()
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO pressure_readings (timestamp, pressure) VALUES (?, ?)",
+                     ((now - db.RETENTION_SECONDS + i * spacing, 1013.0) for i in range(rows)))
+    conn.execute("COMMIT")
+
+
+def _ops_per_second(operation: Callable[[], object], seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        operation()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def bench_database(table_sizes: List[int], seconds: float) -> Dict[str, dict]:
+    results = {}
+    for rows in table_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = PressureDatabase(os.path.join(tmp, "bench.db"))
+            try:
+                now = time.time()
+                _prefill(db, rows, now)
+                # Inserts go last so the read and delete figures see the prefilled size
+                results[str(rows)] = {
+                    "last_hour_per_s": _ops_per_second(db.get_readings_last_hour, seconds),
+                    "last_three_hours_per_s": _ops_per_second(db.get_readings_last_three_hours, seconds),
+                    "delete_old_per_s": _ops_per_second(db.delete_old_readings, seconds),
+                    "insert_per_s": _ops_per_second(lambda: db.insert_reading(1013.0, time.time()), seconds),
+                }
+            finally:
+                db.close()
+    return results
+
+
+def bench_record_store(table_sizes: List[int], seconds: float) -> Dict[str, dict]:
+    """The same operations as bench_database against a full memory-mapped record store."""
+    results = {}
+    for rows in table_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PressureRecordStore(os.path.join(tmp, "bench.rec"), capacity=rows)
+            try:
+                now = time.time()
+                spacing = PressureDatabase.RETENTION_SECONDS / rows
+                store.extend((now - PressureDatabase.RETENTION_SECONDS + i * spacing, 1013.0, 1013.0, 1013.0, 1013.0, 1)
+                             for i in range(rows))
+                results[str(rows)] = {
+                    "last_hour_per_s": _ops_per_second(store.get_readings_last_hour, seconds),
+                    "last_three_hours_per_s": _ops_per_second(store.get_readings_last_three_hours, seconds),
+                    "insert_per_s": _ops_per_second(lambda: store.insert_reading(1013.0, time.time()), seconds),
+                }
+            finally:
+                store.close()
+    return results
+
+
+def bench_detector(window_hours: List[int], samples: int) -> Dict[str, dict]:
+    """
+    Per-sample cost of StormDetector with its longest window set to each length,
+    after the window has been filled with a full window of readings.
+    """
+    results = {}
+    for hours in window_hours:
+        detector_class = type(f"StormDetector{hours}h", (StormDetector,), {"WINDOW_SECONDS": hours * 3600})
+        with tempfile.TemporaryDirectory() as tmp:
+            detector = detector_class(db_path=os.path.join(tmp, "bench.db"))
+            sense = FakeSenseHat(storm_after=detector.WINDOW_SECONDS // detector.SAMPLE_INTERVAL_SECONDS)
+            try:
+                start_time = time.time() - detector.WINDOW_SECONDS
+                fill = detector.WINDOW_SECONDS // detector.SAMPLE_INTERVAL_SECONDS
+                for i in range(fill):
+                    detector.process_reading(sense.get_pressure(), start_time + i * detector.SAMPLE_INTERVAL_SECONDS)
+                sample_durations = []
+                check_durations = []
+                for i in range(fill, fill + samples):
+                    now = start_time + i * detector.SAMPLE_INTERVAL_SECONDS
+                    pressure = sense.get_pressure()
+                    start = time.perf_counter()
+                    detector.process_reading(pressure, now)
+                    sample_durations.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    detector._check_for_storm()
+                    check_durations.append(time.perf_counter() - start)
+            finally:
+                detector._db.close()
+        results[f"{hours}h"] = {
+            "window_readings": detector._three_hour_window.count,
+            "process_reading": percentiles(sample_durations),
+            "check_for_storm": percentiles(check_durations),
+        }
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(quick: bool = False) -> dict:
+    cycles = 50 if quick else 300
+    seconds = 0.2 if quick else 1.0
+    table_sizes = [1000, 10000] if quick else [1000, 10000, 100000]
+    window_hours = [1, 3] if quick else [1, 3, 6, 12]
+    samples = 100 if quick else 500
+    results = {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "quick": quick,
+        "process_alerts": {
+            "single_location": bench_process_alerts(cycles, 1),
+            "ten_locations": bench_process_alerts(cycles, 10),
+            # A 50 ms server: ten locations should take about as long as one
+            "single_location_50ms": bench_process_alerts(cycles // 5, 1, 0.05),
+            "ten_locations_50ms": bench_process_alerts(cycles // 5, 10, 0.05),
+        },
+        "database": bench_database(table_sizes, seconds),
+        "record_store": bench_record_store(table_sizes, seconds),
+        "detector": bench_detector(window_hours, samples),
+        "peak_traced_kb": {
+            "process_alerts": _peak_traced_kb(lambda: bench_process_alerts(20, 10)),
+            "database": _peak_traced_kb(lambda: bench_database([table_sizes[-1]], 0.05)),
+            "detector": _peak_traced_kb(lambda: bench_detector([window_hours[-1]], 20)),
+        },
+    }
+    # ru_maxrss is kilobytes on Linux
+    results["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the alert and detection hot paths offline.")
+    parser.add_argument("--output", help="Write results to this JSON file (default: stdout)")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for a fast sanity check")
+    args = parser.parse_args(argv)
+    results = run(quick=args.quick)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Hardware stand-ins for offline benchmarks: a SenseHat pressure source and a display that draws nothing.
+"""
+import math
+import random
+from typing import Optional
+
+from Display.IDisplay import IDisplay
+
+
+class FakeSenseHat:
+    """
+    Produces a repeatable barometric trace: a slow daily swing, sensor noise and,
+    optionally, a storm-like drop, one reading per get_pressure() call.
+    """
+
+    def __init__(self, seed: int = 1, base_pressure: float = 1013.0, storm_after: Optional[int] = None):
+        """
+        Args:
+            seed: Random seed for the noise, so runs are reproducible
+            base_pressure: Mean pressure in millibars
+            storm_after: Reading index at which pressure starts falling ~6 mb/hour; None for calm weather
+        """
+        self._random = random.Random(seed)
+        self.base_pressure = base_pressure
+        self.storm_after = storm_after
+        self.readings = 0
+
+    def get_pressure(self) -> float:
+        i = self.readings
+        self.readings += 1
+        pressure = self.base_pressure + 2.0 * math.sin(i * 2 * math.pi / 1440) + self._random.gauss(0, 0.1)
+        if self.storm_after is not None and i >= self.storm_after:
+            pressure -= (i - self.storm_after) * 0.1
+        return pressure
+
+
+class NullDisplay(IDisplay):
+    """An IDisplay that counts calls and draws nothing."""
+
+    def __init__(self):
+        self.messages = 0
+        self.clears = 0
+        self.heartbeats = 0
+
+    def display_message(self, title: str, message: str = "", detail: str = "", color=None):
+        self.messages += 1
+
+    def clear_display(self):
+        self.clears += 1
+
+    def heartbeat(self):
+        self.heartbeats += 1
+
+    @property
+    def supports_long_message(self) -> bool:
+        return True
@@ -0,0 +1,107 @@
+"""
+Micro-benchmark for one StormDetector cycle against PressureDatabase.
+
+A cycle is what StormDetector.run does every minute: insert a reading, delete
+old readings, then fetch the one- and three-hour windows. The "before" numbers
+come from a connect-per-call implementation equivalent to the original class.
+
+Run from the project root:
+    python -m Benchmarks.PressureDatabaseBenchmark
+"""
+import datetime
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from Detection.PressureDatabase import PressureDatabase
+
+
+class ConnectPerCallDatabase:
+    """The original open/commit/close-per-call access pattern, kept for comparison."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS pressure_readings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pressure INTEGER NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def insert_reading(self, pressure: int):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO pressure_readings (pressure) VALUES (?)", (pressure,))
+        conn.commit()
+        conn.close()
+
+    def _select_since(self, hours: int):
+        conn = sqlite3.connect(self.db_path)
+        since = datetime.datetime.now() - datetime.timedelta(hours=hours)
+        rows = conn.execute(
+            "SELECT pressure, timestamp FROM pressure_readings WHERE timestamp >= ? ORDER BY timestamp",
+            (since.strftime("%Y-%m-%d %H:%M:%S"),)).fetchall()
+        conn.close()
+        return [(p, datetime.datetime.strptime(t, "%Y-%m-%d %H:%M:%S")) for p, t in rows]
+
+    def get_readings_last_hour(self):
+        return self._select_since(1)
+
+    def get_readings_last_three_hours(self):
+        return self._select_since(3)
+
+    def delete_old_readings(self):
+        conn = sqlite3.connect(self.db_path)
+        since = datetime.datetime.now() - datetime.timedelta(hours=5)
+        conn.execute("DELETE FROM pressure_readings WHERE timestamp < ?",
+                     (since.strftime("%Y-%m-%d %H:%M:%S"),))
+        conn.commit()
+        conn.close()
+
+    def close(self):
+        pass
+
+
+def run_cycles(db, cycles: int) -> list:
+    """Run detector-style cycles against db and return per-cycle durations in seconds."""
+    durations = []
+    for i in range(cycles):
+        start = time.perf_counter()
+        db.insert_reading(1000 + (i % 20))
+        db.delete_old_readings()
+        db.get_readings_last_hour()
+        db.get_readings_last_three_hours()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def benchmark(cycles: int = 300) -> dict:
+    results = {}
+    for name, factory in (("before", ConnectPerCallDatabase), ("after", PressureDatabase)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = factory(os.path.join(tmp, "bench.db"))
+            try:
+                durations = run_cycles(db, cycles)
+            finally:
+                db.close()
+        results[name] = {
+            "cycles": cycles,
+            "mean_ms": statistics.mean(durations) * 1000,
+            "median_ms": statistics.median(durations) * 1000,
+            "max_ms": max(durations) * 1000,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    for name, stats in results.items():
+        print(f"{name:>6}: mean {stats['mean_ms']:.3f} ms, median {stats['median_ms']:.3f} ms, "
+              f"max {stats['max_ms']:.3f} ms over {stats['cycles']} cycles")
+    speedup = results["before"]["mean_ms"] / results["after"]["mean_ms"]
+    print(f"speedup: {speedup:.1f}x")
@@ -0,0 +1,125 @@
+"""
+A local stand-in for the WeatherBox API, for offline benchmarks.
+
+Serves /weather-alert/{state}/{city} over HTTP/1.1 keep-alive, supports ETag
+revalidation and gzip, and counts connections, requests and bytes sent.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+SAMPLE_ALERT = {
+    "city": "knoxville", "state": "tn", "latitude": 35.96, "longitude": -83.92,
+    "headline": "Severe Thunderstorm Warning issued for Knox County",
+    "event": "Severe Thunderstorm Warning", "severity": "Severe", "severity_score": 3,
+    "urgency": "Immediate", "urgency_score": 4, "certainty": "Observed", "certainty_score": 4,
+    "expires": "2030-01-01T00:00:00-05:00",
+    "description": "At 5:12 PM EDT, a severe thunderstorm was located near Knoxville. " * 8,
+    "instruction": "For your protection move to an interior room on the lowest floor of a building. " * 4,
+    "nws_headline": "SEVERE THUNDERSTORM WARNING IN EFFECT UNTIL 6 PM EDT FOR KNOX COUNTY",
+}
+
+
+class _CountingWriter:
+    def __init__(self, wrapped, server):
+        self._wrapped = wrapped
+        self._server = server
+
+    def write(self, data):
+        with self._server.stats_lock:
+            self._server.bytes_sent += len(data)
+        return self._wrapped.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+        self.wfile = _CountingWriter(self.wfile, self.server)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.stats_lock:
+            server.requests += 1
+            body = server.body
+            etag = server.etag
+        if server.delay_seconds:
+            time.sleep(server.delay_seconds)
+        if self.headers.get("If-None-Match") == etag:
+            with server.stats_lock:
+                server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        encoding = None
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            encoding = "gzip"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubWeatherBoxServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, alert: Optional[dict] = None, delay_seconds: float = 0.0):
+        """
+        Args:
+            alert: JSON document to serve; defaults to SAMPLE_ALERT
+            delay_seconds: Artificial per-request latency
+        """
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.stats_lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.delay_seconds = delay_seconds
+        self.set_alert(SAMPLE_ALERT if alert is None else alert)
+        self._thread: Optional[threading.Thread] = None
+
+    def set_alert(self, alert: dict):
+        body = json.dumps(alert).encode()
+        with self.stats_lock:
+            self.body = body
+            self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.connections = self.requests = self.not_modified = self.bytes_sent = 0
+
+    def start(self) -> "StubWeatherBoxServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,60 @@
+"""
+Compare per-poll cost of bare requests.get against WeatherBoxClient.
+
+Both run against a local StubWeatherBoxServer serving an unchanged alert, and
+the server counts TCP connections and bytes sent.
+
+Run from the project root:
+    python -m Benchmarks.WeatherBoxClientBenchmark
+"""
+import statistics
+import time
+
+import requests
+
+from Benchmarks.StubWeatherBoxServer import StubWeatherBoxServer
+from WeatherBox.WeatherBoxClient import WeatherBoxClient
+
+
+def _measure(server: StubWeatherBoxServer, fetch, polls: int) -> dict:
+    server.reset_stats()
+    durations = []
+    for _ in range(polls):
+        start = time.perf_counter()
+        fetch()
+        durations.append(time.perf_counter() - start)
+    return {
+        "polls": polls,
+        "mean_ms": statistics.mean(durations) * 1000,
+        "connections": server.connections,
+        "bytes_sent": server.bytes_sent,
+        "not_modified": server.not_modified,
+    }
+
+
+def benchmark(polls: int = 200) -> dict:
+    server = StubWeatherBoxServer().start()
+    url = f"{server.url}/weather-alert/tn/knoxville"
+    try:
+        def bare_get():
+            response = requests.get(url)
+            response.raise_for_status()
+            return response.json()
+
+        client = WeatherBoxClient()
+        try:
+            results = {
+                "before": _measure(server, bare_get, polls),
+                "after": _measure(server, lambda: client.get_json(url), polls),
+            }
+        finally:
+            client.close()
+    finally:
+        server.stop()
+    return results
+
+
+if __name__ == "__main__":
+    for name, stats in benchmark().items():
+        print(f"{name:>6}: mean {stats['mean_ms']:.3f} ms/poll, {stats['connections']} connections, "
+              f"{stats['bytes_sent']} bytes sent, {stats['not_modified']} x 304 over {stats['polls']} polls")
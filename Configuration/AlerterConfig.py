@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class Location:
+    state: str
+    city: str
+
+
+@dataclass(frozen=True)
+class AlerterConfig:
+    """
+    Parsed contents of config.txt: the WeatherBox server on the first line,
+    followed by one or more state / municipality line pairs.
+    """
+    weather_box_server: str
+    locations: Tuple[Location, ...]
+
+    def api_url(self, location: Location) -> str:
+        return f"{self.weather_box_server}/weather-alert/{location.state}/{location.city}"
+
+    @classmethod
+    def parse(cls, text: str) -> "AlerterConfig":
+        """
+        Parse and validate config file text.
+
+        Raises:
+            ValueError: If the text is not a server line followed by state/municipality pairs
+        """
+        lines = [line.strip() for line in text.strip().split('\n') if line.strip()]
+        if len(lines) < 3 or (len(lines) - 1) % 2:
+            raise ValueError("config.txt must contain a server line followed by state and municipality line pairs")
+        server = lines[0].rstrip('/')
+        if not server.startswith(("http://", "https://")):
+            raise ValueError(f"WeatherBox server must be an http:// or https:// URL, got {lines[0]!r}")
+        locations = tuple(Location(lines[i], lines[i + 1]) for i in range(1, len(lines), 2))
+        return cls(server, locations)
+
+    @classmethod
+    def load(cls, path: str) -> "AlerterConfig":
+        with open(path, 'r') as file:
+            return cls.parse(file.read())
@@ -0,0 +1,176 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+from typing import Callable, Optional, Tuple
+
+from Configuration.AlerterConfig import AlerterConfig
+
+
+# inotify constants from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class ConfigWatcher:
+    """
+    Holds the current AlerterConfig and reloads it only when the file changes.
+
+    Changes are detected with inotify on the config file's directory (so editors
+    that save by rename are seen too), falling back to polling os.stat where
+    inotify is unavailable. A reload that fails to parse is logged and ignored,
+    leaving the previous configuration in place. The new config is published with
+    a single reference swap, so readers always see a complete config.
+    """
+
+    POLL_INTERVAL_SECONDS = 5
+    STOP_TIMEOUT_SECONDS = 5
+
+    def __init__(self, path: str, on_change: Optional[Callable[[AlerterConfig], None]] = None):
+        """
+        Args:
+            path: Path to config.txt
+            on_change: Called from the watcher thread after a changed config is loaded
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the initial contents are invalid
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = os.path.abspath(path)
+        self._on_change = on_change
+        self._signature = self._stat_signature()
+        self._config: AlerterConfig = AlerterConfig.load(self.path)
+        self._stop_event = threading.Event()
+        self._stop_read_fd, self._stop_write_fd = os.pipe()
+        # Guards closing the stop pipe, so stop() never writes to a recycled descriptor
+        self._pipe_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def config(self) -> AlerterConfig:
+        return self._config
+
+    @property
+    def thread(self) -> Optional[threading.Thread]:
+        """The watcher thread, or None before start()."""
+        return self._thread
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Wake and join the watcher thread, then close the stop pipe."""
+        self._stop_event.set()
+        with self._pipe_lock:
+            if self._stop_write_fd is None:
+                return
+            try:
+                os.write(self._stop_write_fd, b"x")
+            except OSError:
+                pass
+        thread = self._thread
+        if thread is not None:
+            if thread is not threading.current_thread():
+                thread.join(self.STOP_TIMEOUT_SECONDS)
+            if thread.is_alive():
+                # Still using the read end; leave the pipe to the process exit
+                return
+        with self._pipe_lock:
+            if self._stop_write_fd is not None:
+                os.close(self._stop_read_fd)
+                os.close(self._stop_write_fd)
+                self._stop_read_fd = self._stop_write_fd = None
+
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def check_for_changes(self) -> bool:
+        """
+        Reload the config if the file's mtime, size or inode changed.
+
+        Returns:
+            True if a new config was loaded
+        """
+        signature = self._stat_signature()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            config = AlerterConfig.load(self.path)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Ignoring invalid config change in {self.path}: {e}")
+            return False
+        if config == self._config:
+            return False
+        self._config = config
+        self.logger.info(f"Configuration reloaded from {self.path}")
+        if self._on_change:
+            self._on_change(config)
+        return True
+
+    def _run(self):
+        try:
+            if not self._watch_with_inotify():
+                self._watch_with_polling()
+        except Exception as e:
+            self.logger.error(f"Config watcher stopped: {e}", exc_info=True)
+
+    def _watch_with_polling(self):
+        self.logger.info(f"Watching {self.path} by polling every {self.POLL_INTERVAL_SECONDS} seconds")
+        while not self._stop_event.wait(self.POLL_INTERVAL_SECONDS):
+            self.check_for_changes()
+
+    def _watch_with_inotify(self) -> bool:
+        """Block on inotify events for the config directory. Returns False if inotify is unavailable."""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            inotify_fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return False
+        if inotify_fd < 0:
+            return False
+        try:
+            directory, filename = os.path.split(self.path)
+            mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_DELETE
+            if libc.inotify_add_watch(inotify_fd, directory.encode(), mask) < 0:
+                return False
+            self.logger.info(f"Watching {self.path} with inotify")
+            target = filename.encode()
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([inotify_fd, self._stop_read_fd], [], [])
+                if self._stop_read_fd in readable:
+                    break
+                try:
+                    data = os.read(inotify_fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                if target in self._event_names(data):
+                    self.check_for_changes()
+            return True
+        finally:
+            os.close(inotify_fd)
+
+    @staticmethod
+    def _event_names(data: bytes) -> set:
+        names = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.add(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+        return names
@@ -0,0 +1,58 @@
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from Detection.PressureAggregate import PressureAggregate
+
+
+class IPressureStore(ABC):
+    """Persistent storage for the storm detector's pressure readings."""
+
+    @abstractmethod
+    def insert_reading(self, pressure: float, timestamp: Optional[float] = None):
+        pass
+
+    @abstractmethod
+    def insert_aggregate(self, aggregate: PressureAggregate):
+        pass
+
+    @abstractmethod
+    def get_readings_since(self, since: float) -> List[Tuple[float, float]]:
+        """Readings taken at or after since, oldest first, as (pressure, timestamp) tuples."""
+        pass
+
+    @abstractmethod
+    def get_history(self, since: float, until: Optional[float] = None) -> List[Tuple[float, float]]:
+        """The longest history the store keeps for a range, oldest first, as (pressure, timestamp) tuples."""
+        pass
+
+    @abstractmethod
+    def maintain(self, now: Optional[float] = None) -> int:
+        """Periodic housekeeping; returns the number of readings discarded."""
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+    def get_readings_last_hour(self) -> List[Tuple[float, float]]:
+        """
+        Get all pressure readings from the last hour.
+
+        Returns:
+            List of tuples containing (pressure, timestamp in epoch seconds)
+        """
+        return self.get_readings_since(time.time() - 60 * 60)
+
+    def get_readings_last_three_hours(self) -> List[Tuple[float, float]]:
+        """
+        Get all pressure readings from the last three hours.
+
+        Returns:
+            List of tuples containing (pressure, timestamp in epoch seconds)
+        """
+        return self.get_readings_since(time.time() - 3 * 60 * 60)
+
+    def delete_old_readings(self) -> int:
+        """Discard readings past their retention; see maintain()."""
+        return self.maintain()
@@ -0,0 +1,30 @@
+import math
+import statistics
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+
+@dataclass(frozen=True)
+class PressureAggregate:
+    """Summary of the sensor samples taken during one storage interval."""
+    timestamp: float    # Unix epoch seconds at the end of the interval
+    median: float       # millibars; robust to the odd spike, so it is what the detector uses
+    mean: float
+    minimum: float
+    maximum: float
+    count: int
+
+    @classmethod
+    def from_samples(cls, timestamp: float, samples: Sequence[float]) -> Optional["PressureAggregate"]:
+        """
+        Reduce raw samples to an aggregate, ignoring readings the sensor reports
+        before it is ready (zero) or that are not finite.
+
+        Returns:
+            The aggregate, or None if no usable samples remain
+        """
+        usable = [sample for sample in samples if sample > 0 and math.isfinite(sample)]
+        if not usable:
+            return None
+        return cls(timestamp, statistics.median(usable), statistics.fmean(usable),
+                   min(usable), max(usable), len(usable))
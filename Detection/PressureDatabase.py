@@ -1,118 +1,386 @@
 import sqlite3
-import datetime
-from typing import List, Tuple
+import threading
+import time
+from typing import List, Optional, Tuple
 
+from Detection.IPressureStore import IPressureStore
+from Detection.PressureAggregate import PressureAggregate
+from Metrics.MetricsRegistry import REGISTRY
 
-class PressureDatabase:
+_QUERY_SECONDS = REGISTRY.histogram("pressure_database_query_seconds",
+                                    "Time spent in PressureDatabase statements", labels=("operation",))
+_INSERT_SECONDS = _QUERY_SECONDS.labels("insert")
+_SELECT_SECONDS = _QUERY_SECONDS.labels("select")
+_DELETE_SECONDS = _QUERY_SECONDS.labels("delete")
+_ROLLUP_SECONDS = _QUERY_SECONDS.labels("rollup")
+_VACUUM_SECONDS = _QUERY_SECONDS.labels("vacuum")
+_LIVE_BYTES = REGISTRY.gauge("pressure_database_live_bytes",
+                             "Bytes of the pressure database in use, measured after each maintenance pass")
+
+
+class PressureDatabase(IPressureStore):
     """
     A class to manage an SQLite database for storing pressure readings in millibars
     with timestamps.
+
+    Each thread that uses the database gets its own long-lived connection, opened
+    in WAL journal mode, so the per-reading cost is a single statement instead of
+    a connect/commit/close round-trip.
+
+    History is kept in tiers: raw readings for RETENTION_SECONDS, then rollups at
+    each resolution in ROLLUP_TIERS. maintain() rolls up the buckets completed
+    since its last pass, deletes expired rows in small batches, trims the oldest
+    rollups if live data exceeds MAX_DATABASE_BYTES, and returns freed pages to
+    the filesystem with an incremental vacuum, so the file stays a fixed size.
     """
 
-    def __init__(self, db_path: str = "pressure_readings.db"):
+    DEFAULT_PATH = "pressure_readings.db"
+
+    # Connection tuning applied once when a thread's connection is opened
+    JOURNAL_MODE = "WAL"
+    SYNCHRONOUS = "NORMAL"      # WAL + NORMAL only fsyncs at checkpoints
+    CACHE_SIZE_KB = 2048        # Negative cache_size in SQLite means KiB
+    STATEMENT_CACHE_SIZE = 32   # Prepared statements kept per connection
+
+    # Stored in PRAGMA user_version. Version 3 adds the pressure_rollups table;
+    # version 2 adds per-minute aggregate columns; version 1 keys readings by REAL
+    # epoch seconds in an indexed column; version 0 is the original DATETIME text schema.
+    SCHEMA_VERSION = 3
+    # Raw readings are kept longer than the detector's longest window
+    RETENTION_SECONDS = 5 * 60 * 60
+    # (bucket seconds, retention seconds), finest first; each tier is rolled up from the one before it
+    ROLLUP_TIERS = (
+        (60, 7 * 24 * 60 * 60),
+        (15 * 60, 400 * 24 * 60 * 60),
+    )
+    # Hard cap on live data; the oldest rollups are trimmed beyond it
+    MAX_DATABASE_BYTES = 16 * 1024 * 1024
+    # Rows per DELETE, so maintenance never holds the write lock for long
+    DELETE_BATCH_ROWS = 500
+
+    _INSERT_SQL = "INSERT INTO pressure_readings (timestamp, pressure) VALUES (?, ?)"
+    _INSERT_AGGREGATE_SQL = ("INSERT INTO pressure_readings (timestamp, pressure, mean, minimum, maximum, samples) "
+                             "VALUES (?, ?, ?, ?, ?, ?)")
+    _SELECT_SINCE_SQL = "SELECT pressure, timestamp FROM pressure_readings WHERE timestamp >= ? ORDER BY timestamp"
+    _DELETE_BEFORE_SQL = ("DELETE FROM pressure_readings WHERE rowid IN "
+                          "(SELECT rowid FROM pressure_readings WHERE timestamp < ? ORDER BY timestamp LIMIT ?)")
+    _FIRST_READING_SQL = "SELECT MIN(timestamp) FROM pressure_readings"
+
+    # Aggregated rows carry their own statistics; single readings count as one sample
+    _ROLLUP_READINGS_SQL = '''
+    INSERT OR IGNORE INTO pressure_rollups (resolution, bucket, mean, minimum, maximum, samples)
+    SELECT :resolution, CAST(timestamp / :resolution AS INTEGER) * :resolution AS start,
+           SUM(COALESCE(mean, pressure) * COALESCE(samples, 1)) / SUM(COALESCE(samples, 1)),
+           MIN(COALESCE(minimum, pressure)), MAX(COALESCE(maximum, pressure)), SUM(COALESCE(samples, 1))
+    FROM pressure_readings
+    WHERE timestamp >= :since AND timestamp < :until
+    GROUP BY start
+    '''
+    _ROLLUP_ROLLUPS_SQL = '''
+    INSERT OR IGNORE INTO pressure_rollups (resolution, bucket, mean, minimum, maximum, samples)
+    SELECT :resolution, bucket / :resolution * :resolution AS start,
+           SUM(mean * samples) / SUM(samples), MIN(minimum), MAX(maximum), SUM(samples)
+    FROM pressure_rollups
+    WHERE resolution = :source AND bucket >= :since AND bucket < :until
+    GROUP BY start
+    '''
+    _FIRST_ROLLUP_SQL = "SELECT MIN(bucket) FROM pressure_rollups WHERE resolution = ?"
+    _LAST_ROLLUP_SQL = "SELECT MAX(bucket) FROM pressure_rollups WHERE resolution = ?"
+    # Rollups are reported at the middle of their bucket
+    _SELECT_ROLLUPS_SQL = ("SELECT mean, bucket + resolution / 2.0 FROM pressure_rollups "
+                           "WHERE resolution = ? AND bucket >= ? AND bucket <= ? ORDER BY bucket")
+    _DELETE_ROLLUPS_BEFORE_SQL = ("DELETE FROM pressure_rollups WHERE resolution = ? AND bucket IN "
+                                  "(SELECT bucket FROM pressure_rollups WHERE resolution = ? AND bucket < ? "
+                                  "ORDER BY bucket LIMIT ?)")
+    _DELETE_OLDEST_ROLLUPS_SQL = ("DELETE FROM pressure_rollups WHERE (resolution, bucket) IN "
+                                  "(SELECT resolution, bucket FROM pressure_rollups ORDER BY bucket LIMIT ?)")
+
+    def __init__(self, db_path: str = DEFAULT_PATH):
         """
         Initialize the database connection and create the table if it doesn't exist.
-        
+
         Args:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._create_table()
 
+    def _get_connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening and tuning it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        # check_same_thread is disabled only so close() may run from the shutdown
+        # thread; each connection is otherwise used solely by the thread that opened it.
+        # isolation_level=None puts the connection in autocommit mode, so each
+        # statement is its own transaction without an explicit commit().
+        conn = sqlite3.connect(self.db_path,
+                               check_same_thread=False,
+                               isolation_level=None,
+                               cached_statements=self.STATEMENT_CACHE_SIZE)
+        conn.execute(f"PRAGMA journal_mode={self.JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous={self.SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size=-{self.CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
     def _create_table(self):
-        """Create the pressure readings table if it doesn't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS pressure_readings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            pressure INTEGER NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        """Create the pressure readings table, migrating an older schema in place."""
+        conn = self._get_connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < self.SCHEMA_VERSION:
+            self._migrate(conn)
+        self._enable_incremental_vacuum(conn)
+
+    def _migrate(self, conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the write lock
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= self.SCHEMA_VERSION:
+                conn.execute("COMMIT")
+                return
+            if version < 1:
+                self._migrate_to_v1(conn)
+            if version < 2:
+                self._migrate_to_v2(conn)
+            if version < 3:
+                self._migrate_to_v3(conn)
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _migrate_to_v1(conn: sqlite3.Connection):
+        legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pressure_readings'"
+        ).fetchone() is not None
+        if legacy:
+            conn.execute("ALTER TABLE pressure_readings RENAME TO pressure_readings_v0")
+        conn.execute('''
+        CREATE TABLE pressure_readings (
+            timestamp REAL NOT NULL,    -- Unix epoch seconds (UTC)
+            pressure REAL NOT NULL      -- millibars
         )
         ''')
-        
-        conn.commit()
-        conn.close()
+        conn.execute("CREATE INDEX idx_pressure_readings_timestamp ON pressure_readings (timestamp)")
+        if legacy:
+            # CURRENT_TIMESTAMP wrote UTC text, which strftime('%s') reads back as UTC
+            conn.execute('''
+            INSERT INTO pressure_readings (timestamp, pressure)
+            SELECT CAST(strftime('%s', timestamp) AS REAL), pressure
+            FROM pressure_readings_v0
+            WHERE timestamp IS NOT NULL
+            ORDER BY timestamp
+            ''')
+            conn.execute("DROP TABLE pressure_readings_v0")
+
+    @staticmethod
+    def _migrate_to_v2(conn: sqlite3.Connection):
+        # pressure holds the interval median for aggregated rows; the extra columns
+        # are NULL for single readings and for rows written before version 2
+        conn.execute("ALTER TABLE pressure_readings ADD COLUMN mean REAL")
+        conn.execute("ALTER TABLE pressure_readings ADD COLUMN minimum REAL")
+        conn.execute("ALTER TABLE pressure_readings ADD COLUMN maximum REAL")
+        conn.execute("ALTER TABLE pressure_readings ADD COLUMN samples INTEGER")
+
+    @staticmethod
+    def _migrate_to_v3(conn: sqlite3.Connection):
+        conn.execute('''
+        CREATE TABLE pressure_rollups (
+            resolution INTEGER NOT NULL,    -- bucket length in seconds
+            bucket INTEGER NOT NULL,        -- bucket start, Unix epoch seconds (UTC)
+            mean REAL NOT NULL,             -- millibars, weighted by sensor samples
+            minimum REAL NOT NULL,
+            maximum REAL NOT NULL,
+            samples INTEGER NOT NULL,
+            PRIMARY KEY (resolution, bucket)
+        ) WITHOUT ROWID
+        ''')
+
+    @staticmethod
+    def _enable_incremental_vacuum(conn: sqlite3.Connection):
+        """Switch the file to incremental auto-vacuum, which takes one full VACUUM to apply."""
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        try:
+            conn.execute("VACUUM")
+        except sqlite3.OperationalError:
+            # Another connection is mid-transaction; try again the next time the database is opened
+            pass
 
-    def insert_reading(self, pressure: int):
+    def close(self):
+        """Close every connection opened by this database, from any thread."""
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def insert_reading(self, pressure: float, timestamp: Optional[float] = None):
         """
         Insert a new pressure reading into the database.
-        
+
         Args:
             pressure: Pressure reading in millibars
+            timestamp: Unix epoch seconds of the reading; defaults to now
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "INSERT INTO pressure_readings (pressure) VALUES (?)",
-            (pressure,)
-        )
-        
-        conn.commit()
-        conn.close()
+        if timestamp is None:
+            timestamp = time.time()
+        with _INSERT_SECONDS.time():
+            self._get_connection().execute(self._INSERT_SQL, (timestamp, pressure))
 
-    def get_readings_last_hour(self) -> List[Tuple[int, datetime.datetime]]:
+    def insert_aggregate(self, aggregate: PressureAggregate):
         """
-        Get all pressure readings from the last hour.
-        
-        Returns:
-            List of tuples containing (pressure, timestamp)
+        Insert one interval's aggregate as a single row; its median is the row's pressure.
+
+        Args:
+            aggregate: Summary of the sensor samples taken during the interval
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        one_hour_ago = datetime.datetime.now() - datetime.timedelta(hours=1)
-        
-        cursor.execute(
-            "SELECT pressure, timestamp FROM pressure_readings WHERE timestamp >= ? ORDER BY timestamp",
-            (one_hour_ago.strftime("%Y-%m-%d %H:%M:%S"),)
-        )
-        
-        results = [(row['pressure'], datetime.datetime.strptime(row['timestamp'], "%Y-%m-%d %H:%M:%S")) 
-                  for row in cursor.fetchall()]
-        
-        conn.close()
-        return results
-
-    def get_readings_last_three_hours(self) -> List[Tuple[int, datetime.datetime]]:
+        with _INSERT_SECONDS.time():
+            self._get_connection().execute(self._INSERT_AGGREGATE_SQL, (
+                aggregate.timestamp, aggregate.median, aggregate.mean,
+                aggregate.minimum, aggregate.maximum, aggregate.count))
+
+    def get_readings_since(self, since: float) -> List[Tuple[float, float]]:
         """
-        Get all pressure readings from the last three hours.
+        Get all pressure readings taken at or after the given time, oldest first.
+
+        Args:
+            since: Unix epoch seconds
 
         Returns:
-            List of tuples containing (pressure, timestamp)
+            List of tuples containing (pressure, timestamp in epoch seconds)
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with _SELECT_SECONDS.time():
+            return self._get_connection().execute(self._SELECT_SINCE_SQL, (since,)).fetchall()
 
-        three_hours_ago = datetime.datetime.now() - datetime.timedelta(hours=3)
+    def get_history(self, since: float, until: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        Get pressure history at the finest resolution still stored for each part of the range.
 
-        cursor.execute(
-            "SELECT pressure, timestamp FROM pressure_readings WHERE timestamp >= ? ORDER BY timestamp",
-            (three_hours_ago.strftime("%Y-%m-%d %H:%M:%S"),)
-        )
+        Raw readings cover the most recent RETENTION_SECONDS. Before the oldest raw
+        reading the 1-minute rollups are used, and before those the 15-minute rollups;
+        a rollup contributes its mean, timestamped at the middle of its bucket.
 
-        results = [(row['pressure'], datetime.datetime.strptime(row['timestamp'], "%Y-%m-%d %H:%M:%S"))
-                   for row in cursor.fetchall()]
+        Args:
+            since: Unix epoch seconds
+            until: Unix epoch seconds; defaults to now
 
-        conn.close()
-        return results
+        Returns:
+            List of tuples containing (pressure, timestamp in epoch seconds), oldest first
+        """
+        if until is None:
+            until = time.time()
+        conn = self._get_connection()
+        with _SELECT_SECONDS.time():
+            parts = [conn.execute("SELECT pressure, timestamp FROM pressure_readings "
+                                  "WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+                                  (since, until)).fetchall()]
+            # Each coarser tier only fills in whole buckets before the finer data starts
+            first = conn.execute(self._FIRST_READING_SQL).fetchone()[0]
+            end = until if first is None else min(first, until)
+            for resolution, _ in self.ROLLUP_TIERS:
+                if end <= since:
+                    break
+                parts.append(conn.execute(self._SELECT_ROLLUPS_SQL, (resolution, since, end - resolution)).fetchall())
+                first = conn.execute(self._FIRST_ROLLUP_SQL, (resolution,)).fetchone()[0]
+                if first is not None:
+                    end = min(end, first)
+        history = []
+        for part in reversed(parts):
+            history.extend(part)
+        return history
 
+    def maintain(self, now: Optional[float] = None) -> int:
+        """
+        Roll up completed buckets, enforce retention and the size cap, and shrink the file.
 
-    def delete_old_readings(self):
-        """Delete all readings older than 5 hours."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        Each step works in small batches of autocommit statements, so readers and the
+        next insert are never blocked for long. Rows are only deleted from a tier after
+        they have been rolled up into the next one.
 
-        five_hours_ago = datetime.datetime.now() - datetime.timedelta(hours=5)
+        Args:
+            now: Unix epoch seconds to measure retention from; defaults to now
 
-        cursor.execute(
-            "DELETE FROM pressure_readings WHERE timestamp < ?",
-            (five_hours_ago.strftime("%Y-%m-%d %H:%M:%S"),)
-        )
+        Returns:
+            Number of rows deleted
+        """
+        if now is None:
+            now = time.time()
+        conn = self._get_connection()
+        self.roll_up(now)
+        deleted = self._delete_in_batches(self._DELETE_BEFORE_SQL, (now - self.RETENTION_SECONDS,))
+        for resolution, retention in self.ROLLUP_TIERS:
+            deleted += self._delete_in_batches(self._DELETE_ROLLUPS_BEFORE_SQL,
+                                               (resolution, resolution, now - retention))
+        while self._live_bytes(conn) > self.MAX_DATABASE_BYTES:
+            trimmed = self._delete_in_batches(self._DELETE_OLDEST_ROLLUPS_SQL, (), once=True)
+            if not trimmed:
+                break
+            deleted += trimmed
+        if deleted:
+            with _VACUUM_SECONDS.time():
+                # executescript steps the pragma to completion; execute() frees a single page
+                conn.executescript("PRAGMA incremental_vacuum;")
+                # Checkpoint so the shrunk pages reach the main file and the WAL is truncated too
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        _LIVE_BYTES.set(self._live_bytes(conn))
+        return deleted
+
+    def roll_up(self, now: Optional[float] = None):
+        """
+        Summarize every bucket completed since the last roll-up into each tier in ROLLUP_TIERS.
+
+        Args:
+            now: Unix epoch seconds; only buckets ending at or before this are rolled up
+        """
+        if now is None:
+            now = time.time()
+        conn = self._get_connection()
+        source = None
+        with _ROLLUP_SECONDS.time():
+            for resolution, _ in self.ROLLUP_TIERS:
+                last = conn.execute(self._LAST_ROLLUP_SQL, (resolution,)).fetchone()[0]
+                if last is not None:
+                    since = last + resolution
+                elif source is None:
+                    since = conn.execute(self._FIRST_READING_SQL).fetchone()[0]
+                else:
+                    since = conn.execute(self._FIRST_ROLLUP_SQL, (source,)).fetchone()[0]
+                until = now // resolution * resolution
+                if since is not None and since < until:
+                    sql = self._ROLLUP_READINGS_SQL if source is None else self._ROLLUP_ROLLUPS_SQL
+                    conn.execute(sql, {"resolution": resolution, "source": source, "since": since, "until": until})
+                source = resolution
+
+    def _delete_in_batches(self, sql: str, parameters: tuple, once: bool = False) -> int:
+        """Run a DELETE that ends in LIMIT ? until it deletes fewer than a full batch."""
+        conn = self._get_connection()
+        deleted = 0
+        with _DELETE_SECONDS.time():
+            while True:
+                count = conn.execute(sql, parameters + (self.DELETE_BATCH_ROWS,)).rowcount
+                deleted += count
+                if once or count < self.DELETE_BATCH_ROWS:
+                    return deleted
 
-        conn.commit()
-        conn.close()
\ No newline at end of file
+    @staticmethod
+    def _live_bytes(conn: sqlite3.Connection) -> int:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
@@ -0,0 +1,321 @@
+"""
+Memory-mapped, fixed-record pressure store, and a converter from pressure_readings.db.
+
+Convert an existing database (run from the project root):
+    python -m Detection.PressureRecordStore pressure_readings.db pressure_readings.rec
+"""
+import argparse
+import mmap
+import os
+import sqlite3
+import struct
+import time
+import zlib
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+
+from Detection.IPressureStore import IPressureStore
+from Detection.PressureAggregate import PressureAggregate
+
+# A record is eight little-endian doubles, so the mapping can be viewed as an (n, 8) array
+SEQUENCE, TIMESTAMP, PRESSURE, MEAN, MINIMUM, MAXIMUM, SAMPLES, CHECKSUM = range(8)
+_FIELDS = struct.Struct("<7d")
+_CHECKSUM = struct.Struct("<d")
+_RECORD_SIZE = _FIELDS.size + _CHECKSUM.size
+_HEADER = struct.Struct("<8sII")
+
+
+class PressureRecordStore(IPressureStore):
+    """
+    A circular file of fixed-size pressure records, memory-mapped and written in place.
+
+    The header holds only the file's geometry and is written once, atomically, when
+    the file is created. Each record carries its own sequence number and CRC-32, so an
+    append is a single write of one record into the mapping and a record torn by a
+    crash is simply ignored when the file is reopened. Reading sequence s lives in
+    slot s % capacity; once the file is full the oldest reading is overwritten.
+
+    Only one thread may write; windows are returned as zero-copy views of the mapping.
+    Unlike PressureDatabase there are no rollups: history is the last capacity readings.
+    """
+
+    DEFAULT_PATH = "pressure_readings.rec"
+    DEFAULT_CAPACITY = 7 * 24 * 60     # A week of one-minute readings, 630 KiB
+    MAGIC = b"PRESREC1"
+    VERSION = 1
+    HEADER_SIZE = 64                   # Keeps records aligned to their size
+
+    def __init__(self, path: str = DEFAULT_PATH, capacity: int = DEFAULT_CAPACITY):
+        """
+        Open the store, creating it with the given capacity if it does not exist.
+
+        Args:
+            path: Path to the record file
+            capacity: Readings retained by a new file; an existing file keeps its own
+
+        Raises:
+            ValueError: If the file exists but is not a record store this version can read
+        """
+        self.path = path
+        if not os.path.exists(path):
+            self._create(path, capacity)
+        self._file = open(path, "r+b")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+        magic, version, capacity = _HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC or version != self.VERSION or \
+                len(self._map) != self.HEADER_SIZE + capacity * _RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a version {self.VERSION} pressure record file")
+        self.capacity = capacity
+        self._flat = memoryview(self._map)[self.HEADER_SIZE:].cast("d")
+        self._records = self._flat.cast("B").cast("d", (capacity, 8))
+        self._oldest, self._total = self._recover()
+
+    @classmethod
+    def _create(cls, path: str, capacity: int):
+        """Write an empty file under a temporary name and rename it into place."""
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(_HEADER.pack(cls.MAGIC, cls.VERSION, capacity).ljust(cls.HEADER_SIZE, b"\0"))
+            file.truncate(cls.HEADER_SIZE + capacity * _RECORD_SIZE)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def _is_valid(self, slot: int, sequence: Optional[int] = None) -> bool:
+        offset = self.HEADER_SIZE + slot * _RECORD_SIZE
+        if zlib.crc32(self._map[offset:offset + _FIELDS.size]) != self._flat[slot * 8 + CHECKSUM]:
+            return False
+        return sequence is None or self._flat[slot * 8 + SEQUENCE] == sequence
+
+    def _recover(self) -> Tuple[int, int]:
+        """Find the newest intact record; returns (oldest sequence, next sequence)."""
+        capacity = self.capacity
+        sequences = self._flat[SEQUENCE::8].tolist()
+        # A record can only be the newest if it sits in its own slot; the checksum
+        # then rules out one torn by a crash mid-write.
+        candidates = sorted(((sequence, slot) for slot, sequence in enumerate(sequences)
+                             if sequence.is_integer() and int(sequence) % capacity == slot), reverse=True)
+        for sequence, slot in candidates:
+            if self._is_valid(slot):
+                total = int(sequence) + 1
+                oldest = max(0, total - capacity)
+                # The write that was torn, if any, overwrote the oldest reading's slot
+                if not self._is_valid(oldest % capacity, oldest):
+                    oldest += 1
+                return oldest, total
+        return 0, 0
+
+    def __len__(self) -> int:
+        return self._total - self._oldest
+
+    def close(self):
+        """Flush and unmap the file. Views returned by window() must not be used afterwards."""
+        for name in ("_records", "_flat"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+                setattr(self, name, None)
+        if not self._map.closed:
+            self._map.flush()
+            try:
+                self._map.close()
+            except BufferError:
+                # A caller still holds a window view; the mapping is freed with it
+                pass
+        self._file.close()
+
+    def _append(self, timestamp: float, pressure: float, mean: float, minimum: float, maximum: float,
+                samples: int):
+        sequence = self._total
+        fields = _FIELDS.pack(sequence, timestamp, pressure, mean, minimum, maximum, samples)
+        offset = self.HEADER_SIZE + (sequence % self.capacity) * _RECORD_SIZE
+        self._map[offset:offset + _RECORD_SIZE] = fields + _CHECKSUM.pack(zlib.crc32(fields))
+        self._total = sequence + 1
+        self._oldest = max(self._oldest, self._total - self.capacity)
+
+    def insert_reading(self, pressure: float, timestamp: Optional[float] = None):
+        """
+        Append a single pressure reading.
+
+        Args:
+            pressure: Pressure reading in millibars
+            timestamp: Unix epoch seconds of the reading; defaults to now
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self._append(timestamp, pressure, pressure, pressure, pressure, 1)
+
+    def insert_aggregate(self, aggregate: PressureAggregate):
+        """
+        Append one interval's aggregate; its median is the record's pressure.
+
+        Args:
+            aggregate: Summary of the sensor samples taken during the interval
+        """
+        self._append(aggregate.timestamp, aggregate.median, aggregate.mean,
+                     aggregate.minimum, aggregate.maximum, aggregate.count)
+
+    def _first_sequence_since(self, since: float) -> int:
+        return self._oldest + bisect_left(_SequenceTimestamps(self), since)
+
+    def window(self, since: float) -> Tuple[memoryview, ...]:
+        """
+        Get the records taken at or after the given time as zero-copy views, oldest first.
+
+        Each view is an (n, 8) memoryview of doubles indexed by SEQUENCE, TIMESTAMP,
+        PRESSURE, MEAN, MINIMUM, MAXIMUM, SAMPLES and CHECKSUM; numpy.asarray() wraps
+        one without copying. A window that wraps past the end of the file comes back
+        as two views. Views alias the file and later appends may overwrite them.
+
+        Args:
+            since: Unix epoch seconds
+
+        Returns:
+            One or two views, or none if no records match
+        """
+        return tuple(self._records[start:end] for start, end in self._slot_ranges(self._first_sequence_since(since)))
+
+    def _slot_ranges(self, first: int) -> List[Tuple[int, int]]:
+        """Slot ranges holding sequences first onwards, oldest first; two if they wrap."""
+        if first >= self._total:
+            return []
+        start = first % self.capacity
+        end = start + (self._total - first)
+        if end <= self.capacity:
+            return [(start, end)]
+        return [(start, self.capacity), (0, end - self.capacity)]
+
+    def get_readings_since(self, since: float) -> List[Tuple[float, float]]:
+        """
+        Get all pressure readings taken at or after the given time, oldest first.
+
+        Args:
+            since: Unix epoch seconds
+
+        Returns:
+            List of tuples containing (pressure, timestamp in epoch seconds)
+        """
+        first = self._first_sequence_since(since)
+        readings = []
+        # Strided column slices of the flat view copy only the two fields needed
+        for start, end in self._slot_ranges(first):
+            readings.extend(zip(self._flat[start * 8 + PRESSURE:end * 8:8].tolist(),
+                                self._flat[start * 8 + TIMESTAMP:end * 8:8].tolist()))
+        return readings
+
+    def get_history(self, since: float, until: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        Get the stored readings in a time range, oldest first.
+
+        Returns:
+            List of tuples containing (pressure, timestamp in epoch seconds)
+        """
+        readings = self.get_readings_since(since)
+        if until is None:
+            return readings
+        return [reading for reading in readings if reading[1] < until]
+
+    def maintain(self, now: Optional[float] = None) -> int:
+        """
+        Ask the kernel to write dirty pages back. Old readings are overwritten in
+        place, so there is nothing to delete and the file never grows.
+
+        Returns:
+            0; no readings are discarded here
+        """
+        self._map.flush()
+        return 0
+
+    def extend(self, rows: Iterable[Tuple[float, float, float, float, float, int]]):
+        """
+        Append (timestamp, pressure, mean, minimum, maximum, samples) rows in timestamp order.
+        """
+        for row in rows:
+            self._append(*row)
+
+
+class _SequenceTimestamps:
+    """Timestamps of the retained records as a sequence ordered for bisect, without copying them."""
+
+    def __init__(self, store: PressureRecordStore):
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __getitem__(self, index: int) -> float:
+        store = self._store
+        return store._flat[(store._oldest + index) % store.capacity * 8 + TIMESTAMP]
+
+
+def _database_rows(db_path: str) -> List[Tuple[float, float, float, float, float, int]]:
+    """Read a pressure_readings.db, read-only, as record rows in timestamp order."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            raise ValueError(f"{db_path} uses the original schema; start the alerter once to migrate it")
+        rows = []
+        if version >= 3:
+            # Older history survives only as 1-minute rollups
+            rows = conn.execute(
+                "SELECT bucket + resolution / 2.0, mean, mean, minimum, maximum, samples FROM pressure_rollups "
+                "WHERE resolution = 60 AND bucket + resolution <= "
+                "(SELECT COALESCE(MIN(timestamp), 1e300) FROM pressure_readings) ORDER BY bucket").fetchall()
+        if version >= 2:
+            rows += conn.execute(
+                "SELECT timestamp, pressure, COALESCE(mean, pressure), COALESCE(minimum, pressure), "
+                "COALESCE(maximum, pressure), COALESCE(samples, 1) FROM pressure_readings ORDER BY timestamp"
+            ).fetchall()
+        else:
+            rows += conn.execute(
+                "SELECT timestamp, pressure, pressure, pressure, pressure, 1 FROM pressure_readings "
+                "ORDER BY timestamp").fetchall()
+        return rows
+    finally:
+        conn.close()
+
+
+def convert(db_path: str, store_path: str, capacity: int = PressureRecordStore.DEFAULT_CAPACITY) -> int:
+    """
+    Copy the readings in a pressure_readings.db into a new record store.
+
+    Only the newest capacity readings fit; older ones are dropped.
+
+    Returns:
+        Number of readings written
+
+    Raises:
+        FileExistsError: If store_path already exists
+    """
+    if os.path.exists(store_path):
+        raise FileExistsError(f"{store_path} already exists")
+    rows = _database_rows(db_path)[-capacity:]
+    store = PressureRecordStore(store_path, capacity)
+    try:
+        store.extend(rows)
+    finally:
+        store.close()
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a pressure_readings.db into a pressure record file.")
+    parser.add_argument("database", help="Existing SQLite pressure database")
+    parser.add_argument("output", help="Record file to create")
+    parser.add_argument("--capacity", type=int, default=PressureRecordStore.DEFAULT_CAPACITY,
+                        help="Readings the file holds (default: %(default)s)")
+    args = parser.parse_args(argv)
+    count = convert(args.database, args.output, args.capacity)
+    print(f"Wrote {count} readings to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
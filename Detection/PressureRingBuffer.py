@@ -0,0 +1,78 @@
+from array import array
+from typing import Iterable, Tuple
+
+
+class PressureRingBuffer:
+    """
+    A fixed-capacity, in-memory ring of the most recent (timestamp, pressure) readings.
+
+    Values live in two flat arrays of doubles and are addressed by sequence number,
+    so a reader can walk a window of readings without copying them.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Maximum number of readings retained; older readings are overwritten
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._pressures = array('d', bytes(8 * capacity))
+        self._next = 0      # Slot the next reading is written to
+        self._count = 0
+        self._total = 0     # Readings ever appended; also the sequence number of the next one
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, pressure: float):
+        """
+        Add a reading. Readings must be appended in timestamp order.
+
+        Args:
+            timestamp: Unix epoch seconds
+            pressure: Pressure in millibars
+        """
+        slot = self._next
+        self._timestamps[slot] = timestamp
+        self._pressures[slot] = pressure
+        self._next = (slot + 1) % self.capacity
+        self._total += 1
+        if self._count < self.capacity:
+            self._count += 1
+
+    @property
+    def total(self) -> int:
+        """Number of readings ever appended, i.e. the sequence number the next reading will get."""
+        return self._total
+
+    @property
+    def oldest_sequence(self) -> int:
+        """Sequence number of the oldest reading still retained."""
+        return self._total - self._count
+
+    def timestamp_at(self, sequence: int) -> float:
+        """Timestamp of a retained reading by its sequence number."""
+        return self._timestamps[self._slot(sequence)]
+
+    def pressure_at(self, sequence: int) -> float:
+        """Pressure of a retained reading by its sequence number."""
+        return self._pressures[self._slot(sequence)]
+
+    def _slot(self, sequence: int) -> int:
+        if not self.oldest_sequence <= sequence < self._total:
+            raise IndexError(f"reading {sequence} is no longer retained")
+        return sequence % self.capacity
+
+    def extend(self, readings: Iterable[Tuple[float, float]]):
+        """
+        Add readings in the (pressure, timestamp) form returned by PressureDatabase.
+
+        Args:
+            readings: Iterable of (pressure, timestamp) tuples sorted by timestamp
+        """
+        for pressure, timestamp in readings:
+            self.append(timestamp, pressure)
+
@@ -0,0 +1,87 @@
+import logging
+import math
+import threading
+import time
+from typing import Callable, List, Optional
+
+from Detection.PressureAggregate import PressureAggregate
+from Metrics.MetricsRegistry import REGISTRY
+
+_SENSOR_READS = REGISTRY.counter("pressure_sampler_reads_total", "Pressure sensor reads by the sampler")
+_SENSOR_ERRORS = REGISTRY.counter("pressure_sampler_errors_total", "Pressure sensor reads that raised")
+
+
+class PressureSampler:
+    """
+    Reads the pressure sensor at a steady high rate on its own thread and hands
+    one PressureAggregate per interval to a callback.
+
+    Sample times and interval ends are fixed offsets from the start on the
+    monotonic clock, so a slow read does not shift every later sample or interval.
+    """
+
+    def __init__(self, read_pressure: Callable[[], float], on_aggregate: Callable[[PressureAggregate], None],
+                 sample_rate_hz: float = 4.0, interval_seconds: float = 60):
+        """
+        Args:
+            read_pressure: Returns the current pressure in millibars, e.g. SenseHat.get_pressure
+            on_aggregate: Called from the sampler thread at the end of each interval that had usable samples
+            sample_rate_hz: Sensor reads per second
+            interval_seconds: Length of each aggregated interval
+        """
+        if sample_rate_hz <= 0:
+            raise ValueError("sample_rate_hz must be positive")
+        self.logger = logging.getLogger(__name__)
+        self._read_pressure = read_pressure
+        self._on_aggregate = on_aggregate
+        self.sample_rate_hz = sample_rate_hz
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="pressure-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        period = 1.0 / self.sample_rate_hz
+        samples: List[float] = []
+        start = time.monotonic()
+        next_sample = start
+        interval_end = start + self.interval_seconds
+        while not self._stop_event.is_set():
+            try:
+                samples.append(float(self._read_pressure()))
+                _SENSOR_READS.inc()
+            except Exception as e:
+                _SENSOR_ERRORS.inc()
+                self.logger.error(f"Error reading pressure sensor: {e}", exc_info=True)
+            now = time.monotonic()
+            if now >= interval_end:
+                self._emit(samples)
+                samples = []
+                while interval_end <= now:
+                    interval_end += self.interval_seconds
+            # When a read overran its slot, skip the missed slots rather than bunching reads up
+            next_sample += period
+            if next_sample < now:
+                next_sample = start + math.ceil((now - start) / period) * period
+            self._stop_event.wait(next_sample - now)
+
+    def _emit(self, samples: List[float]):
+        aggregate = PressureAggregate.from_samples(time.time(), samples)
+        if aggregate is None:
+            self.logger.warning("No usable pressure samples in the last interval")
+            return
+        try:
+            self._on_aggregate(aggregate)
+        except Exception as e:
+            self.logger.error(f"Error handling pressure aggregate: {e}", exc_info=True)
@@ -0,0 +1,205 @@
+from collections import deque
+from typing import Optional, Tuple
+
+from Detection.PressureRingBuffer import PressureRingBuffer
+
+
+class RollingTrendStatistics:
+    """
+    Streaming trend statistics for a trailing time window over a PressureRingBuffer.
+
+    Readings enter the window when update() sees them in the buffer and leave it
+    once they are older than the window, adjusting running sums as they go, so each
+    new sample costs amortized constant time regardless of how many readings the
+    window holds. The window tracks readings by buffer sequence number, so any
+    reading inside it is available by position in constant time.
+    """
+
+    def __init__(self, readings: PressureRingBuffer, window_seconds: float):
+        """
+        Args:
+            readings: Buffer the window reads from; must be able to hold a full window
+            window_seconds: Length of the trailing window in seconds
+        """
+        self._readings = readings
+        self.window_seconds = window_seconds
+        self._start = readings.total    # Sequence of the oldest reading in the window
+        self._end = readings.total      # Sequence one past the newest reading in the window
+        self._evictions = 0
+        self._reset_sums(0.0)
+        # Monotonic queues of sequence numbers for the window minimum and maximum
+        self._min_sequences = deque()
+        self._max_sequences = deque()
+
+    def _reset_sums(self, origin: float):
+        # Timestamps are summed relative to an origin near the window so the
+        # least-squares terms keep their precision with epoch-sized values.
+        self._origin = origin
+        self._sum_t = 0.0
+        self._sum_p = 0.0
+        self._sum_tt = 0.0
+        self._sum_tp = 0.0
+
+    def _add_to_sums(self, sequence: int):
+        t = self._readings.timestamp_at(sequence) - self._origin
+        p = self._readings.pressure_at(sequence)
+        self._sum_t += t
+        self._sum_p += p
+        self._sum_tt += t * t
+        self._sum_tp += t * p
+
+    def _remove_from_sums(self, sequence: int):
+        t = self._readings.timestamp_at(sequence) - self._origin
+        p = self._readings.pressure_at(sequence)
+        self._sum_t -= t
+        self._sum_p -= p
+        self._sum_tt -= t * t
+        self._sum_tp -= t * p
+
+    def update(self, now: float):
+        """
+        Bring the window up to date with the buffer and drop readings older than the window.
+
+        Args:
+            now: Unix epoch seconds the window ends at
+        """
+        readings = self._readings
+        # Anything the buffer has already overwritten can no longer be in the window
+        if self._start < readings.oldest_sequence:
+            self._start = self._end = readings.oldest_sequence
+            self._min_sequences.clear()
+            self._max_sequences.clear()
+
+        while self._end < readings.total:
+            sequence = self._end
+            if self._start == sequence:
+                # Window is empty, so restart the sums at this reading
+                self._reset_sums(readings.timestamp_at(sequence))
+            pressure = readings.pressure_at(sequence)
+            self._add_to_sums(sequence)
+            while self._min_sequences and readings.pressure_at(self._min_sequences[-1]) >= pressure:
+                self._min_sequences.pop()
+            self._min_sequences.append(sequence)
+            while self._max_sequences and readings.pressure_at(self._max_sequences[-1]) <= pressure:
+                self._max_sequences.pop()
+            self._max_sequences.append(sequence)
+            self._end += 1
+
+        cutoff = now - self.window_seconds
+        while self._start < self._end and readings.timestamp_at(self._start) < cutoff:
+            self._remove_from_sums(self._start)
+            if self._min_sequences[0] == self._start:
+                self._min_sequences.popleft()
+            if self._max_sequences[0] == self._start:
+                self._max_sequences.popleft()
+            self._start += 1
+            self._evictions += 1
+
+        # Re-sum from scratch once per buffer's worth of evictions so floating point
+        # drift from repeated add/subtract cannot accumulate; amortized O(1).
+        if self._evictions >= readings.capacity:
+            self._evictions = 0
+            self._reset_sums(readings.timestamp_at(self._start) if self._start < self._end else 0.0)
+            for sequence in range(self._start, self._end):
+                self._add_to_sums(sequence)
+
+    @property
+    def count(self) -> int:
+        """Number of readings in the window."""
+        return self._end - self._start
+
+    def __len__(self) -> int:
+        return self.count
+
+    def pressure(self, index: int) -> float:
+        """
+        Pressure at a position in the window, oldest first; negative indexes count from the newest.
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("window index out of range")
+        return self._readings.pressure_at(self._start + index)
+
+    @property
+    def oldest(self) -> float:
+        return self.pressure(0)
+
+    @property
+    def newest(self) -> float:
+        return self.pressure(-1)
+
+    @property
+    def change(self) -> float:
+        """Newest minus oldest pressure in the window, in millibars."""
+        return self.newest - self.oldest
+
+    @property
+    def minimum(self) -> float:
+        return self._readings.pressure_at(self._min_sequences[0])
+
+    @property
+    def maximum(self) -> float:
+        return self._readings.pressure_at(self._max_sequences[0])
+
+    @property
+    def mean(self) -> float:
+        return self._sum_p / self.count
+
+    @property
+    def slope(self) -> Optional[float]:
+        """Least-squares pressure trend in millibars per hour, or None with fewer than two readings."""
+        n = self.count
+        if n < 2:
+            return None
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 0:
+            return None
+        return (n * self._sum_tp - self._sum_t * self._sum_p) / denominator * 3600
+
+    def segment_rate(self, start: int, length: int) -> float:
+        """
+        Average change per reading across a run of readings in the window.
+
+        Args:
+            start: Window index of the first reading; negative counts from the newest
+            length: Number of readings in the run
+
+        Returns:
+            (last - first) / length for the run, matching the detector's rate definition
+        """
+        if start < 0:
+            start += self.count
+        return (self.pressure(start + length - 1) - self.pressure(start)) / length
+
+    def acceleration(self, segments: int) -> Optional[float]:
+        """
+        Difference between the rate of the newest and oldest 1/segments of the window.
+
+        Negative values mean the pressure is falling faster now than at the start of
+        the window. Returns None if either segment has fewer than two readings.
+
+        Args:
+            segments: 2 compares halves, 3 compares the first and last thirds
+        """
+        early, late = self.segment_rates(segments)
+        if early is None:
+            return None
+        return late - early
+
+    def segment_rates(self, segments: int) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Rates of the oldest and newest 1/segments of the window.
+
+        The early segment has n // segments readings and the late segment rounds up,
+        the same split as readings[:n // segments] and readings[-n // segments:].
+
+        Returns:
+            Tuple of (early rate, late rate), or (None, None) if a segment has fewer than two readings
+        """
+        n = self.count
+        early_length = n // segments
+        late_length = -(-n // segments)
+        if early_length < 2 or late_length < 2:
+            return None, None
+        return self.segment_rate(0, early_length), self.segment_rate(n - late_length, late_length)
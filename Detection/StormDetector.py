@@ -1,10 +1,25 @@
 import logging
 import os
-import datetime
-from time import sleep
+import queue
+import threading
+import time
 from typing import Callable, Optional
 
+from Detection.PressureAggregate import PressureAggregate
+from Detection.IPressureStore import IPressureStore
 from Detection.PressureDatabase import PressureDatabase
+from Detection.PressureRecordStore import PressureRecordStore
+from Detection.PressureRingBuffer import PressureRingBuffer
+from Detection.PressureSampler import PressureSampler
+from Detection.RollingTrendStatistics import RollingTrendStatistics
+from Hardware.SenseHatProvider import find_sense_hat
+from Metrics.MetricsRegistry import REGISTRY
+from Metrics.SpanRecorder import SPANS
+
+_SAMPLES = REGISTRY.counter("storm_detector_samples_total", "Pressure samples processed by the storm detector")
+_SAMPLE_ERRORS = REGISTRY.counter("storm_detector_sample_errors_total", "Storm detector loop iterations that raised")
+_EVALUATION_SECONDS = REGISTRY.histogram("storm_detector_evaluation_seconds",
+                                         "Time to update the rolling windows and evaluate storm conditions")
 
 
 class StormDetector:
@@ -12,45 +27,78 @@ class StormDetector:
     # Real storms typically show 3-5+ mb/hour drops, not gradual changes
     THREE_HOUR_PRESSURE_DROP_THRESHOLD = 9  # ~3 mb/hour average
     ONE_HOUR_PRESSURE_DROP_THRESHOLD = 5    # 5 mb/hour
+    # Drops at or beyond these alert even without acceleration
+    EXTREME_ONE_HOUR_PRESSURE_DROP = 8
+    EXTREME_THREE_HOUR_PRESSURE_DROP = 12
     # Minimum number of readings required before we can detect a storm
     MIN_READINGS_REQUIRED = 10  # Need more data for reliable trend analysis
+    # Seconds between stored (aggregated) pressure readings
+    SAMPLE_INTERVAL_SECONDS = 60
+    # Sensor reads per second; each interval's reads are reduced to one aggregate
+    SENSOR_SAMPLE_RATE_HZ = 4.0
+    # Longest window the detector evaluates; the in-memory buffer is sized to hold it
+    WINDOW_SECONDS = 3 * 60 * 60
+    # Seconds between database maintenance passes (roll-up, retention and vacuum)
+    MAINTENANCE_INTERVAL_SECONDS = 15 * 60
+
+    # Storage backends selectable by name; both implement IPressureStore
+    STORES = {
+        "sqlite": PressureDatabase,
+        "mmap": PressureRecordStore,
+    }
 
-    def __init__(self, storm_detected_callback: Optional[Callable[[str], None]] = None, db_path: str = "pressure_readings.db"):
+    def __init__(self, storm_detected_callback: Optional[Callable[[str], None]] = None, db_path: Optional[str] = None,
+                 preferred_sense_hat: Optional[str] = None, sample_rate_hz: Optional[float] = None,
+                 store: str = "sqlite"):
         """
         Initialize StormDetector with an optional callback function.
         Args:
             storm_detected_callback: Optional function that takes a string message parameter
-            db_path: Path to the SQLite database file
+            db_path: Path to the storage file; defaults to the store's DEFAULT_PATH
+            preferred_sense_hat: SenseHat module ("sense_hat" or "sense_emu") to try first
+            sample_rate_hz: Sensor reads per second; defaults to SENSOR_SAMPLE_RATE_HZ
+            store: Storage backend, a key of STORES
+
+        Raises:
+            ValueError: If store is not a known backend
         """
+        if store not in self.STORES:
+            raise ValueError(f"Unknown pressure store {store!r}; expected one of {', '.join(self.STORES)}")
+        store_class = self.STORES[store]
+        if db_path is None:
+            db_path = store_class.DEFAULT_PATH
         # Ensure the DB path is rooted at the project directory so it doesn't depend on cwd
         if not os.path.isabs(db_path):
             project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             db_path = os.path.join(project_root, db_path)
         self._storm_detected_callback = storm_detected_callback
-        self._db = PressureDatabase(db_path)
+        self._db: IPressureStore = store_class(db_path)
         self._sense_hat = None
-        self._sense_hat_present: bool = self._initialize_sense_hat()
-        self._last_pressure: int = 0
+        self.sense_hat_module: Optional[str] = None
+        self._sense_hat_present: bool = self._initialize_sense_hat(preferred_sense_hat)
+        self._last_pressure: float = 0.0
+        self.sample_rate_hz: float = sample_rate_hz or self.SENSOR_SAMPLE_RATE_HZ
+        self._stop_event = threading.Event()
+        self._aggregates: "queue.Queue[Optional[PressureAggregate]]" = queue.Queue()
+        self._next_maintenance: float = 0.0
         self.logger = logging.getLogger(__name__)
+        # Room for one full window plus slack for a few early or jittered samples
+        self._readings = PressureRingBuffer(self.WINDOW_SECONDS // self.SAMPLE_INTERVAL_SECONDS + 16)
+        self._recent_window = RollingTrendStatistics(self._readings, 15 * 60)
+        self._hour_window = RollingTrendStatistics(self._readings, 60 * 60)
+        self._three_hour_window = RollingTrendStatistics(self._readings, self.WINDOW_SECONDS)
+        now = time.time()
+        self._readings.extend(self._db.get_readings_since(now - self.WINDOW_SECONDS))
+        self._update_windows(now)
 
-    def _initialize_sense_hat(self) -> bool:
-        """Initialize the Sense HAT or its emulator."""
-        try:
-            # Try to import the real Sense HAT library first
-            from sense_hat import SenseHat
-            self._sense_hat = SenseHat()
-            logging.getLogger(__name__).info("SenseHat hardware initialized")
-            return True
-        except Exception:
-            try:
-                # Fall back to the emulator if the real one isn't available
-                from sense_emu import SenseHat
-                self._sense_hat = SenseHat()
-                logging.getLogger(__name__).info("SenseHat emulator initialized")
-                return True
-            except Exception as e:
-                logging.getLogger(__name__).warning(f"No SenseHat available: {e}")
-                return False
+    def _initialize_sense_hat(self, preferred: Optional[str] = None) -> bool:
+        """Use the Sense HAT or its emulator, sharing the instance the display already opened."""
+        self.sense_hat_module, self._sense_hat = find_sense_hat(preferred)
+        if self._sense_hat is None:
+            logging.getLogger(__name__).warning("No SenseHat available")
+            return False
+        logging.getLogger(__name__).info(f"Storm detector using {self.sense_hat_module}")
+        return True
 
     def sense_hat_present(self) -> bool:
         """Return True if the Sense HAT is detected, False otherwise."""
@@ -62,139 +110,186 @@ class StormDetector:
         and checks for storm conditions.
         """
         self.logger.info("Storm detector thread started")
-        while self._sense_hat_present:
-            try:
-                # Read current pressure from the Sense HAT
-                current_pressure = int(self._sense_hat.get_pressure())
+        try:
+            self._run_loop()
+        finally:
+            self.close()
+            self.logger.info("Storm detector thread stopped")
+
+    def close(self):
+        """Close the pressure store. run() does this as it exits; call it directly only if run() is never called."""
+        self._db.close()
 
-                # Store the reading in the database
-                self._db.insert_reading(current_pressure)
+    def stop(self):
+        """Ask the run loop to exit; the database is closed once it does."""
+        self._stop_event.set()
+        self._aggregates.put(None)
 
-                # Clean up old readings
-                self._db.delete_old_readings()
+    def _run_loop(self):
+        if not self._sense_hat_present:
+            return
+        # The sampler reads the sensor on its own thread; this thread stores and
+        # evaluates one aggregate per interval, so slow database or evaluation work
+        # never delays a sensor read.
+        sampler = PressureSampler(self._sense_hat.get_pressure, self._aggregates.put,
+                                  self.sample_rate_hz, self.SAMPLE_INTERVAL_SECONDS)
+        sampler.start()
+        try:
+            while not self._stop_event.is_set():
+                aggregate = self._aggregates.get()
+                if aggregate is None:
+                    break
+                try:
+                    with SPANS.cycle("storm-detector"):
+                        self.process_aggregate(aggregate)
+                except Exception as e:
+                    _SAMPLE_ERRORS.inc()
+                    self.logger.error(f"Error in storm detection loop: {e}", exc_info=True)
+        finally:
+            sampler.stop()
 
-                # Check for storm conditions
-                self._check_for_storm()
-            except Exception as e:
-                self.logger.error(f"Error in storm detection loop: {e}", exc_info=True)
+    def process_aggregate(self, aggregate: PressureAggregate):
+        """
+        Store one interval's aggregate and evaluate storm conditions on its median.
 
-            # Wait before taking the next reading
-            sleep(60)
+        Args:
+            aggregate: Summary of the sensor samples taken during the interval
+        """
+        with SPANS.span("insert"):
+            self._db.insert_aggregate(aggregate)
+        self._evaluate(aggregate.median, aggregate.timestamp)
+
+    def process_reading(self, pressure: float, now: float):
+        """
+        Record one pressure sample and evaluate storm conditions.
+
+        Args:
+            pressure: Pressure in millibars
+            now: Unix epoch seconds the sample was taken
+        """
+        with SPANS.span("insert"):
+            self._db.insert_reading(pressure, now)
+        self._evaluate(pressure, now)
+
+    def _evaluate(self, pressure: float, now: float):
+        """Add a stored reading to the in-memory window, clean up and check for a storm."""
+        self._readings.append(now, pressure)
+
+        # Roll up and expire old readings in periodic batches rather than every sample
+        if now >= self._next_maintenance:
+            self._next_maintenance = now + self.MAINTENANCE_INTERVAL_SECONDS
+            with SPANS.span("cleanup"):
+                self._db.maintain(now)
+
+        # Check for storm conditions
+        with SPANS.span("evaluation"), _EVALUATION_SECONDS.time():
+            self._update_windows(now)
+            self._check_for_storm()
+        _SAMPLES.inc()
+
+    def _update_windows(self, now: float):
+        """Fold newly buffered readings into the rolling windows and age out old ones."""
+        self._recent_window.update(now)
+        self._hour_window.update(now)
+        self._three_hour_window.update(now)
 
     def _check_for_storm(self):
         """
         Check for storm conditions based on pressure readings.
         Detects both rapid pressure drops and accelerating pressure drops.
         Only alerts if pressure is actively falling, not if it has stabilized.
+        Uses the rolling window statistics, so the cost does not grow with window length.
         """
-        last_hour_readings = self._db.get_readings_last_hour()
-        last_three_hour_readings = self._db.get_readings_last_three_hours()
+        hour = self._hour_window
+        three_hours = self._three_hour_window
 
         # Need sufficient readings to detect a reliable trend
-        if len(last_hour_readings) < self.MIN_READINGS_REQUIRED:
+        if hour.count < self.MIN_READINGS_REQUIRED:
             return
         
-        if len(last_three_hour_readings) < self.MIN_READINGS_REQUIRED:
+        if three_hours.count < self.MIN_READINGS_REQUIRED:
             return
 
-        # Sort readings by timestamp (oldest first)
-        last_hour_readings.sort(key=lambda x: x[1])
-        last_three_hour_readings.sort(key=lambda x: x[1])
-
         # Get pressure values
-        one_hour_oldest_reading = last_hour_readings[0][0]
-        three_hour_oldest_reading = last_three_hour_readings[0][0]
-        newest_reading = last_hour_readings[-1][0]
-
-        one_hour_pressure_change = newest_reading - one_hour_oldest_reading
-        three_hour_pressure_change = newest_reading - three_hour_oldest_reading
+        newest_reading = hour.newest
+        one_hour_pressure_change = hour.change
+        three_hour_pressure_change = three_hours.change
+        self.logger.debug(f"Pressure trend: 1h slope={hour.slope}, 3h slope={three_hours.slope} mb/hour, "
+                          f"3h range {three_hours.minimum}-{three_hours.maximum} mb")
 
         # Check if pressure has stabilized by comparing recent trend
         # Look at last 15 minutes of readings to see if pressure stopped falling
-        fifteen_minutes_ago = last_hour_readings[-1][1] - datetime.timedelta(minutes=15)
-        recent_readings = [r for r in last_hour_readings if r[1] >= fifteen_minutes_ago]
-        if len(recent_readings) >= 5:
-            recent_pressure_change = recent_readings[-1][0] - recent_readings[0][0]
+        if self._recent_window.count >= 5:
+            recent_pressure_change = self._recent_window.change
             # If pressure has stabilized or risen recently, don't alert
             if recent_pressure_change >= -0.5:
                 self._last_pressure = newest_reading
                 return
 
         # If the most recent reading is not lower than the previous one, don't alert
-        if len(last_hour_readings) >= 2 and newest_reading >= last_hour_readings[-2][0]:
+        if hour.count >= 2 and newest_reading >= hour.pressure(-2):
             self._last_pressure = newest_reading
             return
 
         # Check for rapid pressure drops (indicating possible storm)
         if one_hour_pressure_change < -self.ONE_HOUR_PRESSURE_DROP_THRESHOLD:
             # Require acceleration for 1-hour alerts unless the drop is extreme
-            if self._is_accelerating_drop_hour(last_hour_readings) or one_hour_pressure_change <= -8:
+            if self._is_accelerating_drop_hour(hour) or one_hour_pressure_change <= -self.EXTREME_ONE_HOUR_PRESSURE_DROP:
                 self.notify_storm(one_hour_pressure_change, "1 hour")
                 self._last_pressure = newest_reading
                 return
         
         if three_hour_pressure_change < -self.THREE_HOUR_PRESSURE_DROP_THRESHOLD:
             # Also check if the drop is accelerating (recent drop faster than average)
-            if self._is_accelerating_drop(last_three_hour_readings) or three_hour_pressure_change <= -12:
-                label = "3 hours (accelerating)" if self._is_accelerating_drop(last_three_hour_readings) else "3 hours"
+            accelerating = self._is_accelerating_drop(three_hours)
+            if accelerating or three_hour_pressure_change <= -self.EXTREME_THREE_HOUR_PRESSURE_DROP:
+                label = "3 hours (accelerating)" if accelerating else "3 hours"
                 self.notify_storm(three_hour_pressure_change, label)
                 self._last_pressure = newest_reading
                 return
         
         self._last_pressure = newest_reading
     
-    def _is_accelerating_drop(self, readings: list) -> bool:
+    def _is_accelerating_drop(self, window: RollingTrendStatistics) -> bool:
         """
         Check if pressure drop is accelerating (recent rate faster than overall rate).
         This helps distinguish storms from gradual weather changes.
         
         Args:
-            readings: List of (pressure, timestamp) tuples sorted by timestamp
+            window: Rolling statistics for the three-hour window
             
         Returns:
             True if the pressure drop rate is accelerating
         """
-        if len(readings) < 20:  # Need enough data points
+        if window.count < 20:  # Need enough data points
             return False
         
         # Compare first hour rate vs last hour rate
-        first_hour = readings[:len(readings)//3]
-        last_hour = readings[-len(readings)//3:]
-        
-        if len(first_hour) < 2 or len(last_hour) < 2:
+        first_hour_rate, last_hour_rate = window.segment_rates(3)
+        if first_hour_rate is None:
             return False
         
-        # Calculate rate of change for each period
-        first_hour_rate = (first_hour[-1][0] - first_hour[0][0]) / len(first_hour)
-        last_hour_rate = (last_hour[-1][0] - last_hour[0][0]) / len(last_hour)
-        
         # Accelerating if recent rate is at least 50% faster than early rate
         return last_hour_rate < first_hour_rate * 1.5
 
-    def _is_accelerating_drop_hour(self, readings: list) -> bool:
+    def _is_accelerating_drop_hour(self, window: RollingTrendStatistics) -> bool:
         """
         Check acceleration within roughly the last hour window by comparing the
-        first half vs the second half of the provided readings list.
+        first half vs the second half of the window's readings.
 
         Args:
-            readings: List of (pressure, timestamp) tuples sorted by timestamp
+            window: Rolling statistics for the one-hour window
 
         Returns:
             True if the second-half drop rate is significantly faster (more negative)
         """
-        if len(readings) < 10:
+        if window.count < 10:
             return False
 
-        mid = len(readings) // 2
-        first = readings[:mid]
-        second = readings[mid:]
-
-        if len(first) < 2 or len(second) < 2:
+        first_rate, second_rate = window.segment_rates(2)
+        if first_rate is None:
             return False
 
-        first_rate = (first[-1][0] - first[0][0]) / len(first)
-        second_rate = (second[-1][0] - second[0][0]) / len(second)
-
         # Consider accelerating if recent rate is at least 50% faster (more negative)
         return second_rate < first_rate * 1.5
 
@@ -1,15 +1,81 @@
+import logging
+import time
+
 import board
 import busio
 import digitalio
 import os.path
 from datetime import datetime
+from typing import Optional
+
 from adafruit_epd.epd import Adafruit_EPD
+from adafruit_epd.ssd1680 import Adafruit_SSD1680
 
+from Display.GlyphAtlas import GlyphAtlas
 from Display.IDisplay import IDisplay
+from Display.MonochromeFrame import MonochromeFrame
+
+_SSD1680_MASTER_ACTIVATE = 0x20
+_SSD1680_DISP_CTRL2 = 0x22
+
+
+class PartialRefreshSSD1680(Adafruit_SSD1680):
+    """
+    Adafruit_SSD1680 that can also drive the controller's partial update
+    (display update control 2 = 0xFC, display mode 2).
+
+    In mode 2 the controller waveforms only the pixels that differ between the
+    new image in black/white RAM and the previous image in red RAM, so the
+    previous frame is loaded into the red RAM before a partial update.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._partial_update = False
+        self._previous_black: Optional[bytes] = None
+
+    def show(self, partial: bool) -> bool:
+        """
+        Send the buffers to the panel and refresh it.
+
+        Args:
+            partial: Use a partial update if a previous frame is known
+
+        Returns:
+            True if a partial update was performed
+        """
+        partial = partial and self._previous_black is not None
+        if partial:
+            self._buffer2[:] = self._previous_black
+        else:
+            # Red RAM is unused on this monochrome panel for full updates
+            self._buffer2[:] = bytes(len(self._buffer2))
+        self._partial_update = partial
+        try:
+            self.display()
+        finally:
+            self._partial_update = False
+        self._previous_black = bytes(self._buffer1)
+        return partial
+
+    def update(self) -> None:
+        if not self._partial_update:
+            super().update()
+            return
+        self.command(_SSD1680_DISP_CTRL2, bytearray([0xFC]))
+        self.command(_SSD1680_MASTER_ACTIVATE)
+        self.busy_wait()
+        if not self._busy:
+            time.sleep(1)
+
 
 # SD1680 version, not 1680Z
 class Adafruit213eInkBonnet(IDisplay):
+    # Partial updates between full refreshes; the full refresh clears ghosting
+    FULL_REFRESH_INTERVAL = 10
+
     def __init__(self):
+        self.logger = logging.getLogger(__name__)
         spi = busio.SPI(board.SCK, MOSI=board.MOSI, MISO=board.MISO)
         ecs = digitalio.DigitalInOut(board.CE0)
         dc = digitalio.DigitalInOut(board.D22)
@@ -18,13 +84,15 @@ class Adafruit213eInkBonnet(IDisplay):
         srcs = None
         current_dir = os.path.dirname(os.path.abspath(__file__))
         self.font_path = os.path.join(current_dir, 'font5x8.bin')
+        self.glyphs = GlyphAtlas.load(self.font_path)
 
-        from adafruit_epd.ssd1680 import Adafruit_SSD1680
-        self.display = Adafruit_SSD1680(122, 250, spi, cs_pin=ecs, dc_pin=dc, sramcs_pin=None,
-                                        rst_pin=rst, busy_pin=busy)
+        self.display = PartialRefreshSSD1680(122, 250, spi, cs_pin=ecs, dc_pin=dc, sramcs_pin=None,
+                                             rst_pin=rst, busy_pin=busy)
         self.display.rotation = 3
         self.heartbeat_count:int = 0
         self.display_is_clear:bool = False
+        self._shown_frame: Optional[MonochromeFrame] = None
+        self._partial_updates: int = 0
         self.clear_display()
 
     @staticmethod
@@ -48,26 +116,38 @@ class Adafruit213eInkBonnet(IDisplay):
             lines.append(' '.join(current_line))
         return lines
 
+    def _new_frame(self) -> MonochromeFrame:
+        return MonochromeFrame(self.display.width, self.display.height)
+
+    def _show_frame(self, frame: MonochromeFrame):
+        """Put a frame on the panel, skipping the refresh entirely if it is already showing."""
+        if self._shown_frame is not None and frame == self._shown_frame:
+            self.logger.debug("eInk frame unchanged; skipping refresh")
+            return
+        self.display.fill(Adafruit_EPD.WHITE)
+        for x, y, width, height in frame.rects:
+            self.display.fill_rect(x, y, width, height, Adafruit_EPD.BLACK)
+        partial = self._shown_frame is not None and self._partial_updates < self.FULL_REFRESH_INTERVAL
+        if self.display.show(partial):
+            self._partial_updates += 1
+        else:
+            self._partial_updates = 0
+        self._shown_frame = frame
+        self.display_is_clear = frame.is_blank
+
     def display_message(self, title: str, message: str = "", detail: str = "", color=None):
-        # self.display.text(title, 10, 10, Adafruit_EPD.BLACK, size=3, font_name=self.font_path)
         # Calculate lines needed for detail text with word wrapping
+        frame = self._new_frame()
         if title:
-            self.clear_display()
             lines = self.wrap_text(title, 13)
             for i, line in enumerate(lines[:4]):
-                self.display.text(line, 3, 0 + (i * 24), Adafruit_EPD.BLACK, size=3, font_name=self.font_path)
-            self.display.display()
-            self.display_is_clear = False
-        elif not title:
-            self.clear_display()
+                frame.draw_text(self.glyphs, line, 3, 0 + (i * 24), size=3)
+        self._show_frame(frame)
 
     def clear_display(self):
         if self.display_is_clear:
             return
-        self.display.fill(Adafruit_EPD.WHITE)
-        self.display.display()
-        self.display_is_clear = True
+        self._show_frame(self._new_frame())
 
     def heartbeat(self):
         pass
-
@@ -1,6 +1,10 @@
 import logging
 from enum import Enum
+from typing import Optional
+
+from Display.DisplayWorker import DisplayWorker
 from Display.IDisplay import IDisplay
+from Hardware.HardwareCache import HardwareCache
 
 class DisplayType(Enum):
     ADAFRUIT_213_EINK = "adafruit_213_eink"
@@ -26,27 +30,44 @@ class DisplayFactory:
         else:
             raise ValueError(f"Unsupported display type: {display_type}")
 
+    # Hardware displays in the order they are probed; the console is the last resort
+    DETECTION_ORDER = (DisplayType.SENSE_HAT, DisplayType.SENSE_HAT_EMULATOR, DisplayType.ADAFRUIT_213_EINK)
+
     @staticmethod
-    def create_display_automatically() -> IDisplay:
+    def create_display_automatically(cache: Optional[HardwareCache] = None) -> IDisplay:
+        """
+        Create the first available display, wrapped in a DisplayWorker so calls never block.
+
+        Args:
+            cache: If given, the display found last time is tried first and the one found now is remembered
+        """
+        return DisplayWorker(DisplayFactory._detect_display(cache))
+
+    @staticmethod
+    def _detect_display(cache: Optional[HardwareCache]) -> IDisplay:
         logger = logging.getLogger(__name__)
-        try:
-            display = DisplayFactory.create_display(DisplayType.SENSE_HAT)
-            return display
-        except Exception as e:
-            logger.info(f"SenseHatDisplay not available: {e}")
-        try:
-            display = DisplayFactory.create_display(DisplayType.SENSE_HAT_EMULATOR)
+        order = list(DisplayFactory.DETECTION_ORDER)
+        preferred = cache.get("display") if cache else None
+        for display_type in order:
+            if display_type.value == preferred:
+                order.remove(display_type)
+                order.insert(0, display_type)
+                break
+        for display_type in order:
+            try:
+                display = DisplayFactory.create_display(display_type)
+            except Exception as e:
+                logger.info(f"{display_type.value} display not available: {e}")
+                continue
+            if cache:
+                cache.set("display", display_type.value)
             return display
-        except Exception as e:
-            logger.info(f"SenseHatEmulatorDisplay not available: {e}")
-        try:
-            display = DisplayFactory.create_display(DisplayType.ADAFRUIT_213_EINK)
-            return display
-        except Exception as e:
-            logger.info(f"Adafruit213eInkBonnet not available: {e}")
         try:
             display = DisplayFactory.create_display(DisplayType.CONSOLE)
-            return display
         except Exception as e:
             logger.error(f"Error creating ConsoleDisplay: {e}", exc_info=True)
             raise ValueError("No supported display found")
+        # Nothing to remember: probing every hardware display again next time is what finds a new one
+        if cache:
+            cache.set("display", None)
+        return display
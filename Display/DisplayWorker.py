@@ -0,0 +1,133 @@
+import logging
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+from Display.IDisplay import IDisplay, StatusIndicator
+from Metrics.MetricsRegistry import REGISTRY
+from Metrics.SpanRecorder import SPANS
+
+_MESSAGE = "message"
+_CLEAR = "clear"
+_STOP = "stop"
+
+_RENDER_SECONDS = REGISTRY.histogram("display_render_seconds", "Time spent drawing queued display commands",
+                                     labels=("display", "command"))
+
+
+class DisplayWorker(IDisplay):
+    """
+    Runs another display's output on a background thread so IDisplay calls return immediately.
+
+    Commands are queued and coalesced: a message supersedes any queued clear, and
+    duplicate messages and clears are dropped. An alert (a message with a colour)
+    replaces status messages that are queued or still scrolling, and interrupt()
+    abandons everything so the next message shows straight away. Heartbeats and
+    status indicators are passed straight through, since displays animate those
+    without blocking.
+    """
+
+    # Seconds close() waits for queued output to finish
+    CLOSE_TIMEOUT_SECONDS = 30
+
+    def __init__(self, inner: IDisplay):
+        """
+        Args:
+            inner: The display that actually draws; only the worker thread calls its output methods
+        """
+        self.logger = logging.getLogger(__name__)
+        self.inner = inner
+        display_name = type(inner).__name__
+        self._render_seconds = {_MESSAGE: _RENDER_SECONDS.labels(display_name, _MESSAGE),
+                                _CLEAR: _RENDER_SECONDS.labels(display_name, _CLEAR)}
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._busy = False
+        self._current_is_alert = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="display-worker", daemon=True)
+        self._thread.start()
+
+    def display_message(self, title: str, message: str = "", detail: str = "", color=None):
+        command = (_MESSAGE, (title, message, detail, color))
+        with self._condition:
+            if command in self._queue:
+                return
+            self._drop_queued(_CLEAR)
+            if color is not None:
+                # An alert supersedes status messages, queued or on screen
+                for queued in [queued for queued in self._queue if queued[0] == _MESSAGE and queued[1][3] is None]:
+                    self._queue.remove(queued)
+                if self._busy and not self._current_is_alert:
+                    self.inner.interrupt()
+            self._enqueue(command)
+
+    def clear_display(self):
+        with self._condition:
+            if (_CLEAR, None) not in self._queue:
+                self._enqueue((_CLEAR, None))
+
+    def heartbeat(self):
+        self.inner.heartbeat()
+
+    def set_status(self, indicator: StatusIndicator, active: bool):
+        self.inner.set_status(indicator, active)
+
+    def interrupt(self):
+        """Drop queued output and cut short whatever is being shown now."""
+        with self._condition:
+            self._queue.clear()
+            self.inner.interrupt()
+
+    def close(self):
+        """Show what is already queued, then stop the worker thread."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.append((_STOP, None))
+            self._condition.notify()
+        self._thread.join(self.CLOSE_TIMEOUT_SECONDS)
+        self.inner.close()
+
+    def set_button_press_callback(self, callback: Optional[Callable[[], None]]):
+        self.inner.set_button_press_callback(callback)
+
+    def set_joystick_callback(self, callback: Optional[Callable[[str], None]]):
+        self.inner.set_joystick_callback(callback)
+
+    @property
+    def supports_long_message(self) -> bool:
+        return self.inner.supports_long_message
+
+    def _enqueue(self, command):
+        if self._closed:
+            return
+        self._queue.append(command)
+        self._condition.notify()
+
+    def _drop_queued(self, kind: str):
+        for command in [command for command in self._queue if command[0] == kind]:
+            self._queue.remove(command)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._busy = False
+                while not self._queue:
+                    self._condition.wait()
+                kind, args = self._queue.popleft()
+                if kind == _STOP:
+                    return
+                self._busy = True
+                self._current_is_alert = kind == _MESSAGE and args[3] is not None
+                # Re-armed under the lock, so an interrupt() from here on applies to this command
+                self.inner.resume()
+            try:
+                with SPANS.cycle("display"), SPANS.span(kind), self._render_seconds[kind].time():
+                    if kind == _MESSAGE:
+                        self.inner.display_message(*args)
+                    else:
+                        self.inner.clear_display()
+            except Exception as e:
+                self.logger.error(f"Error updating display: {e}", exc_info=True)
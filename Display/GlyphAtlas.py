@@ -0,0 +1,66 @@
+import os.path
+import struct
+from typing import Dict, List, Tuple
+
+
+class GlyphAtlas:
+    """
+    A bitmap font decoded once from an Adafruit GFX .bin font file (such as font5x8.bin).
+
+    Each glyph is stored as the vertical runs of set pixels in each column, so
+    drawing a character at any scale is one rectangle per run instead of one
+    file read per column and one rectangle per pixel.
+    """
+
+    _cache: Dict[str, "GlyphAtlas"] = {}
+
+    def __init__(self, font_path: str):
+        with open(font_path, 'rb') as file:
+            data = file.read()
+        self.font_width, self.font_height = struct.unpack_from("BB", data, 0)
+        glyph_count = (len(data) - 2) // self.font_width
+        # columns[code] -> one byte per column, bit n set for a pixel in row n
+        self._columns: List[bytes] = []
+        # runs[code] -> [(column, first_row, length), ...]
+        self._runs: List[List[Tuple[int, int, int]]] = []
+        for code in range(glyph_count):
+            columns = data[2 + code * self.font_width:2 + (code + 1) * self.font_width]
+            self._columns.append(bytes(columns))
+            runs = []
+            for column, line in enumerate(columns):
+                row = 0
+                while row < self.font_height:
+                    if (line >> row) & 1:
+                        start = row
+                        while row < self.font_height and (line >> row) & 1:
+                            row += 1
+                        runs.append((column, start, row - start))
+                    else:
+                        row += 1
+            self._runs.append(runs)
+
+    @classmethod
+    def load(cls, font_path: str) -> "GlyphAtlas":
+        """Return the atlas for a font file, decoding it only the first time."""
+        font_path = os.path.abspath(font_path)
+        atlas = cls._cache.get(font_path)
+        if atlas is None:
+            atlas = cls._cache[font_path] = cls(font_path)
+        return atlas
+
+    def columns(self, char: str) -> bytes:
+        """Column bitmaps for a character; bit n of each byte is row n."""
+        code = ord(char)
+        return self._columns[code] if code < len(self._columns) else bytes(self.font_width)
+
+    def cell(self, char: str) -> bytes:
+        """Column bitmaps for a character's whole cell; every cell of this font is font_width wide."""
+        return self.columns(char)
+
+    def runs(self, char: str) -> List[Tuple[int, int, int]]:
+        code = ord(char)
+        return self._runs[code] if code < len(self._runs) else []
+
+    def advance(self, size: int) -> int:
+        """Horizontal distance between characters at the given scale."""
+        return (self.font_width + 1) * size
@@ -1,6 +1,14 @@
 from abc import ABC, abstractmethod
+from enum import Enum
 from typing import Callable, Optional
 
+
+class StatusIndicator(Enum):
+    STORM = "storm"
+    FETCHING = "fetching"
+    ERROR = "error"
+
+
 class IDisplay(ABC):
     @abstractmethod
     def display_message(self, title: str, message: str = "", detail: str = "", color=None):
@@ -19,6 +27,29 @@ class IDisplay(ABC):
         Default implementation does nothing - override in subclasses with button support."""
         pass
     
+    def set_joystick_callback(self, callback: Optional[Callable[[str], None]]):
+        """Set callback to be called with "up", "down", "left" or "right" when a direction is pressed.
+        Default implementation does nothing - override in subclasses with a joystick."""
+        pass
+
+    def set_status(self, indicator: StatusIndicator, active: bool):
+        """Turn a status indicator on or off. Must not block.
+        Default implementation does nothing - override in subclasses that can show status."""
+        pass
+
+    def interrupt(self):
+        """Abandon the message currently being shown, if the display can.
+        Default implementation does nothing - override in subclasses with long-running output."""
+        pass
+
+    def resume(self):
+        """Allow messages to be shown again after interrupt()."""
+        pass
+
+    def close(self):
+        """Finish any pending output and release resources. Default implementation does nothing."""
+        pass
+
     @property
     def supports_long_message(self) -> bool:
         """Returns True if the display can show long scrolling messages."""
@@ -0,0 +1,110 @@
+import logging
+import os
+import select
+import threading
+from typing import Callable, Dict, Optional
+
+
+class JoystickInput:
+    """
+    Delivers SenseHat joystick presses from a thread that blocks on the joystick device.
+
+    The thread sleeps in select() on the stick's evdev file and a stop pipe, so an
+    idle joystick costs no wakeups and a press is handled as soon as the kernel
+    reports it. Repeated presses of the same direction within DEBOUNCE_SECONDS are
+    ignored. If the stick does not expose a selectable file, events are polled
+    every POLL_INTERVAL_SECONDS instead.
+    """
+
+    DEBOUNCE_SECONDS = 0.2
+    POLL_INTERVAL_SECONDS = 0.1
+    STOP_TIMEOUT_SECONDS = 2
+
+    def __init__(self, stick, stop_event: threading.Event, on_press: Callable[[str], None]):
+        """
+        Args:
+            stick: sense.stick from sense_hat or sense_emu
+            stop_event: Set to stop the thread; stop() also wakes it
+            on_press: Called from the input thread with the direction of each debounced press
+        """
+        self.logger = logging.getLogger(__name__)
+        self.stick = stick
+        self.stop_event = stop_event
+        self._on_press = on_press
+        self._last_press: Dict[str, float] = {}
+        self._stop_read_fd, self._stop_write_fd = os.pipe()
+        # Guards closing the stop pipe, so stop() never writes to a recycled descriptor
+        self._pipe_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="joystick", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Wake and join the input thread, then close the stop pipe."""
+        self.stop_event.set()
+        with self._pipe_lock:
+            if self._stop_write_fd is None:
+                return
+            try:
+                os.write(self._stop_write_fd, b"x")
+            except OSError:
+                pass
+        thread = self._thread
+        if thread is not None:
+            if thread is not threading.current_thread():
+                thread.join(self.STOP_TIMEOUT_SECONDS)
+            if thread.is_alive():
+                # Still using the read end; leave the pipe to the process exit
+                return
+        with self._pipe_lock:
+            if self._stop_write_fd is not None:
+                os.close(self._stop_read_fd)
+                os.close(self._stop_write_fd)
+                self._stop_read_fd = self._stop_write_fd = None
+
+    def _stick_fd(self) -> Optional[int]:
+        try:
+            return self.stick._stick_file.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def _run(self):
+        stick_fd = self._stick_fd()
+        if stick_fd is None:
+            self.logger.info("Joystick device not selectable; polling for events")
+            self._poll()
+        else:
+            self._wait_for_events(stick_fd)
+
+    def _wait_for_events(self, stick_fd: int):
+        while not self.stop_event.is_set():
+            try:
+                readable, _, _ = select.select([stick_fd, self._stop_read_fd], [], [])
+                if self._stop_read_fd in readable:
+                    break
+                # get_events() drains everything already buffered without blocking
+                self._dispatch(self.stick.get_events())
+            except Exception as e:
+                self.logger.error(f"Error monitoring joystick: {e}", exc_info=True)
+                self.stop_event.wait(1)
+
+    def _poll(self):
+        while not self.stop_event.wait(self.POLL_INTERVAL_SECONDS):
+            try:
+                self._dispatch(self.stick.get_events())
+            except Exception as e:
+                self.logger.error(f"Error monitoring joystick: {e}", exc_info=True)
+                self.stop_event.wait(1)
+
+    def _dispatch(self, events):
+        for event in events:
+            if event.action != "pressed":
+                continue
+            last = self._last_press.get(event.direction)
+            if last is not None and 0 <= event.timestamp - last < self.DEBOUNCE_SECONDS:
+                continue
+            self._last_press[event.direction] = event.timestamp
+            self._on_press(event.direction)
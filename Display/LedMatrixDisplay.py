@@ -0,0 +1,128 @@
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from Display.IDisplay import IDisplay, StatusIndicator
+from Display.JoystickInput import JoystickInput
+from Display.LedMatrixScroller import LedMatrixScroller
+from Display.SenseHatFont import SenseHatFont
+from Display.StatusAnimator import StatusAnimator
+
+
+class LedMatrixDisplay(IDisplay):
+    """
+    Shared behaviour of the SenseHat and its emulator: an 8x8 LED matrix with a joystick.
+
+    Everything reaches the matrix through _draw(), which remembers the frame the
+    display wants to show and composites the status pixels from a StatusAnimator
+    over it, so a status change can be redrawn without disturbing a scroll.
+    """
+
+    SCROLL_SPEED_SECONDS = 0.05
+    BLANK_FRAME = [[0, 0, 0]] * 64
+
+    def __init__(self, sense):
+        """
+        Args:
+            sense: A sense_hat or sense_emu SenseHat instance, already rotated for the device
+        """
+        self.logger = logging.getLogger(__name__)
+        self.button_callback: Optional[Callable[[], None]] = None
+        self.joystick_callback: Optional[Callable[[str], None]] = None
+        self.stop_monitor = threading.Event()
+        self.sense = sense
+        self.joystick: Optional[JoystickInput] = None
+        self.sense.low_light = True
+        self._frame = self.BLANK_FRAME
+        self._draw_lock = threading.Lock()
+        self.scroller = LedMatrixScroller(self._draw, font=self._load_font(sense))
+        self.status = StatusAnimator(self._on_status_changed)
+        self._draw(self.BLANK_FRAME)
+        self.status.start()
+
+    def _load_font(self, sense) -> Optional[SenseHatFont]:
+        """The SenseHat's own text font, or None to scroll in the bundled font5x8.bin instead."""
+        try:
+            return SenseHatFont.load(sense)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"SenseHat text font unavailable, using font5x8.bin: {e}")
+            return None
+
+    def _draw(self, frame: list):
+        with self._draw_lock:
+            self._frame = frame
+            overlay = self.status.overlay
+            if overlay:
+                frame = list(frame)
+                for index, color in overlay.items():
+                    frame[index] = color
+            self.sense.set_pixels(frame)
+
+    def _on_status_changed(self, overlay: Dict[int, list]):
+        self._draw(self._frame)
+
+    def display_message(self, title: str, message: str = "", detail: str = "", color=None):
+        # The LED matrix, being a scrolling display, will only display the title.
+        # It will then leave a full-stop on the display to let the user know that
+        # there is an active alert.
+        show_full_stop = True
+        if color is None:
+            color = [255, 255, 255]
+            show_full_stop = False
+        if title:
+            if not self.scroller.scroll(". . . " + title, color, scroll_speed=self.SCROLL_SPEED_SECONDS):
+                # Interrupted; leave the matrix blank for whatever comes next
+                self._draw(self.BLANK_FRAME)
+            elif show_full_stop:
+                self._draw(self.scroller.letter(".", color))
+        else:
+            self._draw(self.BLANK_FRAME)
+
+    def clear_display(self):
+        self._draw(self.BLANK_FRAME)
+
+    def heartbeat(self):
+        self.status.pulse_heartbeat()
+
+    def set_status(self, indicator: StatusIndicator, active: bool):
+        self.status.set(indicator, active)
+
+    def interrupt(self):
+        self.scroller.cancel()
+
+    def resume(self):
+        self.scroller.resume()
+
+    def close(self):
+        self.status.stop()
+        if self.joystick:
+            self.joystick.stop()
+        else:
+            self.stop_monitor.set()
+
+    def set_button_press_callback(self, callback: Optional[Callable[[], None]]):
+        """Set callback to be called when the middle joystick button is pressed."""
+        self.button_callback = callback
+        self._start_joystick()
+
+    def set_joystick_callback(self, callback: Optional[Callable[[str], None]]):
+        """Set callback to be called with "up", "down", "left" or "right" when the joystick is pushed."""
+        self.joystick_callback = callback
+        self._start_joystick()
+
+    def _start_joystick(self):
+        if self.joystick is None and (self.button_callback or self.joystick_callback):
+            self.joystick = JoystickInput(self.sense.stick, self.stop_monitor, self._on_joystick)
+            self.joystick.start()
+
+    def _on_joystick(self, direction: str):
+        if direction == "middle":
+            if self.button_callback:
+                self.button_callback()
+        elif self.joystick_callback:
+            self.joystick_callback(direction)
+
+    @property
+    def supports_long_message(self) -> bool:
+        """SenseHat supports scrolling long messages."""
+        return True
@@ -0,0 +1,130 @@
+import os.path
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence, Tuple
+
+from Display.GlyphAtlas import GlyphAtlas
+
+
+class LedMatrixScroller:
+    """
+    Scrolls text across an 8x8 SenseHat LED matrix one column at a time.
+
+    A (text, colour) pair is rendered once into the full sequence of set_pixels
+    frames and kept in a size-bounded LRU cache, so repeated messages cost no
+    rasterization. Frames are played against a monotonic clock with deadlines
+    measured from the start of the scroll, so a slow frame delays only itself
+    rather than everything after it. Unlike SenseHat.show_message, a scroll in
+    progress can be abandoned from another thread with cancel(), taking effect
+    within one frame.
+    """
+
+    WIDTH = 8
+    HEIGHT = 8
+    # Total frames kept across all cached messages; each frame is a 64-entry pixel list
+    MAX_CACHED_FRAMES = 4096
+
+    def __init__(self, draw: Callable[[list], None], font_path: Optional[str] = None, font=None):
+        """
+        Args:
+            draw: Puts a 64-pixel frame on the matrix, e.g. SenseHat.set_pixels
+            font_path: 8-pixel-high .bin font; defaults to the bundled font5x8.bin
+            font: Glyph source with columns() and cell(), such as a SenseHatFont; overrides font_path
+        """
+        self._draw = draw
+        if font is None:
+            if font_path is None:
+                font_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'font5x8.bin')
+            font = GlyphAtlas.load(font_path)
+        self.glyphs = font
+        self._cancel = threading.Event()
+        self._frames: "OrderedDict[Tuple[str, tuple], Tuple[list, ...]]" = OrderedDict()
+        self._cached_frame_count = 0
+        self._cache_lock = threading.Lock()
+
+    def cancel(self):
+        """Stop the current scroll, and any started before resume() is called."""
+        self._cancel.set()
+
+    def resume(self):
+        """Allow scrolling again after cancel()."""
+        self._cancel.clear()
+
+    def columns(self, text: str) -> bytearray:
+        """
+        Column bitmaps for the whole message, padded so it scrolls fully on and off the matrix.
+        Frame n of the scroll is columns[n:n + WIDTH]; bit y of each byte is row y.
+        """
+        columns = bytearray(self.WIDTH)
+        for char in text:
+            columns += self.glyphs.columns(char)
+            columns.append(0)
+        columns += bytes(self.WIDTH)
+        return columns
+
+    def letter(self, char: str, color: Sequence[int]) -> list:
+        """A single frame with one character roughly centred, like SenseHat.show_letter."""
+        columns = bytes(1) + self.glyphs.cell(char) + bytes(self.WIDTH)
+        lit = list(color)
+        off = [0, 0, 0]
+        return [lit if (columns[x] >> y) & 1 else off for y in range(self.HEIGHT) for x in range(self.WIDTH)]
+
+    def render(self, text: str, color: Sequence[int]) -> Tuple[list, ...]:
+        """
+        Get the set_pixels frames for a message, rendering them only on a cache miss.
+
+        Returns:
+            Tuple of frames, each a list of 64 [r, g, b] values in row-major order
+        """
+        key = (text, tuple(color))
+        with self._cache_lock:
+            frames = self._frames.get(key)
+            if frames is not None:
+                self._frames.move_to_end(key)
+                return frames
+
+        lit = list(color)
+        off = [0, 0, 0]
+        # Every frame shares the same two colour lists, so a frame costs 64 references
+        columns = self.columns(text)
+        frames = tuple([lit if (columns[start + x] >> y) & 1 else off
+                        for y in range(self.HEIGHT) for x in range(self.WIDTH)]
+                       for start in range(len(columns) - self.WIDTH + 1))
+
+        with self._cache_lock:
+            if key not in self._frames and len(frames) <= self.MAX_CACHED_FRAMES:
+                self._frames[key] = frames
+                self._cached_frame_count += len(frames)
+                while self._cached_frame_count > self.MAX_CACHED_FRAMES:
+                    _, evicted = self._frames.popitem(last=False)
+                    self._cached_frame_count -= len(evicted)
+        return frames
+
+    def scroll(self, text: str, color, scroll_speed: float) -> bool:
+        """
+        Scroll text right to left.
+
+        Args:
+            text: Message to show
+            color: [r, g, b] for lit pixels
+            scroll_speed: Seconds between one-column shifts
+
+        Returns:
+            True if the scroll ran to completion, False if it was cancelled
+        """
+        frames = self.render(text, color)
+        last = len(frames) - 1
+        start = time.monotonic()
+        index = 0
+        while True:
+            if self._cancel.is_set():
+                return False
+            self._draw(frames[index])
+            if index == last:
+                return True
+            remaining = start + (index + 1) * scroll_speed - time.monotonic()
+            if remaining > 0 and self._cancel.wait(remaining):
+                return False
+            # When running late, skip frames whose slot has passed, but always end on the last frame
+            index = min(max(index + 1, int((time.monotonic() - start) / scroll_speed)), last)
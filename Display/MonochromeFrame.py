@@ -0,0 +1,50 @@
+from typing import List, Tuple
+
+from Display.GlyphAtlas import GlyphAtlas
+
+
+class MonochromeFrame:
+    """
+    An off-screen 1-bit frame: a packed bitmap (one bit per pixel, MSB first,
+    rows padded to whole bytes) used to compare frames, plus the list of black
+    rectangles that produced it, used to draw the frame onto a device.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._stride = (width + 7) // 8
+        self.bits = bytearray(self._stride * height)
+        self.rects: List[Tuple[int, int, int, int]] = []
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MonochromeFrame):
+            return NotImplemented
+        return self.width == other.width and self.height == other.height and self.bits == other.bits
+
+    @property
+    def is_blank(self) -> bool:
+        return not self.rects
+
+    def fill_rect(self, x: int, y: int, width: int, height: int):
+        """Set a rectangle of pixels to black, clipped to the frame."""
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.width), min(y + height, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.rects.append((x0, y0, x1 - x0, y1 - y0))
+        bits = self.bits
+        for row in range(y0, y1):
+            base = row * self._stride
+            for column in range(x0, x1):
+                bits[base + (column >> 3)] |= 0x80 >> (column & 7)
+
+    def draw_text(self, atlas: GlyphAtlas, text: str, x: int, y: int, size: int = 1):
+        """Draw a single line of text with its top-left corner at (x, y), skipping characters that are off-frame."""
+        advance = atlas.advance(size)
+        for i, char in enumerate(text):
+            char_x = x + i * advance
+            if char_x + atlas.font_width * size <= 0 or char_x >= self.width:
+                continue
+            for column, row, length in atlas.runs(char):
+                self.fill_rect(char_x + column * size, y + row * size, size, length * size)
@@ -0,0 +1,76 @@
+import os.path
+import sys
+from typing import Dict, List, Sequence
+
+
+class SenseHatFont:
+    """
+    The SenseHat's own text font, so LedMatrixScroller draws exactly what
+    SenseHat.show_message and show_letter would.
+
+    sense_hat and sense_emu both ship it as sense_hat_text.png, 8 pixels wide with
+    one 5x8 character cell every 40 pixels, and sense_hat_text.txt listing the
+    characters in the same order. Each run of 8 pixels is one column of the cell,
+    bottom row first. Scrolled characters have their blank columns trimmed, so the
+    font is proportional, and characters it lacks are drawn as "?".
+    """
+
+    TEXT_ASSETS = "sense_hat_text"
+    CELL_WIDTH = 5
+    HEIGHT = 8
+
+    def __init__(self, pixels: Sequence[Sequence[int]], characters: str):
+        """
+        Args:
+            pixels: The font image as a flat list of [r, g, b] pixels; white pixels are lit
+            characters: The characters in the image, in order
+        """
+        cell_pixels = self.CELL_WIDTH * self.HEIGHT
+        # cells[char] -> one byte per column, bit n set for a pixel in row n
+        self._cells: Dict[str, bytes] = {}
+        for index, char in enumerate(characters):
+            cell = pixels[index * cell_pixels:(index + 1) * cell_pixels]
+            if len(cell) < cell_pixels:
+                break
+            columns: List[int] = []
+            for column in range(self.CELL_WIDTH):
+                line = 0
+                for row in range(self.HEIGHT):
+                    if list(cell[column * self.HEIGHT + self.HEIGHT - 1 - row]) == [255, 255, 255]:
+                        line |= 1 << row
+                columns.append(line)
+            self._cells[char] = bytes(columns)
+        if "?" not in self._cells:
+            raise ValueError("SenseHat font has no '?' glyph")
+        # A blank cell (the space) keeps its width; anything else loses its blank edges
+        self._columns = {char: cell.strip(b"\0") or cell for char, cell in self._cells.items()}
+
+    @classmethod
+    def load(cls, sense) -> "SenseHatFont":
+        """
+        Read the font shipped alongside a SenseHat instance's module.
+
+        Args:
+            sense: A sense_hat or sense_emu SenseHat instance
+
+        Raises:
+            OSError: If the font files cannot be read
+            ValueError: If they are not a usable font
+        """
+        module = sys.modules.get(type(sense).__module__)
+        module_path = getattr(module, "__file__", None)
+        if not module_path:
+            raise OSError(f"cannot locate the text font for {type(sense).__module__}")
+        base = os.path.join(os.path.dirname(module_path), cls.TEXT_ASSETS)
+        with open(base + ".txt") as file:
+            characters = file.read()
+        # load_image decodes with PIL, which sense_hat already depends on
+        return cls(sense.load_image(base + ".png", False), characters)
+
+    def columns(self, char: str) -> bytes:
+        """Column bitmaps for a character as show_message scrolls it; bit n of each byte is row n."""
+        return self._columns.get(char, self._columns["?"])
+
+    def cell(self, char: str) -> bytes:
+        """Column bitmaps for a character's full 5-column cell, as show_letter draws it."""
+        return self._cells.get(char, self._cells["?"])
@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from Display.IDisplay import StatusIndicator
+
+
+class StatusAnimator:
+    """
+    Owns the status pixels of an 8x8 LED matrix and animates them on a timer thread.
+
+    Each indicator is a single pixel that is either steady or blinks while active,
+    and the heartbeat is a short flash. The thread sleeps until the next time any
+    pixel changes and then hands the new overlay to on_change, so the caller never
+    waits on an animation and the overlay can be composited over whatever the
+    matrix is currently showing.
+    """
+
+    HEARTBEAT_PIXEL = (7, 7)
+    HEARTBEAT_COLOR = [0, 255, 0]
+    HEARTBEAT_SECONDS = 0.1
+
+    # indicator -> ((x, y), colour, seconds on, seconds off); 0 seconds off is steady
+    INDICATORS: Dict[StatusIndicator, Tuple[Tuple[int, int], list, float, float]] = {
+        StatusIndicator.ERROR: ((0, 0), [255, 0, 0], 1.0, 0.0),
+        StatusIndicator.FETCHING: ((7, 0), [0, 0, 255], 0.25, 0.25),
+        StatusIndicator.STORM: ((0, 7), [255, 0, 255], 1.0, 1.0),
+    }
+
+    def __init__(self, on_change: Callable[[Dict[int, list]], None]):
+        """
+        Args:
+            on_change: Called from the animation thread with {pixel index: [r, g, b]}
+                whenever the set of lit status pixels changes
+        """
+        self.logger = logging.getLogger(__name__)
+        self._on_change = on_change
+        self._active: Dict[StatusIndicator, float] = {}     # indicator -> time it was switched on
+        self._heartbeat_until = 0.0
+        self._overlay: Dict[int, list] = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._changed = False   # State changed since the overlay was last computed
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def overlay(self) -> Dict[int, list]:
+        """Status pixels currently lit, as {y * 8 + x: [r, g, b]}."""
+        return self._overlay
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="status-animator", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def set(self, indicator: StatusIndicator, active: bool):
+        with self._condition:
+            if active == (indicator in self._active):
+                return
+            if active:
+                self._active[indicator] = time.monotonic()
+            else:
+                del self._active[indicator]
+            self._changed = True
+            self._condition.notify()
+
+    def pulse_heartbeat(self):
+        with self._condition:
+            self._heartbeat_until = time.monotonic() + self.HEARTBEAT_SECONDS
+            self._changed = True
+            self._condition.notify()
+
+    def _frame(self, now: float) -> Tuple[Dict[int, list], Optional[float]]:
+        """Overlay at a moment, and the next time it will change (None if it is static)."""
+        overlay = {}
+        next_change = None
+        for indicator, started in self._active.items():
+            (x, y), color, on_seconds, off_seconds = self.INDICATORS[indicator]
+            if off_seconds:
+                phase = (now - started) % (on_seconds + off_seconds)
+                lit = phase < on_seconds
+                change = now + (on_seconds - phase if lit else on_seconds + off_seconds - phase)
+                next_change = change if next_change is None else min(next_change, change)
+            else:
+                lit = True
+            if lit:
+                overlay[y * 8 + x] = color
+        if now < self._heartbeat_until:
+            x, y = self.HEARTBEAT_PIXEL
+            overlay[y * 8 + x] = self.HEARTBEAT_COLOR
+            if next_change is None or self._heartbeat_until < next_change:
+                next_change = self._heartbeat_until
+        return overlay, next_change
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                self._changed = False
+                overlay, next_change = self._frame(time.monotonic())
+            if overlay != self._overlay:
+                self._overlay = overlay
+                try:
+                    self._on_change(overlay)
+                except Exception as e:
+                    self.logger.error(f"Error drawing status pixels: {e}", exc_info=True)
+            with self._condition:
+                if self._stopped:
+                    return
+                if not self._changed:
+                    timeout = None if next_change is None else max(0.0, next_change - time.monotonic())
+                    self._condition.wait(timeout)
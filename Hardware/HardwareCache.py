@@ -0,0 +1,55 @@
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+
+class HardwareCache:
+    """
+    Remembers which display and pressure sensor were found last time, so startup
+    can try them first instead of probing every option in order.
+
+    Stored as a small JSON object; a missing or unreadable file just means nothing
+    is remembered. Writes go to a temporary file that is renamed into place, so a
+    power cut mid-write cannot leave a corrupt cache.
+    """
+
+    DEFAULT_FILENAME = ".hardware_cache.json"
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Cache file; defaults to .hardware_cache.json in the project directory
+        """
+        if path is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            path = os.path.join(project_root, self.DEFAULT_FILENAME)
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as file:
+                values = json.load(file)
+            self._values = values if isinstance(values, dict) else {}
+        except (OSError, ValueError):
+            self._values = {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self._values.get(key)
+
+    def set(self, key: str, value: Optional[str]):
+        """Remember a value (None forgets it); the file is only rewritten if something changed."""
+        with self._lock:
+            if self._values.get(key) == value:
+                return
+            if value is None:
+                self._values.pop(key, None)
+            else:
+                self._values[key] = value
+            temporary_path = self.path + ".tmp"
+            try:
+                with open(temporary_path, "w") as file:
+                    json.dump(self._values, file)
+                os.replace(temporary_path, self.path)
+            except OSError as e:
+                logging.getLogger(__name__).warning(f"Could not save hardware cache {self.path}: {e}")
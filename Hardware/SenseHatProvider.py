@@ -0,0 +1,63 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+# Modules that provide a SenseHat class, in the order they are tried
+SENSE_HAT_MODULES = ("sense_hat", "sense_emu")
+
+_instances: Dict[str, object] = {}
+_failures: Dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def get_sense_hat(module: str):
+    """
+    The process-wide SenseHat from one module, created on first use.
+
+    The display and the storm detector share this instance, so the hardware is
+    opened once, and a module that failed to load is not tried again.
+
+    Args:
+        module: "sense_hat" or "sense_emu"
+
+    Raises:
+        ValueError: If that SenseHat is not available
+    """
+    with _lock:
+        if module in _instances:
+            return _instances[module]
+        if module in _failures:
+            raise ValueError(f"{module} not available: {_failures[module]}")
+        try:
+            if module == "sense_hat":
+                # noinspection PyUnresolvedReferences
+                from sense_hat import SenseHat
+            elif module == "sense_emu":
+                from sense_emu import SenseHat
+            else:
+                raise ValueError(f"unknown SenseHat module {module}")
+            instance = _instances[module] = SenseHat()
+        except Exception as e:
+            _failures[module] = str(e)
+            raise ValueError(f"{module} not available: {e}")
+    logging.getLogger(__name__).info(f"{module} SenseHat initialized")
+    return instance
+
+
+def find_sense_hat(preferred: Optional[str] = None) -> Tuple[Optional[str], Optional[object]]:
+    """
+    The first available SenseHat, trying the preferred module first.
+
+    Returns:
+        Tuple of (module name, SenseHat), or (None, None) if there is none
+    """
+    modules = list(SENSE_HAT_MODULES)
+    if preferred in modules:
+        modules.remove(preferred)
+        modules.insert(0, preferred)
+    for module in modules:
+        try:
+            return module, get_sense_hat(module)
+        except ValueError as e:
+            logging.getLogger(__name__).debug(str(e))
+    return None, None
@@ -0,0 +1,292 @@
+"""
+Share one alerter between several displays on the same host.
+
+The hub process polls WeatherBox and runs the storm detector as usual, but its
+display is wrapped in a HubDisplay, which also publishes every display and status
+call over a Unix domain socket. Display-only processes run a HubClient (see
+Hub.HubClient), which replays those calls on their own display and sends button
+and joystick presses back to the hub.
+
+The protocol is one JSON object per line. Hub to client:
+    {"op": "message", "title": ..., "message": ..., "detail": ..., "color": [r, g, b] or null}
+    {"op": "clear"}
+    {"op": "status", "indicator": "storm" | "fetching" | "error", "active": true | false}
+    {"op": "interrupt"}
+Client to hub:
+    {"op": "button"}
+    {"op": "joystick", "direction": "up" | "down" | "left" | "right"}
+"""
+import json
+import logging
+import os
+import select
+import socket
+import socketserver
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from Display.IDisplay import IDisplay, StatusIndicator
+from Metrics.MetricsRegistry import REGISTRY
+
+_SUBSCRIBERS = REGISTRY.gauge("alerter_hub_subscribers", "Display clients connected to the alert hub")
+
+
+SOCKET_VARIABLE = "WEATHER_ALERTER_HUB_SOCKET"
+
+
+def socket_path() -> str:
+    """
+    WEATHER_ALERTER_HUB_SOCKET, or .alerter_hub.sock in the project directory, so a
+    hub and its clients agree without configuration.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.environ.get(SOCKET_VARIABLE) or os.path.join(project_root, ".alerter_hub.sock")
+
+
+def encode(event: dict) -> bytes:
+    return json.dumps(event, separators=(",", ":")).encode() + b"\n"
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        hub: AlertHub = self.server
+        if not hub.subscribe(self.request):
+            return
+        try:
+            buffer = b""
+            while True:
+                # Blocks until the client presses something or disconnects
+                data = self.request.recv(4096)
+                if not data:
+                    return
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    hub.handle_input(line)
+        except OSError:
+            pass
+        finally:
+            hub.unsubscribe(self.request)
+
+
+class AlertHub(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Publishes display events to every connected client from a daemon thread.
+
+    A client that connects late first receives the current alert and status
+    indicators, so it shows the same state as the hub without waiting for a change.
+    A client that cannot keep up within SEND_TIMEOUT_SECONDS is disconnected rather
+    than allowed to stall the alerter.
+    """
+
+    daemon_threads = True
+    SEND_TIMEOUT_SECONDS = 1.0
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Socket path; defaults to socket_path()
+
+        Raises:
+            OSError: If another hub is already serving the path, or it cannot be bound
+        """
+        path = path or socket_path()
+        self._remove_stale_socket(path)
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o660)
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._subscribers: List[socket.socket] = []
+        # What a newly connected client needs to match the hub's display
+        self._alert: Optional[dict] = None
+        self._statuses: Dict[str, dict] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.on_button: Optional[Callable[[], None]] = None
+        self.on_joystick: Optional[Callable[[str], None]] = None
+
+    @staticmethod
+    def _remove_stale_socket(path: str):
+        """Remove a socket left by a hub that died, but never one a live hub is serving."""
+        if not os.path.exists(path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+            return
+        finally:
+            probe.close()
+        raise OSError(f"an alert hub is already serving {path}")
+
+    def start(self) -> "AlertHub":
+        self._thread = threading.Thread(target=self.serve_forever, name="alert-hub", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Alert hub listening on {self.path}")
+        return self
+
+    def stop(self):
+        self.shutdown()
+        with self._lock:
+            for connection in self._subscribers:
+                self._disconnect(connection)
+            self._subscribers.clear()
+            _SUBSCRIBERS.set(0)
+        self.server_close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _send(self, connection: socket.socket, data: bytes) -> bool:
+        """
+        Write data without letting a stalled client block for more than SEND_TIMEOUT_SECONDS.
+        The socket stays blocking for the handler's reads; each write is non-blocking.
+
+        Returns:
+            False if the client did not take the data in time
+
+        Raises:
+            OSError: If the connection failed
+        """
+        deadline = time.monotonic() + self.SEND_TIMEOUT_SECONDS
+        view = memoryview(data)
+        while view:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _, writable, _ = select.select([], [connection], [], remaining)
+            if not writable:
+                return False
+            try:
+                sent = connection.send(view, socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                continue
+            view = view[sent:]
+        return True
+
+    def subscribe(self, connection: socket.socket) -> bool:
+        """
+        Send the current state to a new client, then include it in every later event.
+
+        Returns:
+            False if the state could not be sent; the client is not subscribed
+        """
+        with self._lock:
+            snapshot = list(self._statuses.values())
+            if self._alert is not None:
+                snapshot.append(self._alert)
+            try:
+                if not self._send(connection, b"".join(encode(event) for event in snapshot)):
+                    return False
+            except OSError:
+                return False
+            self._subscribers.append(connection)
+            _SUBSCRIBERS.set(len(self._subscribers))
+            return True
+
+    @staticmethod
+    def _disconnect(connection: socket.socket):
+        """End a client's connection; its handler's blocking recv returns and the server closes it."""
+        try:
+            connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def unsubscribe(self, connection: socket.socket):
+        with self._lock:
+            if connection in self._subscribers:
+                self._subscribers.remove(connection)
+                _SUBSCRIBERS.set(len(self._subscribers))
+
+    def publish(self, event: dict):
+        """Send an event to every client, dropping any that fail or time out."""
+        data = encode(event)
+        with self._lock:
+            op = event["op"]
+            if op == "message" and event.get("color") is not None:
+                self._alert = event
+            elif op == "clear":
+                self._alert = None
+            elif op == "status":
+                self._statuses[event["indicator"]] = event
+            for connection in list(self._subscribers):
+                try:
+                    delivered = self._send(connection, data)
+                    error = "timed out"
+                except OSError as e:
+                    delivered, error = False, e
+                if not delivered:
+                    self.logger.warning(f"Dropping alert hub client: {error}")
+                    self._subscribers.remove(connection)
+                    self._disconnect(connection)
+            _SUBSCRIBERS.set(len(self._subscribers))
+
+    def handle_input(self, line: bytes):
+        """Act on a client's button or joystick press as if it were on the hub's own display."""
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return
+        if not isinstance(event, dict):
+            return
+        if event.get("op") == "button" and self.on_button:
+            self.on_button()
+        elif event.get("op") == "joystick" and self.on_joystick and \
+                event.get("direction") in ("up", "down", "left", "right"):
+            self.on_joystick(event["direction"])
+
+
+class HubDisplay(IDisplay):
+    """
+    The hub process's display: draws on the local display and publishes the same
+    calls to the hub's clients. Presses on a client display reach the same callbacks
+    as presses on the local one. Heartbeats stay local; each client animates its own.
+    Publishing waits for slow clients for at most AlertHub.SEND_TIMEOUT_SECONDS.
+    """
+
+    def __init__(self, inner: IDisplay, hub: AlertHub):
+        self.inner = inner
+        self.hub = hub
+
+    def display_message(self, title: str, message: str = "", detail: str = "", color=None):
+        self.inner.display_message(title, message, detail, color)
+        self.hub.publish({"op": "message", "title": title, "message": message, "detail": detail,
+                          "color": list(color) if color is not None else None})
+
+    def clear_display(self):
+        self.inner.clear_display()
+        self.hub.publish({"op": "clear"})
+
+    def heartbeat(self):
+        self.inner.heartbeat()
+
+    def set_status(self, indicator: StatusIndicator, active: bool):
+        self.inner.set_status(indicator, active)
+        self.hub.publish({"op": "status", "indicator": indicator.value, "active": active})
+
+    def interrupt(self):
+        self.inner.interrupt()
+        self.hub.publish({"op": "interrupt"})
+
+    def resume(self):
+        self.inner.resume()
+
+    def set_button_press_callback(self, callback: Optional[Callable[[], None]]):
+        self.inner.set_button_press_callback(callback)
+        self.hub.on_button = callback
+
+    def set_joystick_callback(self, callback: Optional[Callable[[str], None]]):
+        self.inner.set_joystick_callback(callback)
+        self.hub.on_joystick = callback
+
+    def close(self):
+        self.hub.stop()
+        self.inner.close()
+
+    @property
+    def supports_long_message(self) -> bool:
+        # Clients get long messages only when the hub's own display takes them
+        return self.inner.supports_long_message
@@ -0,0 +1,133 @@
+import json
+import logging
+import socket
+import threading
+from typing import Optional
+
+from Display.IDisplay import IDisplay, StatusIndicator
+from Hub.AlertHub import encode
+
+
+class HubClient:
+    """
+    A display-only alerter: renders what an AlertHub publishes and forwards button
+    and joystick presses to it. It does no polling, storm detection or database
+    writes, so it costs little more than the display itself.
+
+    If the hub is not running yet or goes away, the client lights its error
+    indicator and reconnects, waiting longer between attempts up to
+    MAX_RECONNECT_SECONDS.
+    """
+
+    HEARTBEAT_SECONDS = 15
+    MAX_RECONNECT_SECONDS = 30
+
+    def __init__(self, display: IDisplay, path: str):
+        """
+        Args:
+            display: The display to draw on
+            path: The hub's socket path
+        """
+        self.display = display
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._socket: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self._stopped = threading.Event()
+        display.set_button_press_callback(self._on_button_pressed)
+        display.set_joystick_callback(self._on_joystick)
+
+    def run(self):
+        """Render hub events until stop() is called."""
+        delay = 1.0
+        waiting_shown = False
+        while not self._stopped.is_set():
+            try:
+                connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                connection.connect(self.path)
+            except OSError as e:
+                connection.close()
+                if not waiting_shown:
+                    self.logger.info(f"Waiting for alert hub at {self.path}: {e}")
+                    self.display.display_message("Waiting for alert hub")
+                    self.display.set_status(StatusIndicator.ERROR, True)
+                    waiting_shown = True
+                self._stopped.wait(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_SECONDS)
+                continue
+            self.logger.info(f"Connected to alert hub at {self.path}")
+            # The hub sends its current state first, which replaces the waiting message
+            self.display.clear_display()
+            self.display.set_status(StatusIndicator.ERROR, False)
+            delay = 1.0
+            waiting_shown = False
+            with self._send_lock:
+                self._socket = connection
+            try:
+                self._receive(connection)
+            except OSError as e:
+                self.logger.warning(f"Lost alert hub connection: {e}")
+            finally:
+                with self._send_lock:
+                    self._socket = None
+                connection.close()
+
+    def stop(self):
+        self._stopped.set()
+        with self._send_lock:
+            if self._socket is not None:
+                try:
+                    self._socket.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def _receive(self, connection: socket.socket):
+        connection.settimeout(self.HEARTBEAT_SECONDS)
+        buffer = b""
+        while not self._stopped.is_set():
+            try:
+                data = connection.recv(4096)
+            except socket.timeout:
+                self.display.heartbeat()
+                continue
+            if not data:
+                return
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                self._apply(line)
+            self.display.heartbeat()
+
+    def _apply(self, line: bytes):
+        """Replay one hub event on the display; unknown or malformed events are ignored."""
+        try:
+            event = json.loads(line)
+            op = event.get("op")
+            if op == "message":
+                self.display.display_message(event.get("title", ""), event.get("message", ""),
+                                             event.get("detail", ""), event.get("color"))
+            elif op == "clear":
+                self.display.clear_display()
+            elif op == "status":
+                self.display.set_status(StatusIndicator(event["indicator"]), bool(event.get("active")))
+            elif op == "interrupt":
+                self.display.interrupt()
+        except (ValueError, KeyError, AttributeError) as e:
+            self.logger.warning(f"Ignoring alert hub event {line[:80]!r}: {e}")
+
+    def _send(self, event: dict):
+        with self._send_lock:
+            if self._socket is None:
+                return
+            try:
+                self._socket.sendall(encode(event))
+            except OSError as e:
+                self.logger.warning(f"Could not send to alert hub: {e}")
+
+    def _on_button_pressed(self):
+        # Acknowledge at once; the hub's "Checking" and result follow
+        self.display.interrupt()
+        self._send({"op": "button"})
+
+    def _on_joystick(self, direction: str):
+        self._send({"op": "joystick", "direction": direction})
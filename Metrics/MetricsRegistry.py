@@ -0,0 +1,221 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond SQLite queries to slow HTTP fetches
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ShardedValues:
+    """
+    A fixed number of float slots, kept as one list per writing thread.
+
+    Each thread only ever writes its own list, so recording takes no lock; a
+    scrape sums the lists. The lock is taken only the first time a thread
+    records, to register its list.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> List[float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = [0.0] * self._size
+            with self._lock:
+                self._shards.append(values)
+            return values
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0.0] * self._size
+        for values in shards:
+            for i, value in enumerate(values):
+                totals[i] += value
+        return totals
+
+
+class Counter:
+    def __init__(self):
+        self._values = _ShardedValues(1)
+
+    def inc(self, amount: float = 1.0):
+        self._values.shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._values.totals()[0]
+
+
+class Gauge:
+    """A value that is set rather than accumulated; a single attribute write needs no lock."""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # Slots: one per bucket, one for +Inf, then the running sum
+        self._values = _ShardedValues(len(self.buckets) + 2)
+
+    def observe(self, value: float):
+        values = self._values.shard()
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of a with-block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """Cumulative bucket counts (including +Inf), total count and sum."""
+        totals = self._values.totals()
+        cumulative = []
+        running = 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class _Family:
+    def __init__(self, kind: str, name: str, documentation: str, label_names: Tuple[str, ...], factory):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not label_names:
+            self._children[()] = factory()
+
+    def labels(self, *values: str):
+        """The metric for one combination of label values, created on first use."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def children(self):
+        with self._lock:
+            return list(self._children.items())
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics, rendered in the Prometheus text exposition format.
+
+    Counters and histograms are recorded without locks (see _ShardedValues), so they
+    are cheap enough to leave on permanently. Gauges can also be computed at scrape
+    time from a callback, which costs nothing between scrapes.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._callbacks: Dict[str, Tuple[str, str, Callable[[], Iterable[Tuple[Dict[str, str], float]]]]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, kind: str, name: str, documentation: str, labels: Sequence[str], factory):
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = _Family(kind, name, documentation, tuple(labels), factory)
+            elif family.kind != kind:
+                raise ValueError(f"metric {name} is already registered as a {family.kind}")
+        return family if labels else family.labels()
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        return self._register("counter", name, documentation, labels, Counter)
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        return self._register("gauge", name, documentation, labels, Gauge)
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS):
+        return self._register("histogram", name, documentation, labels, lambda: Histogram(buckets))
+
+    def gauge_callback(self, name: str, documentation: str,
+                       callback: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        """
+        Register a gauge whose samples are produced when scraped.
+
+        Args:
+            callback: Returns (labels dict, value) pairs; replaces any earlier callback for the name
+        """
+        with self._lock:
+            self._callbacks[name] = ("gauge", documentation, callback)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text format."""
+        with self._lock:
+            families = list(self._families.values())
+            callbacks = list(self._callbacks.items())
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, metric in family.children():
+                labels = dict(zip(family.label_names, values))
+                if isinstance(metric, Histogram):
+                    cumulative, count, total = metric.snapshot()
+                    for bound, bucket_count in zip(metric.buckets + (float("inf"),), cumulative):
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{family.name}_bucket{_labels(labels, le=le)} {_number(bucket_count)}")
+                    lines.append(f"{family.name}_count{_labels(labels)} {_number(count)}")
+                    lines.append(f"{family.name}_sum{_labels(labels)} {_number(total)}")
+                else:
+                    lines.append(f"{family.name}{_labels(labels)} {_number(metric.value)}")
+        for name, (kind, documentation, callback) in callbacks:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            try:
+                samples = list(callback())
+            except Exception:
+                samples = []
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str], **extra: str) -> str:
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+# The registry every module records into
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,71 @@
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from Metrics.MetricsRegistry import MetricsRegistry, REGISTRY
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """
+    Serves a MetricsRegistry at /metrics in Prometheus text format from a daemon thread.
+
+    Disabled unless a port is configured; see from_environment().
+    """
+
+    daemon_threads = True
+    PORT_VARIABLE = "WEATHER_ALERTER_METRICS_PORT"
+    ADDRESS_VARIABLE = "WEATHER_ALERTER_METRICS_ADDRESS"
+    DEFAULT_ADDRESS = "127.0.0.1"
+
+    def __init__(self, port: int, address: str = DEFAULT_ADDRESS, registry: MetricsRegistry = REGISTRY):
+        super().__init__((address, port), _Handler)
+        self.registry = registry
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_environment(cls) -> Optional["MetricsServer"]:
+        """
+        Create a server from WEATHER_ALERTER_METRICS_PORT (and optionally
+        WEATHER_ALERTER_METRICS_ADDRESS), or return None if no port is set.
+
+        Raises:
+            ValueError: If the port is not a number
+            OSError: If the address cannot be bound
+        """
+        port = os.environ.get(cls.PORT_VARIABLE)
+        if not port:
+            return None
+        return cls(int(port), os.environ.get(cls.ADDRESS_VARIABLE, cls.DEFAULT_ADDRESS))
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logging.getLogger(__name__).info(f"Serving metrics at {self.url}")
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
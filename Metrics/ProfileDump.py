@@ -0,0 +1,117 @@
+import collections
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from typing import Counter, Optional, Tuple
+
+from Metrics.SpanRecorder import SPANS, SpanRecorder
+
+
+class ProfileDumper:
+    """
+    Writes a diagnostic snapshot of a running process to a file on request, usually SIGUSR1.
+
+    The snapshot holds the recent timing spans, every thread's current stack, and a
+    time-boxed statistical profile built by sampling all threads' stacks with
+    sys._current_frames(). Sampling sees every thread at once, which cProfile cannot
+    do for threads that are already running, and costs nothing until a dump is asked for.
+    The collapsed-stack section can be fed straight to flamegraph.pl.
+    """
+
+    SAMPLE_SECONDS = 5.0
+    SAMPLE_INTERVAL_SECONDS = 0.005
+
+    def __init__(self, directory: str, spans: SpanRecorder = SPANS):
+        """
+        Args:
+            directory: Where profile-<timestamp>.txt files are written
+            spans: Recorder whose recent cycles are included
+        """
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.spans = spans
+        self._thread: Optional[threading.Thread] = None
+
+    def install(self, signum: int = signal.SIGUSR1):
+        """Dump on the given signal. Must be called from the main thread."""
+        signal.signal(signum, self._on_signal)
+
+    def _on_signal(self, signum, frame):
+        # Signal handlers run on the main thread between bytecodes; do the work elsewhere
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._dump_with_logging, name="profile-dump", daemon=True)
+        self._thread.start()
+
+    def _dump_with_logging(self):
+        try:
+            path = self.dump()
+            self.logger.info(f"Profile written to {path}")
+        except Exception as e:
+            self.logger.error(f"Profile dump failed: {e}", exc_info=True)
+
+    def dump(self) -> str:
+        """Capture a snapshot and write it; returns the file path."""
+        started = time.time()
+        current_stacks = self._format_current_stacks()
+        samples, sample_count = self.sample_stacks(self.SAMPLE_SECONDS, self.SAMPLE_INTERVAL_SECONDS)
+        path = os.path.join(self.directory, time.strftime("profile-%Y%m%d-%H%M%S.txt", time.localtime(started)))
+        with open(path, "w") as file:
+            file.write(f"# Profile of pid {os.getpid()} at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))}\n\n")
+            file.write("## Recent timing spans (ms)\n")
+            file.write(self.spans.format())
+            file.write("\n## Thread stacks at signal\n")
+            file.write(current_stacks)
+            file.write(f"\n## Sampled stacks: {sample_count} samples over {self.SAMPLE_SECONDS:g} s, "
+                       f"every {self.SAMPLE_INTERVAL_SECONDS * 1000:g} ms\n")
+            file.write("# Collapsed format: thread;outermost;...;innermost count\n")
+            for stack, count in samples.most_common():
+                file.write(f"{';'.join(stack)} {count}\n")
+        return path
+
+    @staticmethod
+    def _thread_names():
+        return {thread.ident: thread.name for thread in threading.enumerate()}
+
+    def _format_current_stacks(self) -> str:
+        names = self._thread_names()
+        lines = []
+        for ident, frame in sys._current_frames().items():
+            if ident == threading.get_ident():
+                continue
+            lines.append(f"--- {names.get(ident, ident)}\n")
+            lines.extend(traceback.format_stack(frame))
+        return "".join(lines)
+
+    def sample_stacks(self, seconds: float, interval: float) -> Tuple[Counter, int]:
+        """
+        Sample every other thread's stack repeatedly.
+
+        Returns:
+            Tuple of (Counter of collapsed stacks, number of sampling passes)
+        """
+        samples: Counter = collections.Counter()
+        own_ident = threading.get_ident()
+        names = self._thread_names()
+        passes = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if ident not in names:
+                    names = self._thread_names()
+                stack.append(str(names.get(ident, ident)))
+                samples[tuple(reversed(stack))] += 1
+            passes += 1
+            time.sleep(interval)
+        return samples, passes
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+class _Cycle:
+    __slots__ = ("loop", "started", "duration", "spans", "_origin", "_stack")
+
+    def __init__(self, loop: str):
+        self.loop = loop
+        self.started = time.time()
+        self._origin = time.perf_counter()
+        self.duration: Optional[float] = None
+        # (stage path, offset from cycle start, duration), in the order stages finish
+        self.spans: List[Tuple[str, float, float]] = []
+        self._stack: List[str] = []
+
+
+class SpanRecorder:
+    """
+    Records named timing spans for the stages of each loop iteration ("cycle").
+
+    A thread opens a cycle for one iteration of its loop and wraps each stage in
+    span(); nested spans are recorded under a "parent/child" path. Finished cycles
+    are kept in a bounded ring per loop, so the recorder always holds the most
+    recent history and nothing more. Spans outside a cycle are not recorded, which
+    keeps library code like WeatherBoxClient free to mark its stages unconditionally.
+    """
+
+    def __init__(self, cycles_per_loop: int = 50):
+        self.cycles_per_loop = cycles_per_loop
+        self._local = threading.local()
+        self._rings: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def cycle(self, loop: str):
+        """Time one iteration of a loop; spans opened inside it on this thread belong to it."""
+        outer = getattr(self._local, "cycle", None)
+        cycle = self._local.cycle = _Cycle(loop)
+        try:
+            yield
+        finally:
+            cycle.duration = time.perf_counter() - cycle._origin
+            self._local.cycle = outer
+            ring = self._rings.get(loop)
+            if ring is None:
+                with self._lock:
+                    ring = self._rings.setdefault(loop, deque(maxlen=self.cycles_per_loop))
+            ring.append(cycle)
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time one stage of the current cycle."""
+        cycle = getattr(self._local, "cycle", None)
+        if cycle is None:
+            yield
+            return
+        cycle._stack.append(stage)
+        path = "/".join(cycle._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            cycle._stack.pop()
+            cycle.spans.append((path, start - cycle._origin, end - start))
+
+    def recent(self) -> Dict[str, List[_Cycle]]:
+        """Snapshot of the recorded cycles, oldest first, by loop name."""
+        with self._lock:
+            rings = list(self._rings.items())
+        return {loop: list(ring) for loop, ring in rings}
+
+    def format(self) -> str:
+        """Recent cycles as text: per-stage averages and maxima, then each cycle's spans."""
+        lines = []
+        for loop, cycles in sorted(self.recent().items()):
+            finished = [cycle for cycle in cycles if cycle.duration is not None]
+            lines.append(f"== {loop}: {len(finished)} recent cycles")
+            totals: Dict[str, List[float]] = {}
+            for cycle in finished:
+                for path, _, duration in cycle.spans:
+                    totals.setdefault(path, []).append(duration)
+            for path, durations in sorted(totals.items()):
+                lines.append(f"  {path:<40} n={len(durations):<4} mean={sum(durations) / len(durations) * 1000:9.3f} ms"
+                             f"  max={max(durations) * 1000:9.3f} ms")
+            for cycle in finished:
+                started = time.strftime("%H:%M:%S", time.localtime(cycle.started))
+                stages = ", ".join(f"{path}={duration * 1000:.3f}" for path, _, duration in cycle.spans)
+                lines.append(f"  {started} total={cycle.duration * 1000:.3f} ms: {stages}")
+        return "\n".join(lines) + "\n"
+
+
+# The recorder every loop records into
+SPANS = SpanRecorder()
@@ -0,0 +1,76 @@
+import math
+import random
+from typing import Optional
+
+
+class PollScheduler:
+    """
+    Works out when a location is next polled. All times are time.monotonic() seconds,
+    so wall-clock jumps (NTP sync after boot, DST) neither stall nor burst polling.
+
+    After a successful poll the next check is one interval after the check that was
+    due, not after the fetch finished, so slow requests do not make the cadence drift;
+    ticks missed while the alerter was busy are skipped rather than fired back to back.
+    After a failure the delay grows exponentially, capped and jittered so several
+    alerters pointed at one recovering WeatherBox do not retry in lockstep.
+    """
+
+    MIN_INTERVAL_SECONDS = 15
+    # While a local storm is active every location is checked at least this often
+    STORM_INTERVAL_SECONDS = 60
+    # The server's max-age/Retry-After is honoured up to this long; beyond it a
+    # misconfigured header would silence alerts
+    MAX_HINT_SECONDS = 15 * 60
+    # Alerts that call for a recheck this often (severe ones) keep their interval
+    # whatever max-age says; a cached response must not delay news of them
+    URGENT_RECHECK_SECONDS = 60
+    BACKOFF_BASE_SECONDS = 30
+    BACKOFF_MAX_SECONDS = 15 * 60
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+
+    def interval(self, recheck_seconds: float, expires_in: Optional[float] = None,
+                 max_age: Optional[float] = None, storm_active: bool = False) -> float:
+        """
+        Seconds until the next poll after a successful one.
+
+        Args:
+            recheck_seconds: The interval the location's most urgent alert calls for
+            expires_in: Seconds until that alert expires, so the poll after it lapses is not late
+            max_age: Cache-Control max-age of the response; polling sooner only returns the same data.
+                It never lengthens an urgent alert's interval or a storm's
+            storm_active: Whether the storm detector has fired recently
+        """
+        interval = float(recheck_seconds)
+        if expires_in is not None and expires_in > 0:
+            interval = min(interval, expires_in)
+        if max_age:
+            ceiling = recheck_seconds if recheck_seconds <= self.URGENT_RECHECK_SECONDS else self.MAX_HINT_SECONDS
+            interval = max(interval, min(max_age, ceiling))
+        if storm_active:
+            interval = min(interval, self.STORM_INTERVAL_SECONDS)
+        return max(interval, self.MIN_INTERVAL_SECONDS)
+
+    def next_due(self, due: float, interval: float, now: float) -> float:
+        """
+        The fixed-rate check after one that was due at due. An early poll (an on-demand
+        check) restarts the schedule from now.
+        """
+        next_check = min(due, now) + interval
+        if next_check <= now:
+            next_check += (math.floor((now - next_check) / interval) + 1) * interval
+        return next_check
+
+    def backoff(self, failures: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait after the given number of consecutive failures (1 or more).
+
+        The delay is drawn between half and all of BACKOFF_BASE_SECONDS * 2 ** (failures - 1),
+        capped at BACKOFF_MAX_SECONDS; a Retry-After from the server is a lower bound.
+        """
+        ceiling = min(self.BACKOFF_MAX_SECONDS, self.BACKOFF_BASE_SECONDS * 2 ** min(failures - 1, 16))
+        delay = ceiling / 2 + self._rng.uniform(0, ceiling / 2)
+        if retry_after:
+            delay = max(delay, min(retry_after, self.MAX_HINT_SECONDS))
+        return delay
@@ -0,0 +1,174 @@
+import email.utils
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from Metrics.SpanRecorder import SPANS
+
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class CacheHints:
+    """How long the server says a response stays fresh, and how long to wait before asking again."""
+    max_age: Optional[float] = None         # Cache-Control: max-age, in seconds
+    retry_after: Optional[float] = None     # Retry-After, converted to seconds from now
+
+    @classmethod
+    def from_headers(cls, headers: Optional[Mapping[str, str]]) -> "CacheHints":
+        """Read the hints from response headers; unreadable values are ignored."""
+        if not headers:
+            return cls()
+        max_age = None
+        match = _MAX_AGE.search(headers.get("Cache-Control") or "")
+        if match:
+            max_age = float(match.group(1))
+        return cls(max_age, cls._parse_retry_after(headers.get("Retry-After")))
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, when.timestamp() - time.time())
+
+
+@dataclass
+class _CachedResponse:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    data: Any
+
+
+class WeatherBoxClient:
+    """
+    HTTP client for the WeatherBox API.
+
+    Keeps one pooled keep-alive session so repeated polls reuse the TCP
+    connection, applies explicit connect/read timeouts, and revalidates with
+    ETag / If-Modified-Since so an unchanged alert costs a 304 with no body.
+    """
+
+    CONNECT_TIMEOUT_SECONDS = 5
+    READ_TIMEOUT_SECONDS = 15
+    POOL_SIZE = 10
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Args:
+            session: Optional preconfigured session; a pooled session is created if omitted
+        """
+        self.logger = logging.getLogger(__name__)
+        # Proxy and CA bundle settings per URL, read from the environment once rather
+        # than on every request; None when the session reads the environment itself
+        self._environment: Optional[Dict[str, dict]] = None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            # requests scans os.environ for proxies twice per request, holding the GIL,
+            # which serialized concurrent polls; netrc credentials are not consulted
+            session.trust_env = False
+            self._environment = {}
+        session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        self._session = session
+        self._cache: Dict[str, _CachedResponse] = {}
+        self._cache_lock = threading.Lock()
+
+    @property
+    def timeout(self) -> tuple:
+        return self.CONNECT_TIMEOUT_SECONDS, self.READ_TIMEOUT_SECONDS
+
+    def _request_settings(self, url: str) -> dict:
+        """The proxies and verify arguments requests would take from the environment for url."""
+        if self._environment is None:
+            return {}
+        settings = self._environment.get(url)
+        if settings is None:
+            settings = {"proxies": requests.utils.get_environ_proxies(url),
+                        "verify": os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE") or True}
+            self._environment[url] = settings
+        return settings
+
+    def _get(self, url: str, headers: dict) -> requests.Response:
+        with SPANS.span("http"):
+            return self._session.get(url, headers=headers, timeout=self.timeout, **self._request_settings(url))
+
+    def get_json(self, url: str) -> Any:
+        """
+        GET a JSON document, reusing the cached body when the server answers 304.
+
+        Args:
+            url: Full WeatherBox URL
+
+        Returns:
+            The decoded JSON body
+
+        Raises:
+            requests.RequestException: On connection errors, timeouts and HTTP error statuses
+            ValueError: If the body is not valid JSON
+        """
+        return self.get_json_with_hints(url)[0]
+
+    def get_json_with_hints(self, url: str) -> Tuple[Any, CacheHints]:
+        """
+        Like get_json, but also return the response's Cache-Control and Retry-After hints.
+        An HTTP error status raises requests.HTTPError, whose response carries the headers;
+        a 304 with no cached body to reuse raises ValueError if refetching does not help.
+        """
+        with self._cache_lock:
+            cached = self._cache.get(url)
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        response = self._get(url, headers)
+        if response.status_code == 304 and not cached:
+            # Nothing cached to reuse, e.g. a proxy still holding a validator from before a
+            # restart; ask again, telling caches on the way to go back to the server
+            self.logger.warning(f"WeatherBox answered 304 with nothing cached, refetching: {url}")
+            response = self._get(url, {"Cache-Control": "no-cache", "Pragma": "no-cache"})
+            if response.status_code == 304:
+                raise ValueError(f"WeatherBox answered 304 Not Modified to an unconditional request: {url}")
+        hints = CacheHints.from_headers(response.headers)
+        if response.status_code == 304 and cached:
+            self.logger.debug(f"WeatherBox response not modified: {url}")
+            return cached.data, hints
+        response.raise_for_status()
+        with SPANS.span("decode"):
+            data = response.json()
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._cache_lock:
+            if etag or last_modified:
+                self._cache[url] = _CachedResponse(etag, last_modified, data)
+            else:
+                self._cache.pop(url, None)
+        return data, hints
+
+    def close(self):
+        """Close pooled connections."""
+        self._session.close()
@@ -4,15 +4,45 @@ from logging.handlers import RotatingFileHandler
 import os.path
 import sys
 import threading
+import time
 import traceback
-from dataclasses import dataclass, fields
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
 from time import sleep
-from typing import Optional
-
-import requests
+from typing import List, Optional, Tuple
 
+from Alerts.AlertCache import AlertCache
+from Alerts.AlertDiff import AlertChange, AlertDiffer, AlertKey
+from Alerts.AlertQueue import AlertQueue, QueuedAlert, parse_expires
+from Configuration.AlerterConfig import AlerterConfig
+from Configuration.ConfigWatcher import ConfigWatcher
 from Display.DisplayFactory import DisplayFactory
-from Display.IDisplay import IDisplay
+from Display.IDisplay import IDisplay, StatusIndicator
+from Hardware.HardwareCache import HardwareCache
+from Metrics.MetricsRegistry import REGISTRY
+from Metrics.ProfileDump import ProfileDumper
+from Metrics.SpanRecorder import SPANS
+from WeatherBox.PollScheduler import PollScheduler
+
+_REQUEST_SECONDS = REGISTRY.histogram("weatherbox_request_seconds", "WeatherBox alert request latency, including 304s")
+_REQUEST_ERRORS = REGISTRY.counter("weatherbox_request_errors_total", "Failed WeatherBox alert requests",
+                                   labels=("error",))
+_REQUEST_BACKOFFS = REGISTRY.counter("weatherbox_request_backoff_seconds_total",
+                                     "Seconds of polling deferred by error backoff and Retry-After")
+_ALERT_CHANGES = REGISTRY.counter("alerter_alert_changes_total", "Polls by how the displayed alert changed",
+                                  labels=("change",))
+
+# The locally detected storm has no WeatherAlert, so it gets a fixed key
+_STORM_KEY = AlertKey("storm", "")
+
+
+def weatherbox_errors() -> tuple:
+    """
+    Exceptions a WeatherBox fetch can raise. requests is slow to import on a Pi
+    Zero, so it is only imported here and by WeatherBoxClient, never at startup.
+    """
+    import requests
+    return requests.RequestException, ValueError
 
 
 @dataclass
@@ -35,6 +65,20 @@ class WeatherAlert:
     nws_headline: Optional[str] = None
 
 
+@dataclass
+class MonitoredLocation:
+    state: str
+    city: str
+    api_url: str
+    recheck_seconds: int = 300
+    # time.monotonic() seconds the next poll is due
+    next_check: float = field(default_factory=time.monotonic)
+    weather_alert: Optional[WeatherAlert] = None
+    failures: int = 0       # Consecutive failed polls, for backoff
+    # time.time() of the last successful poll, or of the cached alerts restored at startup
+    fetched_at: Optional[float] = None
+
+
 class Alerter:
     recheck_seconds:int = 300  # 5 minutes
     persistent_message:str = ""
@@ -43,7 +87,8 @@ class Alerter:
     api_url:str = ""
     check_now_event: threading.Event = None
     on_demand_check_requested: bool = False
-    muted_alert_state: Optional[tuple] = None
+    muted_alert_state: Optional[AlertKey] = None
+    browse_index: int = -1
 
     def is_storm_active(self) -> bool:
         if self.last_storm_callback is None:
@@ -53,77 +98,190 @@ class Alerter:
 
     last_storm_callback: datetime.datetime = None
     local_storm_time_to_live_minutes: int = 30
+    # Seconds shutdown() waits for the storm detector to close its pressure store
+    DETECTOR_STOP_TIMEOUT_SECONDS = 10
+    # Upper bound on simultaneous WeatherBox requests when several locations are due
+    max_concurrent_fetches: int = 10
+    # An unchanged alert is scrolled again this often as a reminder, unless muted
+    alert_reminder_seconds: int = 300
+    # With several active alerts, each is shown for this long before moving to the next
+    alert_rotation_seconds: int = 30
 
-    def __init__(self, display: IDisplay):
+    def __init__(self, display: IDisplay, config_path: Optional[str] = None,
+                 hardware_cache: Optional[HardwareCache] = None):
+        from WeatherBox.WeatherBoxClient import WeatherBoxClient
         self.display: IDisplay = display
         self.state:str = ""
         self.city:str = ""
         self.weather_box_server: str = ""
-        self.last_config: str = ""
+        self.config_path: str = config_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.txt')
+        self.config: Optional[AlerterConfig] = None
+        self.config_watcher: Optional[ConfigWatcher] = None
         self.storm_detector = None
+        self.hardware_cache = hardware_cache
+        # monotonic time the process started, for the startup timing log
+        self.started_at: float = time.monotonic()
+        self.weather_box_client = WeatherBoxClient()
+        self.locations: List[MonitoredLocation] = []
+        self.scheduler = PollScheduler()
+        self._fetch_pool = ThreadPoolExecutor(max_workers=self.max_concurrent_fetches,
+                                              thread_name_prefix="weatherbox-fetch")
         self.check_now_event = threading.Event()
         self.on_demand_check_requested = False
         self.muted_alert_state = None
+        self.alert_differ = AlertDiffer()
+        # Every active alert across all locations, most urgent first
+        self.alerts = AlertQueue()
+        # Last good alerts per location, so a restart or an outage keeps showing active warnings
+        self.alert_cache = AlertCache(os.path.join(os.path.dirname(self.config_path), AlertCache.DEFAULT_FILENAME))
+        self._rotation_fingerprint: Optional[str] = None
+        self._rotation_started: float = 0.0
+        # monotonic time the current alert was last drawn in full
+        self._alert_shown_at: float = 0.0
         self.display.set_button_press_callback(self._on_button_pressed)
+        self.display.set_joystick_callback(self._on_joystick)
         self.logger = logging.getLogger(__name__)
+        self.detector_thread: Optional[threading.Thread] = None
+        REGISTRY.gauge_callback("alerter_recheck_seconds", "Current polling interval for each monitored location",
+                                lambda: [({"state": location.state, "city": location.city}, location.recheck_seconds)
+                                         for location in self.locations])
+        REGISTRY.gauge_callback("alerter_thread_alive", "1 if a background thread is running, 0 if it has died",
+                                self._thread_liveness)
 
     def run(self):
         self._start_storm_detector()      
-        next_check: datetime = datetime.datetime.now()
+        self.config_watcher = ConfigWatcher(self.config_path, on_change=self._on_config_changed)
+        self.config_watcher.start()
+        self.apply_config(self.config_watcher.config)
+        if self.alerts:
+            # Show the cached alerts now; the first fetch revalidates them
+            self.logger.info(f"Startup: showing {len(self.alerts)} cached alert(s) "
+                             f"{(time.monotonic() - self.started_at) * 1000:.0f} ms after launch")
+            self._show_alerts()
+        next_check = time.monotonic()
         while True:
-            while datetime.datetime.now() <= next_check:
-                if self.check_now_event.wait(timeout=15):
+            while time.monotonic() < next_check:
+                # Sleep no further than the next check, heartbeating at least every 15 seconds
+                if self.check_now_event.wait(timeout=min(15.0, next_check - time.monotonic())):
                     self.check_now_event.clear()
-                    self.display.display_message("Checking")
                     break
                 self.display.heartbeat()
+                self.display.set_status(StatusIndicator.STORM, self.is_storm_active())
+
+            with SPANS.cycle("alerter"):
+                with SPANS.span("config"):
+                    # The watcher swaps in a new config object only when the file changes
+                    config = self.config_watcher.config
+                    if config is not self.config:
+                        self.apply_config(config)
+                with SPANS.span("process_alerts"):
+                    self.process_alerts()
+            # Wake for whichever location is due first; each keeps its own interval
+            next_check = min(location.next_check for location in self.locations)
+            if len(self.alerts) > 1:
+                # Also wake in time to rotate to the next alert
+                next_check = min(next_check, time.monotonic() + self.alert_rotation_seconds)
+
+    def apply_config(self, config: AlerterConfig):
+        """
+        Switch to a new configuration. Locations whose URL is unchanged keep their
+        schedule and latest alert; new locations are due immediately and start with
+        their cached alerts, if any are still active.
+        """
+        existing = {location.api_url: location for location in self.locations}
+        locations = []
+        for place in config.locations:
+            api_url = config.api_url(place)
+            location = existing.get(api_url)
+            if location is None:
+                location = MonitoredLocation(place.state, place.city, api_url)
+                self._restore_cached_alerts(location)
+            locations.append(location)
+        removed = existing.keys() - {location.api_url for location in locations}
+        for api_url in removed:
+            self.alerts.replace_source(api_url, [])
+        self.alert_cache.discard(removed)
+        self.locations = locations
+        self.config = config
+        self.weather_box_server = config.weather_box_server
+        self.state, self.city = config.locations[0].state, config.locations[0].city
+        self.api_url = locations[0].api_url
+        self.display.display_message("Monitoring " + "; ".join(f"{place.city}, {place.state}" for place in config.locations))
+        self.display.clear_display()
+        self.alert_differ.reset()
+        self.muted_alert_state = None
+
+    def _on_config_changed(self, config: AlerterConfig):
+        """Called from the config watcher thread; wakes the main loop to apply the change now."""
+        self.logger.info("Config changed - triggering immediate check")
+        self.check_now_event.set()
 
-            config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.txt')
-            with open(config_path, 'r') as file:
-                read = file.read()
-                self.weather_box_server, self.state, self.city = read.strip().split('\n')
-                if read != self.last_config:
-                    self.display.display_message(f"Monitoring {self.city}, {self.state}")
-                    self.display.clear_display()
-                    self.last_config = read
-                    self.muted_alert_state = None
-                self.api_url = f"{self.weather_box_server}/weather-alert/{self.state}/{self.city}"
-                file.close()
-            self.process_alerts()
-            next_check = datetime.datetime.now() + datetime.timedelta(seconds=self.recheck_seconds)
 
+    def _restore_cached_alerts(self, location: MonitoredLocation):
+        """Queue a location's cached alerts that have not expired yet."""
+        alerts = [self._parse_alert(data) for data in self.alert_cache.load(location.api_url)]
+        location.fetched_at = self.alert_cache.fetched_at(location.api_url)
+        for alert in alerts:
+            if alert:
+                self.alerts.push(self._queued_alert(location, alert))
+        self._update_location_from_queue(location)
 
     def process_alerts(self):
-        weather_alert = self.get_weather_alert()
+        with SPANS.span("poll"):
+            self._poll_locations()
+        self._show_alerts()
+
+    def _show_alerts(self):
+        """Draw the alert the rotation is on, if anything about it is worth drawing."""
+        queued = self._rotate_alerts()
+        weather_alert = queued.alert if queued else None
         self.logger.info(f"process_alerts: weather_alert={weather_alert is not None}, storm_active={self.is_storm_active()}, on_demand={self.on_demand_check_requested}")
         if weather_alert or self.is_storm_active():
             alert_title = ""
             alert_color = [255, 255, 255]
             if weather_alert:
-                alert_color = self.get_alert_color(weather_alert.severity, weather_alert.urgency)
+                alert_color = queued.color
             if self.is_storm_active() and alert_color != [255, 0, 0]:
                 # a local storm has been detected, and there is not a current warning from the national weather service
                 # so preempt any nws message and alert about the detected storm, instead
                 alert_title = "Nearby Storm Detected"
                 alert_color = [255, 0, 255]
-                self.recheck_seconds = 60
+                self.recheck_seconds = PollScheduler.STORM_INTERVAL_SECONDS
+                for location in self.locations:
+                    location.next_check = min(location.next_check, time.monotonic() + self.recheck_seconds)
             elif weather_alert and weather_alert.event:
                 alert_title = weather_alert.event
+                location = next((location for location in self.locations if location.api_url == queued.source), None)
+                if len(self.locations) > 1 and location:
+                    alert_title += f" - {location.city}"
             else:
                 pass
 
-            # Check if this alert is muted
-            current_state = ("STORM",) if alert_title == "Nearby Storm Detected" else ("NWS", weather_alert)
-            if not self.on_demand_check_requested and current_state == self.muted_alert_state:
-                self.logger.info(f"Skipping display of muted alert: {alert_title}")
-                return
+            current_state = _STORM_KEY if alert_title == "Nearby Storm Detected" else AlertKey.of(weather_alert)
+            change = self.alert_differ.diff(current_state)
+            _ALERT_CHANGES.labels(change.value).inc()
+            if not self.on_demand_check_requested:
+                # Check if this alert is muted; any update changes its key and unmutes it
+                if current_state == self.muted_alert_state:
+                    self.logger.info(f"Skipping display of muted alert: {alert_title}")
+                    return
+                # The display still shows this alert (the LED matrix leaves a coloured
+                # full stop), so only scroll it again now and then as a reminder
+                if change is AlertChange.UNCHANGED and \
+                        time.monotonic() - self._alert_shown_at < self.alert_reminder_seconds:
+                    self.logger.info(f"Alert unchanged, not redrawing: {alert_title}")
+                    return
 
             if self.on_demand_check_requested:
                 self.muted_alert_state = current_state
-            else:
+            elif not (self.muted_alert_state in self.alerts or
+                      (self.muted_alert_state == _STORM_KEY and self.is_storm_active())):
+                # Stay muted while the muted alert is still rotating; forget it once it is gone or changed
                 self.muted_alert_state = None
 
+            self.logger.info(f"Displaying {change.value} alert: {alert_title}")
             self.display.display_message(title=alert_title, color=alert_color)
+            self._alert_shown_at = time.monotonic()
             
             # Show detailed nws_headline on on-demand checks if display supports it
             if (self.on_demand_check_requested and 
@@ -136,99 +294,316 @@ class Alerter:
         else:
             # No valid weather alert and no storm active
             self.muted_alert_state = None
+            change = self.alert_differ.diff(None)
             if self.on_demand_check_requested:
                 self.logger.info("Displaying 'No current alerts' message for on-demand check")
                 self.display.display_message("No current alerts")
+                self.alert_differ.reset()
                 self.on_demand_check_requested = False
-            else:
+            elif change is AlertChange.CLEARED:
+                _ALERT_CHANGES.labels(change.value).inc()
                 self.display.clear_display()
 
-    def get_weather_alert(self) -> Optional[WeatherAlert]:
-        try:
-            if self.first_api_request:
-                self.display.display_message("Connecting")
-            response = requests.get(self.api_url)
-            response.raise_for_status()
-            if self.first_api_request:
+    def _poll_locations(self):
+        """
+        Fetch every location that is due (all of them for an on-demand check)
+        concurrently, then schedule each location's next check from its own result.
+        """
+        now = time.monotonic()
+        due = [location for location in self.locations
+               if self.on_demand_check_requested or location.next_check <= now]
+        if not due:
+            return
+        if self.first_api_request and not self.alerts:
+            self.display.display_message("Connecting")
+            self.alert_differ.reset()
+
+        self.display.set_status(StatusIndicator.FETCHING, True)
+        futures = [(location, self._fetch_pool.submit(self.fetch_weather_alerts, location.api_url))
+                   for location in due]
+        failures = 0
+        retry_seconds = 0.0
+        for location, future in futures:
+            try:
+                alerts, complete, hints = future.result()
+                entries = [self._queued_alert(location, alert) for alert in alerts]
+                if complete:
+                    self.alerts.replace_source(location.api_url, entries)
+                else:
+                    # The server reports one alert at a time; keep the others until they expire
+                    for entry in entries:
+                        self.alerts.push(entry)
+                location.fetched_at = time.time()
+                self._update_location_from_queue(location)
+                self._schedule(location, hints.max_age)
+                self.alert_cache.store(location.api_url,
+                                       [asdict(entry.alert) for entry in self.alerts.for_source(location.api_url)])
+            except weatherbox_errors() as e:
+                # Queued alerts stay until they expire, so a failed fetch does not hide a warning
+                self.logger.error(f"Error fetching weather alert for {location.city}, {location.state}: {e}", exc_info=True)
+                self._drop_unconfirmed_alerts(location)
+                location.failures += 1
+                delay = self.scheduler.backoff(location.failures, self._retry_after(e))
+                _REQUEST_BACKOFFS.inc(delay)
+                location.recheck_seconds = round(delay)
+                location.next_check = time.monotonic() + delay
+                retry_seconds = max(retry_seconds, delay)
+                failures += 1
+        self.display.set_status(StatusIndicator.FETCHING, False)
+        self.display.set_status(StatusIndicator.ERROR, failures > 0)
+
+        if failures:
+            # While alerts are active the error light is enough; scrolling would hide them
+            if not self.alerts:
+                self.display.display_message(f"Error getting weather data. Retrying in {retry_seconds:.0f} seconds.")
+                self.alert_differ.reset()
+        elif self.first_api_request:
+            if not self.alerts:
                 self.display.display_message("Connected")
-                self.first_api_request = False
-            data = response.json()
-            
-            # Return None if no alert event is present
-            if not data.get('event'):
-                self.logger.info("No active weather alerts")
-                return None
-            
-            # Ignore alerts with "UNKNOWN" severity
-            if (data.get('severity') or '').upper() == 'UNKNOWN':
-                self.logger.info(f"Ignoring alert with UNKNOWN severity: {data.get('event', 'N/A')}")
-                return None
-            
-            # Filter out alerts with urgency_score of 1
-            if data.get('urgency_score') == 1:
-                self.logger.info(f"Ignoring alert with urgency_score=1 (Future): {data.get('event', 'N/A')}")
-                return None
-            
-            # Filter data to only include fields defined in WeatherAlert
-            valid_fields = {f.name for f in fields(WeatherAlert)}
-            filtered_data = {k: v for k, v in data.items() if k in valid_fields}
-            return WeatherAlert(**filtered_data)
-        except (requests.RequestException, ValueError) as e:
-            self.logger.error(f"Error fetching weather alert: {e}", exc_info=True)
-            self.display.display_message("Error getting weather data. Retrying in 30 seconds.")
-            self.recheck_seconds = 30
+                self.alert_differ.reset()
+            self.first_api_request = False
+            self.logger.info(f"Startup: first WeatherBox fetch completed "
+                             f"{(time.monotonic() - self.started_at) * 1000:.0f} ms after launch")
+        self.recheck_seconds = min(location.recheck_seconds for location in self.locations)
+
+    def _drop_unconfirmed_alerts(self, location: MonitoredLocation):
+        """
+        Drop a failing location's alerts that have no expires time once its last good
+        fetch is older than AlertCache.MAX_AGE_SECONDS; nothing else would ever end them.
+        """
+        if location.fetched_at is not None and time.time() - location.fetched_at <= AlertCache.MAX_AGE_SECONDS:
+            return
+        stale = [entry for entry in self.alerts.for_source(location.api_url) if entry.expires_at is None]
+        for entry in stale:
+            self.logger.info(f"Dropping {entry.alert.event} for {location.city}: not confirmed for over "
+                             f"{AlertCache.MAX_AGE_SECONDS // 60} minutes and it has no expiry time")
+            self.alerts.remove(entry.key.fingerprint)
+        if stale:
+            self._update_location_from_queue(location)
+
+    def _queued_alert(self, location: MonitoredLocation, alert: WeatherAlert) -> QueuedAlert:
+        """Classify an alert once, as it enters the queue."""
+        color, recheck_seconds = self.classify_alert(alert.severity, alert.urgency)
+        return QueuedAlert(AlertKey.of(alert), location.api_url, alert, color, recheck_seconds,
+                           self.alert_priority(alert, recheck_seconds), parse_expires(alert.expires))
+
+    def _schedule(self, location: MonitoredLocation, max_age: Optional[float] = None):
+        """Set a successfully polled location's next check from its alerts and the response's max-age."""
+        top = self.alerts.top_for_source(location.api_url)
+        expires_in = top.expires_at - time.time() if top and top.expires_at is not None else None
+        interval = self.scheduler.interval(location.recheck_seconds, expires_in, max_age, self.is_storm_active())
+        location.failures = 0
+        location.recheck_seconds = round(interval)
+        location.next_check = self.scheduler.next_due(location.next_check, interval, time.monotonic())
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """The Retry-After seconds of a failed request's response, if it had one."""
+        from WeatherBox.WeatherBoxClient import CacheHints
+        return CacheHints.from_headers(getattr(getattr(error, "response", None), "headers", None)).retry_after
+
+    def _update_location_from_queue(self, location: MonitoredLocation):
+        """The location's shown alert and cadence follow the most urgent of its queued alerts."""
+        top = self.alerts.top_for_source(location.api_url)
+        location.weather_alert = top.alert if top else None
+        location.recheck_seconds = top.recheck_seconds if top else self.recheck_seconds_for(None)
+
+    def _rotate_alerts(self) -> Optional[QueuedAlert]:
+        """
+        Drop expired alerts and pick the one to display: the most urgent first, then
+        each in priority order for alert_rotation_seconds.
+        """
+        expired_sources = {entry.source for entry in self.alerts.expire(time.time())}
+        for location in self.locations:
+            if location.api_url in expired_sources:
+                self._update_location_from_queue(location)
+        now = time.monotonic()
+        queued = self.alerts.current()
+        if queued is None:
+            self._rotation_fingerprint = None
+        elif queued.key.fingerprint != self._rotation_fingerprint:
+            # A more urgent alert took over, or the one showing went away; give this one a full turn
+            self._rotation_fingerprint = queued.key.fingerprint
+            self._rotation_started = now
+        elif len(self.alerts) > 1 and now - self._rotation_started >= self.alert_rotation_seconds:
+            queued = self.alerts.advance()
+            self._rotation_fingerprint = queued.key.fingerprint
+            self._rotation_started = now
+        return queued
+
+    def alert_priority(self, alert: WeatherAlert, recheck_seconds: Optional[int] = None) -> tuple:
+        """Sort key for alerts: shorter recheck interval (more urgent colour) first, then NWS scores."""
+        if recheck_seconds is None:
+            _, recheck_seconds = self.classify_alert(alert.severity, alert.urgency)
+        return (-recheck_seconds, alert.severity_score or 0, alert.urgency_score or 0, alert.certainty_score or 0)
+
+    def fetch_weather_alerts(self, api_url: str) -> Tuple[List[WeatherAlert], bool, "CacheHints"]:
+        """
+        Fetch and filter the alerts for one location. Safe to call from worker threads:
+        it touches neither the display nor the alerter's scheduling state.
+
+        The response may be a single alert object, a list of them, or an object with
+        an "alerts" list.
+
+        Returns:
+            Tuple of (alerts, complete, hints). complete is False when the server sent a
+            single alert, which may be one of several active ones; hints are the
+            response's Cache-Control max-age and Retry-After.
+
+        Raises:
+            requests.RequestException: If the request fails
+            ValueError: If the response is not valid JSON
+        """
+        try:
+            # Runs on a fetch pool thread, so each request is its own cycle
+            with SPANS.cycle("weatherbox-fetch"), _REQUEST_SECONDS.time():
+                data, hints = self.weather_box_client.get_json_with_hints(api_url)
+        except weatherbox_errors() as e:
+            _REQUEST_ERRORS.labels(type(e).__name__).inc()
+            raise
+
+        if isinstance(data, dict) and isinstance(data.get('alerts'), list):
+            data = data['alerts']
+        if isinstance(data, list):
+            alerts = [self._parse_alert(item) for item in data if isinstance(item, dict)]
+            return [alert for alert in alerts if alert], True, hints
+        alert = self._parse_alert(data)
+        # An empty response means nothing is active, so it is complete
+        return ([alert], False, hints) if alert else ([], True, hints)
+
+    def _parse_alert(self, data: dict) -> Optional[WeatherAlert]:
+        """Build a WeatherAlert from one alert object, or None if it should be ignored."""
+        # Return None if no alert event is present
+        if not data.get('event'):
+            self.logger.info("No active weather alerts")
             return None
 
+        # Ignore alerts with "UNKNOWN" severity
+        if (data.get('severity') or '').upper() == 'UNKNOWN':
+            self.logger.info(f"Ignoring alert with UNKNOWN severity: {data.get('event', 'N/A')}")
+            return None
+
+        # Filter out alerts with urgency_score of 1
+        if data.get('urgency_score') == 1:
+            self.logger.info(f"Ignoring alert with urgency_score=1 (Future): {data.get('event', 'N/A')}")
+            return None
+
+        # Filter data to only include fields defined in WeatherAlert
+        valid_fields = {f.name for f in fields(WeatherAlert)}
+        filtered_data = {k: v for k, v in data.items() if k in valid_fields}
+        return WeatherAlert(**filtered_data)
+
 
     def storm_detected_callback(self, message: str):
         self.last_storm_callback = datetime.datetime.now()
+        self.display.set_status(StatusIndicator.STORM, True)
 
     def _on_button_pressed(self):
         """Callback for when the display button is pressed."""
         self.logger.info("Button pressed - triggering on-demand check")
+        # Cut short any scroll in progress so the press is acknowledged at once
+        self.display.interrupt()
+        self.display.display_message("Checking")
+        self.alert_differ.reset()
         self.on_demand_check_requested = True
         self.check_now_event.set()
 
+    def _on_joystick(self, direction: str):
+        """Callback for joystick directions: left/up and right/down step through each location's alert."""
+        locations = self.locations
+        if not locations:
+            return
+        step = -1 if direction in ("left", "up") else 1
+        self.browse_index = (self.browse_index + step) % len(locations)
+        location = locations[self.browse_index]
+        alert = location.weather_alert
+        self.display.interrupt()
+        self.alert_differ.reset()
+        if alert and alert.event:
+            color, _ = self.classify_alert(alert.severity, alert.urgency)
+            self.display.display_message(f"{location.city}: {alert.event}", color=color)
+        else:
+            self.display.display_message(f"{location.city}: No current alerts")
+
     def _start_storm_detector(self):
-        from Detection.StormDetector import StormDetector
-        self.storm_detector = StormDetector(storm_detected_callback=self.storm_detected_callback)
-        if self.storm_detector.sense_hat_present():
-            detector_thread = threading.Thread(target=self._run_storm_detector_with_logging, daemon=True)
-            detector_thread.start()
+        # Opening the database and warming the windows happens on the detector's own
+        # thread, so it does not hold up the first WeatherBox fetch
+        self.detector_thread = threading.Thread(target=self._run_storm_detector_with_logging,
+                                                name="storm-detector", daemon=True)
+        self.detector_thread.start()
+
+    def _thread_liveness(self):
+        """Samples for alerter_thread_alive: the threads the alerter started, then any other live threads."""
+        expected = {"main": threading.main_thread()}
+        if self.detector_thread and (self.storm_detector is None or self.storm_detector.sense_hat_present()):
+            expected["storm-detector"] = self.detector_thread
+        if self.config_watcher and self.config_watcher.thread:
+            expected["config-watcher"] = self.config_watcher.thread
+        samples = [({"thread": name}, 1 if thread.is_alive() else 0) for name, thread in expected.items()]
+        known = set(expected.values())
+        samples.extend(({"thread": thread.name}, 1) for thread in threading.enumerate() if thread not in known)
+        return samples
+
+    def shutdown(self):
+        """Stop background workers so their resources are released cleanly."""
+        if self.storm_detector:
+            self.storm_detector.stop()
+            if self.detector_thread:
+                # The detector thread is a daemon; wait so its store is closed before exit
+                self.detector_thread.join(self.DETECTOR_STOP_TIMEOUT_SECONDS)
+        if self.config_watcher:
+            self.config_watcher.stop()
+        self._fetch_pool.shutdown(wait=False)
+        self.weather_box_client.close()
+        self.display.close()
 
     def _run_storm_detector_with_logging(self):
-        """Wrapper to catch and log storm detector thread exceptions."""
+        """Create and run the storm detector, catching and logging its exceptions."""
         try:
-            self.storm_detector.run()
+            from Detection.StormDetector import StormDetector
+            preferred = self.hardware_cache.get("sensor") if self.hardware_cache else None
+            storm_detector = StormDetector(storm_detected_callback=self.storm_detected_callback,
+                                           preferred_sense_hat=preferred,
+                                           store=os.environ.get("WEATHER_ALERTER_PRESSURE_STORE", "sqlite"))
+            if self.hardware_cache:
+                self.hardware_cache.set("sensor", storm_detector.sense_hat_module)
+            self.storm_detector = storm_detector
+            if not storm_detector.sense_hat_present():
+                storm_detector.close()
+                return
+            storm_detector.run()
         except Exception as e:
             self.logger.critical(f"Storm detector thread crashed: {e}", exc_info=True)
             self.display.display_message("Storm detector error")
 
 
-    def get_alert_color(self,severity, urgency):
+    @staticmethod
+    def classify_alert(severity, urgency) -> Tuple[list, int]:
+            """Return the display colour and recheck interval in seconds for an alert."""
             if severity is None or urgency is None:
-                return [255,255,255]
-            self.recheck_seconds = 300 # five minutes
+                return [255,255,255], 300
             severity = severity.lower()
             urgency = urgency.lower()
             if severity == "extreme":  # red
-                self.recheck_seconds = 15
-                return [255, 0, 0]
+                return [255, 0, 0], 15
             elif severity == "severe":
                 if urgency == "immediate" or urgency == "expected":  # red
-                    self.recheck_seconds = 15
-                    return [255, 0, 0]
+                    return [255, 0, 0], 15
                 else:
-                    self.recheck_seconds = 60
-                    return [255, 255, 0]  # yellow
+                    return [255, 255, 0], 60  # yellow
             elif severity == "moderate":  # yellow
-                return [255, 255, 0]
+                return [255, 255, 0], 300
             elif severity == "minor":  # white
-                return [0, 255, 0]
+                return [0, 255, 0], 300
             elif urgency == "immediate":  # red
-                self.recheck_seconds = 15
-                return [255, 0, 0]
-            return [255,255,255]
+                return [255, 0, 0], 15
+            return [255,255,255], 300
+
+    def recheck_seconds_for(self, weather_alert: Optional[WeatherAlert]) -> int:
+        """Polling interval for a location given its current alert."""
+        if weather_alert is None:
+            return 300  # five minutes
+        return self.classify_alert(weather_alert.severity, weather_alert.urgency)[1]
 
 
 def setup_logging():
@@ -262,17 +637,68 @@ def setup_logging():
 if __name__ == "__main__":
     logger = setup_logging()
     display = None
+    alerter = None
+    # "hub" also serves the display to other processes; "client" only shows what a hub serves
+    hub_mode = os.environ.get("WEATHER_ALERTER_HUB", "")
     
     try:
-        display = DisplayFactory.create_display_automatically()
-        logger.info(f"Display initialized: {type(display).__name__}")
-        
-        alerter = Alerter(display)
+        startup_started = time.monotonic()
+        if hub_mode not in ("", "hub", "client"):
+            raise ValueError(f"WEATHER_ALERTER_HUB must be hub or client, not {hub_mode!r}")
+        if hub_mode != "client":
+            # Import the HTTP stack while the display hardware initializes
+            threading.Thread(target=__import__, args=("WeatherBox.WeatherBoxClient",),
+                             name="preload-imports", daemon=True).start()
+        hardware_cache = HardwareCache()
+
+        if os.environ.get("WEATHER_ALERTER_METRICS_PORT"):
+            try:
+                from Metrics.MetricsServer import MetricsServer
+                MetricsServer.from_environment().start()
+            except (OSError, ValueError) as e:
+                logger.error(f"Metrics endpoint disabled: {e}")
+
+        # kill -USR1 <pid> writes recent timing spans and a sampled profile next to the log
+        ProfileDumper(os.path.dirname(os.path.abspath(__file__))).install()
+
+        display_started = time.monotonic()
+        display_type = os.environ.get("WEATHER_ALERTER_DISPLAY")
+        if display_type:
+            # Several processes on one host each name their own display
+            from Display.DisplayFactory import DisplayType
+            from Display.DisplayWorker import DisplayWorker
+            display = DisplayWorker(DisplayFactory.create_display(DisplayType(display_type)))
+        else:
+            display = DisplayFactory.create_display_automatically(hardware_cache)
+        display_ms = (time.monotonic() - display_started) * 1000
+        logger.info(f"Display initialized: {type(display.inner).__name__}")
+
+        if hub_mode == "client":
+            from Hub.AlertHub import socket_path
+            from Hub.HubClient import HubClient
+            logger.info(f"Startup: display {display_ms:.0f} ms; showing alerts from the hub")
+            HubClient(display, socket_path()).run()
+            sys.exit(0)
+        if hub_mode == "hub":
+            from Hub.AlertHub import AlertHub, HubDisplay
+            display = HubDisplay(display, AlertHub().start())
+
+        alerter_started = time.monotonic()
+        alerter = Alerter(display, hardware_cache=hardware_cache)
+        alerter.started_at = startup_started
+        alerter_ms = (time.monotonic() - alerter_started) * 1000
+        logger.info(f"Startup: display {display_ms:.0f} ms, alerter {alerter_ms:.0f} ms, "
+                    f"{(time.monotonic() - startup_started) * 1000:.0f} ms total before the main loop")
         alerter.run()
     except KeyboardInterrupt:
         logger.info("Shutdown requested by user")
+        if alerter:
+            alerter.shutdown()
+        elif display:
+            display.close()
     except Exception as e:
         logger.critical(f"Fatal error: {e}", exc_info=True)
         if display:
             display.display_message("Fatal error - check logs")
+            display.close()
         sys.exit(1)
@@ -0,0 +1,34 @@
+import pytest
+
+from Display.IDisplay import IDisplay
+from main import Alerter, MonitoredLocation, WeatherAlert
+
+
+class RecordingDisplay(IDisplay):
+    def __init__(self):
+        self.titles = []
+
+    def display_message(self, title: str, message: str = "", detail: str = "", color=None):
+        self.titles.append(title)
+
+    def clear_display(self):
+        self.titles.append(None)
+
+    def heartbeat(self):
+        pass
+
+
+def weather_alert(event, severity="Severe", urgency="Immediate", expires=""):
+    return WeatherAlert(city="Knoxville", state="TN", latitude=0.0, longitude=0.0, headline=event, event=event,
+                        severity=severity, severity_score=None, urgency=urgency, urgency_score=None,
+                        certainty=None, certainty_score=None, expires=expires, description="", instruction="")
+
+
+@pytest.fixture
+def alerter(tmp_path):
+    display = RecordingDisplay()
+    alerter = Alerter(display, config_path=str(tmp_path / "config.txt"))
+    alerter.location = MonitoredLocation("TN", "Knoxville", "http://weatherbox/weather-alert/tn/knoxville")
+    alerter.locations = [alerter.location]
+    yield alerter
+    alerter.shutdown()
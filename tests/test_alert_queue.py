@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+from Alerts.AlertDiff import AlertKey
+from Alerts.AlertQueue import AlertQueue, QueuedAlert
+
+
+def _alert(name, priority=0, expires_at=None, source="here", content="v1"):
+    return QueuedAlert(AlertKey(name, content), source, SimpleNamespace(event=name), [255, 0, 0], 15,
+                       (priority,), expires_at)
+
+
+def _names(entries):
+    return [entry.key.fingerprint for entry in entries]
+
+
+def test_top_skips_removed_and_superseded_entries():
+    queue = AlertQueue()
+    queue.push(_alert("warning", priority=3))
+    queue.push(_alert("watch", priority=2))
+    queue.push(_alert("advisory", priority=1))
+
+    queue.remove("warning")
+    assert queue.top().key.fingerprint == "watch"
+    # A replacement with a lower priority leaves its old heap entry behind
+    queue.push(_alert("watch", priority=0, content="v2"))
+    assert queue.top().key.fingerprint == "advisory"
+    queue.remove("advisory")
+    assert queue.top().key == AlertKey("watch", "v2")
+    queue.remove("watch")
+    assert queue.top() is None
+    assert len(queue) == 0
+
+
+def test_push_replaces_by_fingerprint_and_keeps_its_place_among_equals():
+    queue = AlertQueue()
+    queue.push(_alert("first", priority=1))
+    queue.push(_alert("second", priority=1))
+    updated = _alert("first", priority=1, content="v2")
+    queue.push(updated)
+
+    assert len(queue) == 2
+    assert AlertKey("first", "v2") in queue
+    assert AlertKey("first", "v1") not in queue
+    assert _names(queue.ordered()) == ["first", "second"]
+    assert queue.top() is updated
+
+
+def test_replacement_from_another_source_moves_the_alert():
+    queue = AlertQueue()
+    queue.push(_alert("warning", source="north"))
+    queue.push(_alert("warning", source="south"))
+
+    assert queue.for_source("north") == []
+    assert _names(queue.for_source("south")) == ["warning"]
+    queue.replace_source("north", [])
+    assert len(queue) == 1
+
+
+def test_replace_source_drops_alerts_the_source_no_longer_reports():
+    queue = AlertQueue()
+    queue.replace_source("here", [_alert("warning", 2), _alert("watch", 1)])
+    queue.push(_alert("elsewhere", 5, source="there"))
+
+    queue.replace_source("here", [_alert("watch", 1, content="v2")])
+
+    assert _names(queue.ordered()) == ["elsewhere", "watch"]
+    assert queue.top_for_source("here").key == AlertKey("watch", "v2")
+
+
+def test_expire_removes_alerts_in_expiry_order():
+    queue = AlertQueue()
+    queue.push(_alert("late", expires_at=300.0))
+    queue.push(_alert("never"))
+    queue.push(_alert("early", expires_at=100.0))
+    queue.push(_alert("middle", expires_at=200.0))
+
+    assert queue.expire(50.0) == []
+    assert _names(queue.expire(200.0)) == ["early", "middle"]
+    assert _names(queue.expire(1e12)) == ["late"]
+    assert _names(queue.ordered()) == ["never"]
+
+
+def test_expire_ignores_superseded_expiry_times():
+    queue = AlertQueue()
+    queue.push(_alert("warning", expires_at=100.0))
+    queue.push(_alert("warning", expires_at=200.0, content="v2"))
+    queue.push(_alert("watch", expires_at=100.0))
+    queue.remove("watch")
+
+    assert queue.expire(150.0) == []
+    assert AlertKey("warning", "v2") in queue
+    assert _names(queue.expire(200.0)) == ["warning"]
+
+
+def test_rotation_wraps_and_a_new_top_alert_takes_over():
+    queue = AlertQueue()
+    assert queue.current() is None
+    assert queue.advance() is None
+    queue.push(_alert("b", priority=2))
+    queue.push(_alert("c", priority=1))
+    queue.push(_alert("a", priority=3))
+
+    assert queue.current().key.fingerprint == "a"
+    assert [queue.advance().key.fingerprint for _ in range(4)] == ["b", "c", "a", "b"]
+    assert queue.current().key.fingerprint == "b"
+
+    queue.push(_alert("urgent", priority=9))
+    assert queue.current().key.fingerprint == "urgent"
+
+    # When the alert being shown goes away, the rotation returns to the top
+    queue.advance()
+    queue.remove("a")
+    assert queue.current().key.fingerprint == "urgent"
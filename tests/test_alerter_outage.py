@@ -0,0 +1,66 @@
+import time
+
+import pytest
+import requests
+
+from Alerts.AlertCache import AlertCache
+from Alerts.AlertDiff import AlertKey
+from WeatherBox.WeatherBoxClient import CacheHints
+from conftest import weather_alert
+
+FUTURE = "2999-01-01T00:00:00+00:00"
+
+
+def _fail(api_url):
+    raise requests.ConnectionError("WeatherBox unreachable")
+
+
+@pytest.fixture
+def unreachable(alerter):
+    alerter.fetch_weather_alerts = _fail
+    return alerter
+
+
+def _queue(alerter, *alerts):
+    alerter.alerts.replace_source(alerter.location.api_url,
+                                  [alerter._queued_alert(alerter.location, alert) for alert in alerts])
+    alerter._update_location_from_queue(alerter.location)
+
+
+def _poll(alerter):
+    alerter.location.next_check = 0
+    alerter._poll_locations()
+
+
+def test_alerts_without_expiry_are_kept_through_a_short_outage(unreachable):
+    _queue(unreachable, weather_alert("Tornado Warning"), weather_alert("Flood Watch", "Moderate", "Future", FUTURE))
+    unreachable.location.fetched_at = time.time() - AlertCache.MAX_AGE_SECONDS + 60
+
+    _poll(unreachable)
+
+    assert len(unreachable.alerts) == 2
+    assert unreachable.location.failures == 1
+
+
+def test_alerts_without_expiry_are_dropped_after_the_cache_max_age(unreachable):
+    warning = weather_alert("Tornado Warning")
+    _queue(unreachable, warning, weather_alert("Flood Watch", "Moderate", "Future", FUTURE))
+    unreachable.location.fetched_at = time.time() - AlertCache.MAX_AGE_SECONDS - 1
+
+    _poll(unreachable)
+
+    assert AlertKey.of(warning) not in unreachable.alerts
+    # An alert with its own expiry time is still trusted until then
+    assert [entry.alert.event for entry in unreachable.alerts.ordered()] == ["Flood Watch"]
+    assert unreachable.location.weather_alert.event == "Flood Watch"
+
+
+def test_a_successful_poll_restarts_the_max_age(alerter):
+    warning = weather_alert("Tornado Warning")
+    alerter.fetch_weather_alerts = lambda api_url: ([warning], True, CacheHints())
+    alerter.location.fetched_at = time.time() - AlertCache.MAX_AGE_SECONDS - 1
+    _poll(alerter)
+    alerter.fetch_weather_alerts = _fail
+    _poll(alerter)
+
+    assert AlertKey.of(warning) in alerter.alerts
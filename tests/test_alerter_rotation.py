@@ -0,0 +1,97 @@
+import time
+
+from Alerts.AlertDiff import AlertKey
+from conftest import weather_alert
+
+
+def _queue(alerter, *alerts):
+    alerter.alerts.replace_source(alerter.location.api_url,
+                                  [alerter._queued_alert(alerter.location, alert) for alert in alerts])
+
+
+def _next_turn(alerter):
+    """Let the current alert's rotation turn run out, then show whatever comes next."""
+    alerter._rotation_started -= alerter.alert_rotation_seconds
+    alerter.display.titles.clear()
+    alerter._show_alerts()
+    return alerter.display.titles
+
+
+def test_rotation_starts_at_the_most_urgent_alert_and_wraps(alerter):
+    _queue(alerter, weather_alert("Flood Watch", "Moderate", "Future"),
+           weather_alert("Tornado Warning"), weather_alert("Wind Advisory", "Minor", "Expected"))
+
+    alerter._show_alerts()
+    assert alerter.display.titles == ["Tornado Warning"]
+    alerter.display.titles.clear()
+    # Within its turn the shown alert is not redrawn
+    alerter._show_alerts()
+    assert alerter.display.titles == []
+
+    assert _next_turn(alerter) == ["Flood Watch"]
+    assert _next_turn(alerter) == ["Wind Advisory"]
+    assert _next_turn(alerter) == ["Tornado Warning"]
+
+
+def test_expired_alerts_leave_the_rotation(alerter):
+    _queue(alerter, weather_alert("Tornado Warning", expires="2000-01-01T00:00:00+00:00"),
+           weather_alert("Flood Watch", "Moderate", "Future"))
+
+    alerter._show_alerts()
+
+    assert alerter.display.titles == ["Flood Watch"]
+    assert len(alerter.alerts) == 1
+    assert alerter.location.weather_alert.event == "Flood Watch"
+
+
+def test_muted_alert_stays_muted_while_it_rotates(alerter):
+    warning = weather_alert("Tornado Warning")
+    _queue(alerter, warning, weather_alert("Flood Watch", "Moderate", "Future"))
+    alerter._show_alerts()
+
+    # A button press shows the current alert on demand and mutes it
+    alerter.on_demand_check_requested = True
+    alerter.display.titles.clear()
+    alerter._show_alerts()
+    assert alerter.display.titles == ["Tornado Warning"]
+    assert alerter.muted_alert_state == AlertKey.of(warning)
+
+    assert _next_turn(alerter) == ["Flood Watch"]
+    assert alerter.muted_alert_state == AlertKey.of(warning)
+    # Its next turn is skipped, however long ago it was drawn
+    alerter._alert_shown_at = time.monotonic() - alerter.alert_reminder_seconds
+    assert _next_turn(alerter) == []
+    assert _next_turn(alerter) == ["Flood Watch"]
+    assert alerter.muted_alert_state == AlertKey.of(warning)
+
+
+def test_mute_is_forgotten_once_the_muted_alert_goes_away(alerter):
+    warning = weather_alert("Tornado Warning")
+    _queue(alerter, warning, weather_alert("Flood Watch", "Moderate", "Future"))
+    alerter.on_demand_check_requested = True
+    alerter._show_alerts()
+    assert alerter.muted_alert_state == AlertKey.of(warning)
+
+    _queue(alerter, weather_alert("Flood Watch", "Moderate", "Future"))
+    assert _next_turn(alerter) == ["Flood Watch"]
+    assert alerter.muted_alert_state is None
+
+    # The same warning issued again is shown
+    _queue(alerter, warning, weather_alert("Flood Watch", "Moderate", "Future"))
+    alerter.display.titles.clear()
+    alerter._show_alerts()
+    assert alerter.display.titles == ["Tornado Warning"]
+
+
+def test_updated_muted_alert_is_shown_again(alerter):
+    _queue(alerter, weather_alert("Tornado Warning"))
+    alerter.on_demand_check_requested = True
+    alerter._show_alerts()
+
+    updated = weather_alert("Tornado Warning", expires="2999-01-01T00:00:00+00:00")
+    _queue(alerter, updated)
+    alerter.display.titles.clear()
+    alerter._show_alerts()
+
+    assert alerter.display.titles == ["Tornado Warning"]
+    assert alerter.muted_alert_state is None
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from WeatherBox.PollScheduler import PollScheduler
+
+
+@pytest.fixture
+def scheduler():
+    return PollScheduler(random.Random(1))
+
+
+def test_interval_follows_the_alert_recheck(scheduler):
+    assert scheduler.interval(300) == 300
+    assert scheduler.interval(60) == 60
+    assert scheduler.interval(5) == PollScheduler.MIN_INTERVAL_SECONDS
+
+
+def test_interval_lands_when_the_alert_expires(scheduler):
+    assert scheduler.interval(300, expires_in=42) == 42
+    assert scheduler.interval(300, expires_in=3) == PollScheduler.MIN_INTERVAL_SECONDS
+    # Already expired: the queue drops it, so keep the normal cadence
+    assert scheduler.interval(300, expires_in=-10) == 300
+
+
+def test_storm_shortens_the_interval(scheduler):
+    assert scheduler.interval(300, storm_active=True) == PollScheduler.STORM_INTERVAL_SECONDS
+    assert scheduler.interval(15, storm_active=True) == 15
+
+
+def test_max_age_lengthens_a_routine_interval_up_to_the_hint_cap(scheduler):
+    assert scheduler.interval(300, max_age=600) == 600
+    assert scheduler.interval(300, max_age=86400) == PollScheduler.MAX_HINT_SECONDS
+    assert scheduler.interval(300, max_age=60) == 300
+    assert scheduler.interval(300, expires_in=42, max_age=120) == 120
+
+
+@pytest.mark.parametrize("recheck_seconds", [15, 60])
+def test_max_age_never_lengthens_an_urgent_alert(scheduler, recheck_seconds):
+    assert scheduler.interval(recheck_seconds, max_age=900) == recheck_seconds
+    assert scheduler.interval(recheck_seconds, max_age=900, storm_active=True) == recheck_seconds
+
+
+def test_max_age_never_lengthens_a_storm(scheduler):
+    assert scheduler.interval(300, max_age=900, storm_active=True) == PollScheduler.STORM_INTERVAL_SECONDS
+
+
+def test_next_due_keeps_a_fixed_rate(scheduler):
+    # A fetch that finished late does not push the schedule back
+    assert scheduler.next_due(due=1000, interval=60, now=1007) == 1060
+    # Ticks missed while busy are skipped, not fired back to back
+    assert scheduler.next_due(due=1000, interval=60, now=1130) == 1180
+    assert scheduler.next_due(due=1000, interval=60, now=1120) == 1180
+
+
+def test_next_due_restarts_after_an_early_poll(scheduler):
+    assert scheduler.next_due(due=1000, interval=60, now=900) == 960
+
+
+def test_backoff_grows_exponentially_within_its_jitter(scheduler):
+    for failures in range(1, 12):
+        ceiling = min(PollScheduler.BACKOFF_MAX_SECONDS, PollScheduler.BACKOFF_BASE_SECONDS * 2 ** (failures - 1))
+        for _ in range(50):
+            assert ceiling / 2 <= scheduler.backoff(failures) <= ceiling
+    assert scheduler.backoff(10 ** 6) <= PollScheduler.BACKOFF_MAX_SECONDS
+
+
+def test_backoff_honours_retry_after_up_to_the_hint_cap(scheduler):
+    assert scheduler.backoff(1, retry_after=120) == 120
+    assert scheduler.backoff(1, retry_after=86400) == PollScheduler.MAX_HINT_SECONDS
+    assert scheduler.backoff(5, retry_after=1) >= PollScheduler.BACKOFF_BASE_SECONDS * 2 ** 4 / 2
+
+
+def test_backoff_jitter_spreads_retries():
+    delays = [PollScheduler(random.Random(seed)).backoff(4) for seed in range(20)]
+    assert len(set(delays)) == len(delays)
+    assert max(delays) - min(delays) > PollScheduler.BACKOFF_BASE_SECONDS * 2 ** 3 / 4
+    # The same generator gives the same schedule
+    assert PollScheduler(random.Random(7)).backoff(4) == PollScheduler(random.Random(7)).backoff(4)
@@ -0,0 +1,115 @@
+import calendar
+import sqlite3
+import time
+
+import pytest
+
+from Detection.PressureDatabase import PressureDatabase
+
+# The original schema: integer ids and CURRENT_TIMESTAMP text, which is UTC
+V0_SCHEMA = '''
+CREATE TABLE pressure_readings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pressure INTEGER NOT NULL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+'''
+V0_ROWS = [("2024-03-10 06:59:00", 1012), ("2024-03-10 07:00:00", 1011), ("2024-03-10 07:01:30", 1010)]
+
+V1_SCHEMA = '''
+CREATE TABLE pressure_readings (
+    timestamp REAL NOT NULL,
+    pressure REAL NOT NULL
+);
+CREATE INDEX idx_pressure_readings_timestamp ON pressure_readings (timestamp);
+PRAGMA user_version = 1;
+'''
+V1_ROWS = [(1700000000.0, 1000.5), (1700000060.0, 1000.25)]
+
+
+def _utc_epoch(text: str) -> float:
+    return float(calendar.timegm(time.strptime(text, "%Y-%m-%d %H:%M:%S")))
+
+
+@pytest.fixture
+def v0_path(tmp_path):
+    path = str(tmp_path / "v0.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(V0_SCHEMA)
+    conn.executemany("INSERT INTO pressure_readings (timestamp, pressure) VALUES (?, ?)", V0_ROWS)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def v1_path(tmp_path):
+    path = str(tmp_path / "v1.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(V1_SCHEMA)
+    conn.executemany("INSERT INTO pressure_readings (timestamp, pressure) VALUES (?, ?)", V1_ROWS)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _inspect(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        rows = conn.execute("SELECT timestamp, pressure FROM pressure_readings ORDER BY timestamp").fetchall()
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(pressure_readings)")}
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(pressure_readings)")}
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    return version, rows, indexes, columns, tables
+
+
+def test_v0_database_is_migrated_to_utc_epoch_seconds(v0_path):
+    PressureDatabase(v0_path).close()
+
+    version, rows, indexes, columns, tables = _inspect(v0_path)
+    assert version == PressureDatabase.SCHEMA_VERSION == 3
+    assert rows == [(_utc_epoch(text), float(pressure)) for text, pressure in V0_ROWS]
+    assert all(isinstance(timestamp, float) for timestamp, _ in rows)
+    assert "idx_pressure_readings_timestamp" in indexes
+    assert {"mean", "minimum", "maximum", "samples"} <= columns
+    assert "pressure_readings_v0" not in tables
+    assert "pressure_rollups" in tables
+
+
+def test_v1_database_keeps_its_rows(v1_path):
+    PressureDatabase(v1_path).close()
+
+    version, rows, indexes, columns, tables = _inspect(v1_path)
+    assert version == 3
+    assert rows == V1_ROWS
+    assert "idx_pressure_readings_timestamp" in indexes
+    assert {"mean", "minimum", "maximum", "samples"} <= columns
+    assert "pressure_rollups" in tables
+
+
+def test_migrated_readings_are_queryable(v0_path):
+    db = PressureDatabase(v0_path)
+    try:
+        readings = db.get_readings_since(_utc_epoch("2024-03-10 07:00:00"))
+    finally:
+        db.close()
+    assert readings == [(1011.0, _utc_epoch("2024-03-10 07:00:00")), (1010.0, _utc_epoch("2024-03-10 07:01:30"))]
+
+
+def test_reopening_a_current_database_changes_nothing(v1_path):
+    PressureDatabase(v1_path).close()
+    before = _inspect(v1_path)
+    PressureDatabase(v1_path).close()
+    assert _inspect(v1_path) == before
+
+
+def test_new_database_starts_at_the_current_version(tmp_path):
+    path = str(tmp_path / "new.db")
+    PressureDatabase(path).close()
+    version, rows, indexes, _, _ = _inspect(path)
+    assert version == 3
+    assert rows == []
+    assert "idx_pressure_readings_timestamp" in indexes
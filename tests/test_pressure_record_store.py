@@ -0,0 +1,128 @@
+import sqlite3
+import struct
+
+import pytest
+
+from Detection.PressureDatabase import PressureDatabase
+from Detection.PressureRecordStore import (MAXIMUM, MEAN, MINIMUM, PRESSURE, SAMPLES, SEQUENCE, TIMESTAMP,
+                                           PressureRecordStore, _RECORD_SIZE, convert)
+
+START = 1_700_000_000.0
+CAPACITY = 8
+
+
+def _reading(sequence):
+    return 1000.0 + sequence / 4, START + sequence * 60
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "pressure.rec")
+
+
+def _fill(path, count):
+    store = PressureRecordStore(path, CAPACITY)
+    for sequence in range(count):
+        store.insert_reading(*_reading(sequence))
+    store.close()
+
+
+def test_reopen_after_wrap_keeps_the_newest_readings(path):
+    _fill(path, 13)
+
+    store = PressureRecordStore(path)
+    try:
+        assert store.capacity == CAPACITY
+        assert len(store) == CAPACITY
+        assert store.get_readings_since(0) == [_reading(sequence) for sequence in range(5, 13)]
+        # Appends carry on from the recovered sequence
+        store.insert_reading(*_reading(13))
+        assert store.get_readings_since(0) == [_reading(sequence) for sequence in range(6, 14)]
+    finally:
+        store.close()
+
+    store = PressureRecordStore(path)
+    try:
+        assert store.get_readings_since(0) == [_reading(sequence) for sequence in range(6, 14)]
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("damage", ["corrupted", "torn"])
+def test_damaged_newest_record_is_skipped(path, damage):
+    newest_offset = PressureRecordStore.HEADER_SIZE + (12 % CAPACITY) * _RECORD_SIZE
+    if damage == "corrupted":
+        _fill(path, 13)
+        with open(path, "r+b") as file:
+            file.seek(newest_offset + 8 * PRESSURE)
+            file.write(struct.pack("<d", 990.0))
+    else:
+        # Only the start of sequence 12's record reached the file, over sequence 4's
+        _fill(path, 12)
+        with open(path, "r+b") as file:
+            file.seek(newest_offset)
+            file.write(struct.pack("<2d", 12, _reading(12)[1]))
+
+    store = PressureRecordStore(path)
+    try:
+        # The damaged write had already overwritten the oldest reading's slot
+        assert len(store) == CAPACITY - 1
+        assert store.get_readings_since(0) == [_reading(sequence) for sequence in range(5, 12)]
+        store.insert_reading(*_reading(12))
+        assert store.get_readings_since(0) == [_reading(sequence) for sequence in range(5, 13)]
+    finally:
+        store.close()
+
+
+def test_window_across_the_wrap_is_two_views(path):
+    _fill(path, 13)
+    store = PressureRecordStore(path)
+    try:
+        views = store.window(_reading(6)[1])
+        assert [view.shape for view in views] == [(2, 8), (5, 8)]
+        assert [row[SEQUENCE] for view in views for row in view.tolist()] == list(range(6, 13))
+        assert [row[PRESSURE] for view in views for row in view.tolist()] == \
+            [_reading(sequence)[0] for sequence in range(6, 13)]
+        views = None
+
+        (view,) = store.window(_reading(9)[1])
+        assert view.tolist()[0][SEQUENCE] == 9
+        assert store.window(_reading(13)[1]) == ()
+    finally:
+        store.close()
+
+
+def test_convert_from_a_v3_database_includes_rollups(tmp_path, path):
+    db_path = str(tmp_path / "pressure.db")
+    db = PressureDatabase(db_path)
+    db.insert_reading(1001.0, START + 600)
+    db.insert_reading(1000.5, START + 660)
+    db.close()
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO pressure_rollups (resolution, bucket, mean, minimum, maximum, samples) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", [
+                         (60, START + 480, 1002.0, 1001.0, 1003.0, 240),
+                         (60, START + 540, 1001.5, 1001.0, 1002.0, 240),
+                         # Hourly rollups are too coarse to replay
+                         (3600, START - 3600, 1005.0, 1000.0, 1010.0, 14400),
+                     ])
+    conn.commit()
+    conn.close()
+
+    assert convert(db_path, path, CAPACITY) == 4
+
+    store = PressureRecordStore(path)
+    try:
+        (view,) = store.window(0)
+        rows = view.tolist()
+        assert [(row[TIMESTAMP], row[PRESSURE]) for row in rows] == [
+            (START + 510, 1002.0), (START + 570, 1001.5), (START + 600, 1001.0), (START + 660, 1000.5)]
+        assert [(row[MEAN], row[MINIMUM], row[MAXIMUM], row[SAMPLES]) for row in rows[:2]] == [
+            (1002.0, 1001.0, 1003.0, 240), (1001.5, 1001.0, 1002.0, 240)]
+        assert [row[SAMPLES] for row in rows[2:]] == [1, 1]
+    finally:
+        view = None
+        store.close()
+
+    with pytest.raises(FileExistsError):
+        convert(db_path, path, CAPACITY)
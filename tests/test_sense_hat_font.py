@@ -0,0 +1,85 @@
+from Display.LedMatrixScroller import LedMatrixScroller
+from Display.SenseHatFont import SenseHatFont
+
+LIT = [255, 255, 255]
+OFF = [0, 0, 0]
+
+# 5x8 cells drawn top row first, as they look on the matrix
+GLYPHS = {
+    " ": ["....."] * 8,
+    "?": [".....", ".###.", "#...#", "....#", "...#.", "..#..", ".....", "..#.."],
+    "I": [".....", ".###.", "..#..", "..#..", "..#..", "..#..", "..#..", ".###."],
+    ".": [".....", ".....", ".....", ".....", ".....", ".....", ".##..", ".##.."],
+}
+CHARACTERS = " ?I."
+
+
+def _font_pixels():
+    """The glyphs laid out like sense_hat_text.png: 8 pixels per column, bottom row first."""
+    pixels = []
+    for char in CHARACTERS:
+        rows = GLYPHS[char]
+        for column in range(5):
+            pixels.extend(LIT if rows[row][column] == "#" else OFF for row in reversed(range(8)))
+    return pixels
+
+
+def _trim(cell):
+    if any(pixel == LIT for pixel in cell):
+        while all(pixel != LIT for pixel in cell[:8]):
+            del cell[:8]
+        while all(pixel != LIT for pixel in cell[-8:]):
+            del cell[-8:]
+    return cell
+
+
+def _rotate(logical):
+    """Map a show_message frame through the 90-degree turn it draws text with."""
+    frame = [None] * 64
+    for row in range(8):
+        for column in range(8):
+            frame[(7 - column) * 8 + row] = logical[row * 8 + column]
+    return frame
+
+
+def show_message_frames(text, pixels):
+    """The frames SenseHat.show_message puts on the matrix, with the display's rotation."""
+    cells = {char: pixels[index * 40:(index + 1) * 40] for index, char in enumerate(CHARACTERS)}
+    scroll = [OFF] * 64
+    for char in text:
+        scroll.extend(_trim(list(cells.get(char, cells["?"]))))
+        scroll.extend([OFF] * 8)
+    scroll.extend([OFF] * 64)
+    return [_rotate(scroll[start * 8:start * 8 + 64]) for start in range(len(scroll) // 8 - 8)]
+
+
+def show_letter_frame(char, pixels):
+    cells = {char: pixels[index * 40:(index + 1) * 40] for index, char in enumerate(CHARACTERS)}
+    return _rotate([OFF] * 8 + list(cells.get(char, cells["?"])) + [OFF] * 16)
+
+
+def test_scroll_matches_show_message():
+    pixels = _font_pixels()
+    scroller = LedMatrixScroller(lambda frame: None, font=SenseHatFont(pixels, CHARACTERS))
+    text = "I. I?x"
+    expected = show_message_frames(text, pixels)
+    frames = scroller.render(text, LIT)
+    # show_message stops one all-blank frame earlier
+    assert list(frames[:len(expected)]) == expected
+    assert all(pixel == OFF for frame in frames[len(expected):] for pixel in frame)
+
+
+def test_letter_matches_show_letter():
+    pixels = _font_pixels()
+    scroller = LedMatrixScroller(lambda frame: None, font=SenseHatFont(pixels, CHARACTERS))
+    for char in ".I#":
+        assert scroller.letter(char, LIT) == show_letter_frame(char, pixels)
+
+
+def test_glyphs_are_trimmed_except_blank_ones():
+    font = SenseHatFont(_font_pixels(), CHARACTERS)
+    assert len(font.columns("I")) == 3
+    assert len(font.columns(".")) == 2
+    assert font.columns(" ") == bytes(5)
+    assert font.columns("~") == font.columns("?")
+    assert len(font.cell(".")) == 5
@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Backtesting.StormBacktester import load_database  # noqa: E402
+
+RAW = [(1700000600.0, 1000.5), (1700000660.0, 1000.25)]
+
+
+def _create(path, script, rows, version):
+    conn = sqlite3.connect(path)
+    conn.executescript(script)
+    conn.executemany("INSERT INTO pressure_readings (timestamp, pressure) VALUES (?, ?)", rows)
+    conn.execute(f"PRAGMA user_version = {version}")
+    conn.commit()
+    return conn
+
+
+def test_v0_text_timestamps_are_read_as_utc(tmp_path):
+    path = str(tmp_path / "v0.db")
+    _create(path, "CREATE TABLE pressure_readings (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                  "pressure INTEGER NOT NULL, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)",
+            [("2023-11-14 22:23:20", 1001), ("2023-11-14 22:24:20", 1000), (None, 999)], 0).close()
+
+    timestamps, pressures = load_database(path)
+
+    assert timestamps.tolist() == [1700000600.0, 1700000660.0]
+    assert pressures.tolist() == [1001.0, 1000.0]
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_v1_and_v2_epoch_timestamps_are_read_as_stored(tmp_path, version):
+    path = str(tmp_path / f"v{version}.db")
+    columns = ", mean REAL, minimum REAL, maximum REAL, samples INTEGER" if version >= 2 else ""
+    _create(path, f"CREATE TABLE pressure_readings (timestamp REAL NOT NULL, pressure REAL NOT NULL{columns})",
+            RAW, version).close()
+
+    timestamps, pressures = load_database(path)
+
+    assert not np.isnan(timestamps).any()
+    assert list(zip(timestamps.tolist(), pressures.tolist())) == RAW
+
+
+def test_v3_includes_one_minute_rollups_older_than_the_raw_readings(tmp_path):
+    path = str(tmp_path / "v3.db")
+    conn = _create(path, "CREATE TABLE pressure_readings (timestamp REAL NOT NULL, pressure REAL NOT NULL, "
+                         "mean REAL, minimum REAL, maximum REAL, samples INTEGER);"
+                         "CREATE TABLE pressure_rollups (resolution INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+                         "mean REAL NOT NULL, minimum REAL NOT NULL, maximum REAL NOT NULL, "
+                         "samples INTEGER NOT NULL, PRIMARY KEY (resolution, bucket)) WITHOUT ROWID",
+                   RAW, 3)
+    conn.executemany("INSERT INTO pressure_rollups VALUES (?, ?, ?, ?, ?, ?)", [
+        (60, 1700000460, 1002.0, 1001.5, 1002.5, 4),
+        (60, 1700000520, 1001.0, 1000.5, 1001.5, 4),
+        # Overlaps the raw readings, so it is left out
+        (60, 1700000600, 999.0, 999.0, 999.0, 4),
+        # Coarser rollups are not replayed
+        (3600, 1699999200, 1003.0, 1000.0, 1005.0, 240),
+    ])
+    conn.commit()
+    conn.close()
+
+    timestamps, pressures = load_database(path)
+
+    assert sorted(zip(timestamps.tolist(), pressures.tolist())) == \
+        [(1700000490.0, 1002.0), (1700000550.0, 1001.0)] + RAW
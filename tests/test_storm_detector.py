@@ -0,0 +1,169 @@
+import math
+import random
+
+import pytest
+
+from Detection.PressureRingBuffer import PressureRingBuffer
+from Detection.RollingTrendStatistics import RollingTrendStatistics
+from Detection.StormDetector import StormDetector
+
+START = 1_700_000_000.0
+MINUTE = 60.0
+
+
+def reference_alert(readings, now):
+    """
+    The detector's original rules, evaluated on plain lists of (pressure, timestamp)
+    readings as they were read back from the database for each sample.
+    """
+    last_hour = [r for r in readings if r[1] >= now - 3600]
+    last_three_hours = [r for r in readings if r[1] >= now - 3 * 3600]
+    if len(last_hour) < StormDetector.MIN_READINGS_REQUIRED or \
+            len(last_three_hours) < StormDetector.MIN_READINGS_REQUIRED:
+        return None
+
+    newest = last_hour[-1][0]
+    one_hour_change = newest - last_hour[0][0]
+    three_hour_change = newest - last_three_hours[0][0]
+
+    recent = [r for r in last_hour if r[1] >= last_hour[-1][1] - 15 * 60]
+    if len(recent) >= 5 and recent[-1][0] - recent[0][0] >= -0.5:
+        return None
+    if len(last_hour) >= 2 and newest >= last_hour[-2][0]:
+        return None
+
+    def rate(run):
+        return (run[-1][0] - run[0][0]) / len(run)
+
+    def accelerating_hour(rs):
+        if len(rs) < 10:
+            return False
+        first, second = rs[:len(rs) // 2], rs[len(rs) // 2:]
+        if len(first) < 2 or len(second) < 2:
+            return False
+        return rate(second) < rate(first) * 1.5
+
+    def accelerating(rs):
+        if len(rs) < 20:
+            return False
+        first, last = rs[:len(rs) // 3], rs[-len(rs) // 3:]
+        if len(first) < 2 or len(last) < 2:
+            return False
+        return rate(last) < rate(first) * 1.5
+
+    if one_hour_change < -StormDetector.ONE_HOUR_PRESSURE_DROP_THRESHOLD:
+        if accelerating_hour(last_hour) or one_hour_change <= -8:
+            return (one_hour_change, "1 hour")
+    if three_hour_change < -StormDetector.THREE_HOUR_PRESSURE_DROP_THRESHOLD:
+        if accelerating(last_three_hours) or three_hour_change <= -12:
+            return (three_hour_change, "3 hours (accelerating)" if accelerating(last_three_hours) else "3 hours")
+    return None
+
+
+def _series(pressure_at, minutes, gaps=()):
+    return [(pressure_at(m), START + m * MINUTE) for m in range(minutes) if m not in gaps]
+
+
+def _steady(m):
+    return 1013.0
+
+
+def _gradual_fall(m):
+    return 1013.0 - 0.02 * m
+
+
+def _steady_three_hour_fall(m):
+    return 1013.0 - 0.075 * m
+
+
+def _accelerating_fall(m):
+    return 1013.0 - 0.0004 * m * m
+
+
+def _sudden_drop(m):
+    return 1013.0 if m < 200 else 1013.0 - 0.2 * (m - 200)
+
+
+def _fall_then_steady(m):
+    return 1013.0 - 0.0004 * min(m, 200) ** 2
+
+
+def _noisy_fall(seed):
+    rng = random.Random(seed)
+    noise = [rng.uniform(-0.3, 0.3) for _ in range(400)]
+    return lambda m: 1013.0 - 0.00035 * m * m + noise[m]
+
+
+def _wave(m):
+    return 1010.0 + 6.0 * math.sin(m / 40.0)
+
+
+SERIES = {
+    "steady": _series(_steady, 300),
+    "gradual fall": _series(_gradual_fall, 400),
+    "steady three-hour fall": _series(_steady_three_hour_fall, 240),
+    "accelerating fall": _series(_accelerating_fall, 260),
+    "sudden drop": _series(_sudden_drop, 300),
+    "fall then steady": _series(_fall_then_steady, 300),
+    "noisy fall": _series(_noisy_fall(7), 300),
+    "noisy fall, missed samples": _series(_noisy_fall(11), 300, gaps=set(range(100, 130)) | {210, 211, 250}),
+    "wave": _series(_wave, 400),
+}
+
+
+@pytest.fixture
+def detector(tmp_path):
+    detector = StormDetector(db_path=str(tmp_path / "pressure.db"))
+    detector.alerts = []
+    detector.notify_storm = lambda drop, period: detector.alerts.append((drop, period))
+    yield detector
+    detector.close()
+
+
+@pytest.mark.parametrize("name", SERIES)
+def test_streaming_detector_alerts_match_the_list_rules(detector, name):
+    readings = SERIES[name]
+    expected, actual = [], []
+    for index, (pressure, timestamp) in enumerate(readings):
+        alert = reference_alert(readings[:index + 1], timestamp)
+        if alert is not None:
+            expected.append((index, *alert))
+
+        detector._readings.append(timestamp, pressure)
+        detector._update_windows(timestamp)
+        detector.alerts.clear()
+        detector._check_for_storm()
+        actual.extend((index, *alert) for alert in detector.alerts)
+
+    assert [(index, period) for index, _, period in actual] == \
+        [(index, period) for index, _, period in expected]
+    for (_, drop, _), (_, expected_drop, _) in zip(actual, expected):
+        assert drop == pytest.approx(expected_drop, abs=1e-9)
+
+
+def test_alerting_series_are_covered():
+    # Guards the equivalence test against series that never reach an alert
+    alerting = {name for name, readings in SERIES.items()
+                if any(reference_alert(readings[:i + 1], t) for i, (_, t) in enumerate(readings))}
+    assert {"steady three-hour fall", "accelerating fall", "sudden drop", "noisy fall"} <= alerting
+    assert "steady" not in alerting and "gradual fall" not in alerting
+
+
+def test_rolling_statistics_match_a_recomputed_window():
+    readings = PressureRingBuffer(64)
+    window = RollingTrendStatistics(readings, 30 * MINUTE)
+    rng = random.Random(3)
+    series = []
+    for m in range(200):
+        pressure = 1000.0 + rng.uniform(-5, 5)
+        timestamp = START + m * MINUTE
+        readings.append(timestamp, pressure)
+        series.append((pressure, timestamp))
+        window.update(timestamp)
+
+        inside = [p for p, t in series if t >= timestamp - 30 * MINUTE]
+        assert window.count == len(inside)
+        assert window.change == inside[-1] - inside[0]
+        assert window.minimum == min(inside)
+        assert window.maximum == max(inside)
+        assert window.mean == pytest.approx(sum(inside) / len(inside))
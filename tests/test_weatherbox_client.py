@@ -0,0 +1,97 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Benchmarks.StubWeatherBoxServer import SAMPLE_ALERT, StubWeatherBoxServer
+from WeatherBox.WeatherBoxClient import WeatherBoxClient
+
+
+@pytest.fixture
+def server():
+    server = StubWeatherBoxServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client():
+    client = WeatherBoxClient()
+    yield client
+    client.close()
+
+
+def test_repeated_polls_reuse_one_connection(server, client):
+    url = f"{server.url}/weather-alert/tn/knoxville"
+    for _ in range(5):
+        client.get_json(url)
+    assert server.requests == 5
+    assert server.connections == 1
+
+
+def test_unchanged_alert_is_revalidated_with_a_bodyless_304(server, client):
+    url = f"{server.url}/weather-alert/tn/knoxville"
+    first = client.get_json(url)
+    full_response_bytes = server.bytes_sent
+    server.reset_stats()
+
+    second = client.get_json(url)
+
+    assert server.not_modified == 1
+    # Only the status line and headers, no body
+    assert server.bytes_sent < full_response_bytes / 2
+    assert second == first == SAMPLE_ALERT
+
+
+def test_changed_alert_is_fetched_again(server, client):
+    url = f"{server.url}/weather-alert/tn/knoxville"
+    client.get_json(url)
+    changed = dict(SAMPLE_ALERT, event="Tornado Warning")
+    server.set_alert(changed)
+    assert client.get_json(url) == changed
+    assert server.not_modified == 0
+
+
+class _StaleProxyHandler(BaseHTTPRequestHandler):
+    """Answers 304 unless told to bypass caches, like a proxy holding an old validator."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.headers.get("Cache-Control") != "no-cache" or self.server.always_not_modified:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps(SAMPLE_ALERT).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stale_proxy():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StaleProxyHandler)
+    server.daemon_threads = True
+    server.always_not_modified = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_304_with_nothing_cached_refetches(stale_proxy, client):
+    host, port = stale_proxy.server_address[:2]
+    assert client.get_json(f"http://{host}:{port}/weather-alert/tn/knoxville") == SAMPLE_ALERT
+
+
+def test_304_to_an_unconditional_request_is_an_error(stale_proxy, client):
+    stale_proxy.always_not_modified = True
+    host, port = stale_proxy.server_address[:2]
+    with pytest.raises(ValueError):
+        client.get_json(f"http://{host}:{port}/weather-alert/tn/knoxville")